@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Parse-time benchmark for the HTML parser backends
+Runs extract_articles_from_page / extract_article_data over saved newsday
+pages with every available backend and checks the outputs are identical
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsday_crawler import NewsdayCrawler
+from html_parser import available_backends
+from benchmarks.fixtures import generate_corpus, load_pages
+
+
+def extract_all(crawler, pages):
+    """Parse and extract every page; returns (results, parse seconds, total seconds)"""
+    results = []
+    parse_time = 0.0
+    start = time.perf_counter()
+    for page_type, path, html in pages:
+        url = crawler.base_url + path
+        t = time.perf_counter()
+        soup = crawler.parser.parse(html)
+        parse_time += time.perf_counter() - t
+        if page_type == 'date':
+            results.append(crawler.extract_articles_from_page(soup, url))
+        else:
+            results.append(crawler.extract_article_data(soup, url))
+    return results, parse_time, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', help="Fixtures directory with date/ and article/ pages "
+                                        "(default: generated newsday-style corpus)")
+    parser.add_argument('--dates', type=int, default=10, help="Dates to generate when --pages is not given")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = list(load_pages(args.pages) if args.pages else generate_corpus(args.dates))
+    size = sum(len(html) for _, _, html in pages)
+    print(f"{len(pages)} pages, {size / 1e6:.1f} MB of HTML")
+
+    baseline = None
+    timings = {}
+    print(f"{'backend':12s} {'parse':>8s} {'total':>8s} {'pages/s':>8s} {'parse speedup':>14s}")
+    for backend in ['html.parser'] + [b for b in available_backends() if b != 'html.parser']:
+        crawler = NewsdayCrawler(headless=True, parser_backend=backend)
+        best = None
+        for _ in range(args.repeat):
+            results, parse_time, total = extract_all(crawler, pages)
+            if best is None or total < best[1]:
+                best = (parse_time, total)
+        timings[backend] = best
+
+        if baseline is None:
+            baseline = results
+            status = "baseline"
+        else:
+            mismatches = sum(1 for a, b in zip(baseline, results) if a != b)
+            status = "identical output" if not mismatches else f"{mismatches} pages differ"
+        print(f"{backend:12s} {best[0]:7.3f}s {best[1]:7.3f}s {len(pages) / best[1]:8.1f} "
+              f"{timings['html.parser'][0] / best[0]:13.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
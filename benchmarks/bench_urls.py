@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for article URL classification
+Times the old six-regex is_article_url (with its urljoin) against
+ArticleUrlClassifier over a million hrefs taken from newsday pages
+"""
+
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import urljoin
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from benchmarks.fixtures import generate_corpus, load_pages
+from url_classifier import ArticleUrlClassifier
+
+BASE_URL = "https://newsday.co.tt"
+
+
+def legacy_is_article(href):
+    """The classifier this replaced: urljoin, then six uncompiled re.search calls"""
+    url = urljoin(BASE_URL, href)
+    article_patterns = [
+        r'/\d{4}/\d{2}/\d{2}/.+',
+        r'/news/',
+        r'/sports/',
+        r'/features/',
+        r'/editorial/',
+        r'/entertainment/'
+    ]
+    for pattern in article_patterns:
+        if re.search(pattern, url):
+            return True
+    return False
+
+
+def collect_hrefs(pages):
+    hrefs = []
+    for _, _, html in pages:
+        hrefs.extend(a['href'] for a in BeautifulSoup(html, 'html.parser').find_all('a', href=True))
+    return hrefs
+
+
+def timed(func, hrefs):
+    start = time.perf_counter()
+    accepted = sum(1 for href in hrefs if func(href))
+    return accepted, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', help="Fixtures directory with recorded pages "
+                                        "(default: generated newsday-style corpus)")
+    parser.add_argument('--count', type=int, default=1000000, help="Hrefs to classify")
+    args = parser.parse_args()
+
+    pages = list(load_pages(args.pages) if args.pages else generate_corpus(10))
+    distinct = collect_hrefs(pages)
+    hrefs = list(itertools.islice(itertools.cycle(distinct), args.count))
+    print(f"{len(hrefs)} hrefs ({len(set(distinct))} distinct, from {len(pages)} pages)")
+
+    classifier = ArticleUrlClassifier(BASE_URL)
+    legacy_accepted, legacy_time = timed(legacy_is_article, hrefs)
+    new_accepted, new_time = timed(classifier.classify, hrefs)
+
+    print(f"{'classifier':12s} {'seconds':>8s} {'ns/href':>8s} {'accepted':>9s}")
+    print(f"{'legacy':12s} {legacy_time:8.3f} {legacy_time / len(hrefs) * 1e9:8.0f} {legacy_accepted:9d}")
+    print(f"{'compiled':12s} {new_time:8.3f} {new_time / len(hrefs) * 1e9:8.0f} {new_accepted:9d}")
+    print(f"speedup: {legacy_time / new_time:.1f}x")
+
+    # What the new classifier stopped accepting, by kind of link
+    rejected = Counter()
+    for href in set(distinct):
+        if legacy_is_article(href) and classifier.classify(href) is None:
+            path = urljoin(BASE_URL, href)
+            if '/page/' in path:
+                kind = 'pagination'
+            elif not path.startswith(BASE_URL):
+                kind = 'off-site'
+            else:
+                kind = 'section or listing'
+            rejected[kind] += 1
+    if rejected:
+        print(f"now rejected (distinct hrefs): {dict(rejected)}")
+    sections = Counter(c[0] for c in map(classifier.classify, set(distinct)) if c)
+    print(f"sections: {dict(sections)}")
+
+
+if __name__ == "__main__":
+    main()
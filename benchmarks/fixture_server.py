@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for newsday.co.tt
+Serves recorded (or generated) date and article pages over HTTP with
+configurable latency and error injection, for offline benchmarks
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import (SECTIONS, article_page, date_page, load_pages, month_archive_page,
+                                 month_sitemap, sitemap_index)
+
+DATE_PATH = re.compile(r'^/(\d{4})/(\d{2})/(\d{2})/$')
+ARTICLE_PATH = re.compile(r'^/\d{4}/\d{2}/\d{2}/[^/]+/$')
+SECTION_PATH = re.compile(r'^/(%s)/$' % '|'.join(SECTIONS))
+MONTH_PATH = re.compile(r'^/(\d{4})/(\d{2})/(?:page/(\d+)/)?$')
+SITEMAP_PATH = re.compile(r'^/sitemap-posts-(\d{4})-(\d{2})\.xml$')
+LIVE_SITE = 'https://newsday.co.tt'
+
+
+class FixtureCorpus:
+    """Pages to serve: recorded pages when available, generated ones otherwise.
+
+    Recorded date pages only exist for the days that were recorded, so other
+    dates are mapped onto one of them deterministically. Absolute links to
+    the live site are rewritten to point at the local server.
+    """
+
+    def __init__(self, directory=None, seed=0, sitemap_months=24):
+        self.seed = seed
+        self.sitemap_months = sitemap_months
+        self.pages = {}
+        self.date_paths = []
+        if directory:
+            for page_type, path, html in load_pages(directory):
+                self.pages[path] = html
+                if page_type == 'date':
+                    self.date_paths.append(path)
+
+    def recent_months(self):
+        """(year, month) pairs the sitemap index lists, oldest first"""
+        now = datetime.now()
+        months = []
+        for i in range(self.sitemap_months):
+            index = now.year * 12 + now.month - 1 - i
+            months.append((index // 12, index % 12 + 1))
+        return months[::-1]
+
+    def get(self, path, base_url):
+        html = self.pages.get(path)
+        if html is None:
+            match = DATE_PATH.match(path)
+            if match and self.date_paths:
+                html = self.pages[self.date_paths[zlib.crc32(path.encode()) % len(self.date_paths)]]
+            elif match:
+                html = date_page(datetime(*map(int, match.groups())), self.seed)
+            elif MONTH_PATH.match(path):
+                year, month, page = MONTH_PATH.match(path).groups()
+                html = month_archive_page(int(year), int(month), int(page or 1), self.seed)
+            elif path == '/robots.txt':
+                html = f"User-agent: *\nDisallow: /wp-admin/\nSitemap: {LIVE_SITE}/sitemap_index.xml\n"
+            elif path == '/sitemap_index.xml':
+                html = sitemap_index(self.recent_months())
+            elif SITEMAP_PATH.match(path):
+                year, month = SITEMAP_PATH.match(path).groups()
+                html = month_sitemap(int(year), int(month), self.seed)
+            elif SECTION_PATH.match(path) and not self.pages:
+                # Section fronts look like a date listing
+                html = date_page(datetime(2024, 1, 1), self.seed)
+            elif ARTICLE_PATH.match(path) and not self.pages:
+                try:
+                    html = article_page(path, self.seed)
+                except ValueError:
+                    return None
+        if html is not None:
+            html = html.replace(LIVE_SITE, base_url)
+        return html
+
+
+class FixtureServer:
+    """Threaded HTTP server for a FixtureCorpus
+
+    latency/jitter are seconds added to every response; error_rate is the
+    fraction of requests answered with 503 instead (with a Retry-After
+    header when retry_after is set). Pages carry an ETag and answer a
+    matching If-None-Match with 304.
+    """
+
+    def __init__(self, directory=None, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, retry_after=None, seed=0):
+        self.corpus = FixtureCorpus(directory, seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'not_found': 0, 'not_modified': 0, 'bytes': 0}
+        self.stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _roll(self):
+        with self.random_lock:
+            return self.random.random(), self.random.random()
+
+    def handle(self, request):
+        error_roll, jitter_roll = self._roll()
+        delay = self.latency + self.jitter * jitter_roll
+        if delay > 0:
+            time.sleep(delay)
+
+        path = request.path.split('?', 1)[0].split('#', 1)[0]
+        if error_roll < self.error_rate:
+            status, body, key = 503, b'Service Unavailable', 'errors'
+        else:
+            html = self.corpus.get(path, self.url)
+            if html is None:
+                status, body, key = 404, b'Not Found', 'not_found'
+            else:
+                status, body, key = 200, html.encode('utf-8'), None
+                etag = '"%08x"' % zlib.crc32(body)
+                if request.headers.get('If-None-Match') == etag:
+                    status, body, key = 304, b'', 'not_modified'
+
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            self.stats['bytes'] += len(body)
+            if key:
+                self.stats[key] += 1
+
+        request.send_response(status)
+        if status in (200, 304):
+            request.send_header('ETag', etag)
+        content_type = 'text/plain' if path.endswith('.txt') else 'text/html'
+        if path.endswith('.xml'):
+            content_type = 'application/xml'
+        request.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        if status == 503 and self.retry_after is not None:
+            request.send_header('Retry-After', str(self.retry_after))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='fixture-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve newsday fixtures locally")
+    parser.add_argument('--fixtures', help="Recorded fixtures directory (default: generated pages)")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.fixtures, port=args.port, latency=args.latency,
+                           jitter=args.jitter, error_rate=args.error_rate)
+    print(f"Serving fixtures on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Newsday-style page corpus for benchmarks
+Generates deterministic date and article pages that mirror newsday.co.tt's
+WordPress markup, and loads/saves recorded pages from a fixtures directory
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+SECTIONS = ['news', 'sports', 'features', 'editorial', 'entertainment', 'business']
+WORDS = (
+    "government minister police court port spain tobago carnival budget cabinet "
+    "community school hospital fisherman farmer rain flood road contractor "
+    "opposition union workers energy gas oil tourism airport ferry cricket "
+    "football coach team athletes festival music soca steelpan calypso prime "
+    "council mayor residents village beach coast development project funding"
+).split()
+AUTHORS = ['Staff Writer', 'Janelle De Souza', 'Corey Connelly', 'Sean Douglas',
+           'Paula Lindo', 'Jensen La Vende', 'Narissa Fraser', 'Carla Bridglal']
+
+HEAD = """<head>
+<meta charset="UTF-8">
+<title>{title} - Trinidad and Tobago Newsday</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+{meta}
+<link rel="stylesheet" href="https://newsday.co.tt/wp-content/themes/newsday/style.css?ver=6.4.2">
+<link rel="stylesheet" href="https://fonts.googleapis.com/css?family=Roboto:400,700">
+<style>.site-header{{background:#fff}}.entry-content p{{margin:0 0 1em}}</style>
+<script async src="https://www.googletagmanager.com/gtag/js?id=UA-000000-1"></script>
+<script>window.dataLayer=window.dataLayer||[];function gtag(){{dataLayer.push(arguments);}}gtag('js',new Date());</script>
+<script async src="https://securepubads.g.doubleclick.net/tag/js/gpt.js"></script>
+</head>"""
+
+HEADER = """<header class="site-header"><div class="site-branding"><a href="/" class="custom-logo-link"><img src="/wp-content/uploads/logo.png" alt="Newsday"></a></div>
+<nav class="main-navigation"><ul class="menu">{items}</ul></nav>
+<div class="top-ad"><div id="div-gpt-ad-leaderboard"></div></div></header>"""
+
+FOOTER = """<footer class="site-footer"><div class="footer-widgets">{links}</div>
+<p class="copyright">&copy; Trinidad and Tobago Newsday</p></footer>
+<script src="https://newsday.co.tt/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script>
+<script src="https://newsday.co.tt/wp-content/themes/newsday/js/main.js?ver=1.2"></script>
+<script async src="https://platform.twitter.com/widgets.js"></script>"""
+
+
+def _words(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def _headline(rng):
+    return _words(rng, rng.randint(6, 12)).capitalize()
+
+
+def _slug(headline):
+    return '-'.join(headline.lower().split())[:80]
+
+
+def _nav(rng):
+    items = ''.join(f'<li class="menu-item"><a href="/{s}/">{s.title()}</a></li>' for s in SECTIONS)
+    return HEADER.format(items=items)
+
+
+def _footer(rng):
+    links = ''.join(f'<a href="/{s}/">{s.title()}</a> ' for s in SECTIONS)
+    links += '<a href="/about-us/">About us</a> <a href="/contact/">Contact</a> <a href="/page/2/">Older</a>'
+    return FOOTER.format(links=links)
+
+
+def article_urls_for_date(date, count=None, seed=0):
+    """Deterministic article paths linked from a date page"""
+    rng = random.Random(f"{seed}:{date:%Y-%m-%d}")
+    count = rng.randint(8, 25) if count is None else count
+    urls = []
+    for _ in range(count):
+        headline = _headline(rng)
+        urls.append((f"/{date:%Y/%m/%d}/{_slug(headline)}/", headline, rng.choice(SECTIONS)))
+    return urls
+
+
+def date_page(date, seed=0):
+    """A newsday date archive page: article list plus trending links to other days"""
+    rng = random.Random(f"page:{seed}:{date:%Y-%m-%d}")
+    items = []
+    for path, headline, section in article_urls_for_date(date, seed=seed):
+        items.append(
+            f'<article class="post type-post category-{section}"><div class="post-thumbnail">'
+            f'<a href="{path}"><img src="/wp-content/uploads/{date:%Y/%m}/{rng.randint(1000, 9999)}.jpg" alt=""></a></div>'
+            f'<h2 class="entry-title"><a href="{path}" rel="bookmark">{headline}</a></h2>'
+            f'<div class="entry-summary"><p>{_words(rng, 30)}</p></div></article>'
+        )
+    trending = []
+    for days in (1, 2, 3, 7):
+        for path, headline, _ in article_urls_for_date(date - timedelta(days=days), seed=seed)[:2]:
+            trending.append(f'<li><a href="{path}?utm_source=trending">{headline}</a></li>')
+    body = (
+        f'<body class="archive date">{_nav(rng)}<div id="content" class="site-content">'
+        f'<main id="main" class="site-main"><header class="page-header"><h1 class="page-title">Day: '
+        f'<span>{date:%B %d, %Y}</span></h1></header>{"".join(items)}'
+        f'<nav class="navigation pagination"><a class="next page-numbers" href="/{date:%Y/%m/%d}/page/2/">Next</a></nav>'
+        f'</main><aside class="widget-area"><section class="widget trending"><h3>Trending</h3><ul>{"".join(trending)}</ul>'
+        f'</section></aside></div>{_footer(rng)}</body>'
+    )
+    head = HEAD.format(title=f"{date:%B %d, %Y}", meta='<meta name="robots" content="noindex, follow">')
+    return f'<!DOCTYPE html>\n<html lang="en-US">{head}{body}</html>'
+
+
+ARCHIVE_DAYS_PER_PAGE = 5
+
+
+def month_archive_page(year, month, page=1, seed=0):
+    """A paginated monthly archive page, or None past the last page"""
+    first = datetime(year, month, 1)
+    days = ((first + timedelta(days=32)).replace(day=1) - first).days
+    start = (page - 1) * ARCHIVE_DAYS_PER_PAGE
+    if page < 1 or start >= days:
+        return None
+    rng = random.Random(f"month:{seed}:{year}-{month}:{page}")
+    items = []
+    for day in range(start + 1, min(days, start + ARCHIVE_DAYS_PER_PAGE) + 1):
+        for path, headline, section in article_urls_for_date(datetime(year, month, day), seed=seed):
+            items.append(
+                f'<article class="post type-post category-{section}">'
+                f'<h2 class="entry-title"><a href="{path}" rel="bookmark">{headline}</a></h2>'
+                f'<div class="entry-summary"><p>{_words(rng, 20)}</p></div></article>'
+            )
+    next_link = ''
+    if start + ARCHIVE_DAYS_PER_PAGE < days:
+        next_link = f'<a class="next page-numbers" href="/{first:%Y/%m}/page/{page + 1}/">Next</a>'
+    body = (
+        f'<body class="archive date">{_nav(rng)}<div id="content" class="site-content">'
+        f'<main id="main" class="site-main"><header class="page-header"><h1 class="page-title">Month: '
+        f'<span>{first:%B %Y}</span></h1></header>{"".join(items)}'
+        f'<nav class="navigation pagination">{next_link}</nav></main></div>{_footer(rng)}</body>'
+    )
+    head = HEAD.format(title=f"{first:%B %Y}", meta='<meta name="robots" content="noindex, follow">')
+    return f'<!DOCTYPE html>\n<html lang="en-US">{head}{body}</html>'
+
+
+def sitemap_index(months, base_url="https://newsday.co.tt"):
+    """A sitemap index listing one sitemap per (year, month)"""
+    entries = ''.join(
+        f'<sitemap><loc>{base_url}/sitemap-posts-{y}-{m:02d}.xml</loc>'
+        f'<lastmod>{datetime(y, m, 28):%Y-%m-%dT%H:%M:%S}+00:00</lastmod></sitemap>'
+        for y, m in months
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>')
+
+
+def month_sitemap(year, month, seed=0, base_url="https://newsday.co.tt"):
+    """A urlset with every article published in one month"""
+    first = datetime(year, month, 1)
+    days = ((first + timedelta(days=32)).replace(day=1) - first).days
+    entries = []
+    for day in range(1, days + 1):
+        date = datetime(year, month, day)
+        for path, _, _ in article_urls_for_date(date, seed=seed):
+            entries.append(f'<url><loc>{base_url}{path}</loc>'
+                           f'<lastmod>{date:%Y-%m-%d}T12:00:00+00:00</lastmod></url>')
+    return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{"".join(entries)}</urlset>')
+
+
+def article_page(path, seed=0):
+    """A newsday article page with metadata in <head> and a long body"""
+    rng = random.Random(f"article:{seed}:{path}")
+    parts = path.strip('/').split('/')
+    date = datetime(int(parts[0]), int(parts[1]), int(parts[2]), rng.randint(5, 22), rng.randint(0, 59))
+    headline = parts[3].replace('-', ' ').capitalize()
+    section = rng.choice(SECTIONS)
+    author = rng.choice(AUTHORS)
+    url = f"https://newsday.co.tt{path}"
+    ld = {
+        "@context": "https://schema.org",
+        "@type": "NewsArticle",
+        "headline": headline,
+        "datePublished": date.isoformat(),
+        "author": {"@type": "Person", "name": author},
+        "articleSection": section.title(),
+        "mainEntityOfPage": url,
+    }
+    meta = (
+        f'<meta property="og:type" content="article">'
+        f'<meta property="og:title" content="{headline}">'
+        f'<meta property="og:url" content="{url}">'
+        f'<meta property="article:published_time" content="{date.isoformat()}">'
+        f'<meta property="article:section" content="{section.title()}">'
+        f'<meta name="author" content="{author}">'
+        f'<script type="application/ld+json">{json.dumps(ld)}</script>'
+    )
+    paragraphs = ''.join(f'<p>{_words(rng, rng.randint(25, 70))}.</p>' for _ in range(rng.randint(8, 20)))
+    paragraphs += '<div class="ad-inline"><script>googletag.cmd.push(function(){});</script></div>'
+    related = ''.join(
+        f'<li><a href="{p}">{h}</a></li>'
+        for p, h, _ in article_urls_for_date(date - timedelta(days=1), seed=seed)[:4]
+    )
+    body = (
+        f'<body class="post-template-default single single-post">{_nav(rng)}'
+        f'<div id="content" class="site-content"><main id="main" class="site-main">'
+        f'<article class="post type-post status-publish category-{section}">'
+        f'<header class="entry-header"><span class="cat-links category"><a href="/{section}/">{section.title()}</a></span>'
+        f'<h1 class="entry-title">{headline}</h1>'
+        f'<div class="entry-meta"><span class="byline author">{author}</span> '
+        f'<time class="entry-date published" datetime="{date.isoformat()}">{date:%B %d, %Y}</time></div></header>'
+        f'<div class="post-thumbnail"><img src="/wp-content/uploads/{date:%Y/%m}/{rng.randint(1000, 9999)}.jpg"></div>'
+        f'<div class="entry-content">{paragraphs}</div>'
+        f'<footer class="entry-footer"><span class="tags-links"><a href="/tag/{rng.choice(WORDS)}/" rel="tag">{rng.choice(WORDS)}</a></span></footer>'
+        f'</article><section class="related-posts"><h3>Related</h3><ul>{related}</ul></section>'
+        f'<div id="comments" class="comments-area"></div></main>'
+        f'<aside class="widget-area"><section class="widget"><h3>Latest</h3></section></aside></div>{_footer(rng)}</body>'
+    )
+    return f'<!DOCTYPE html>\n<html lang="en-US">{HEAD.format(title=headline, meta=meta)}{body}</html>'
+
+
+def generate_corpus(dates=20, start=datetime(2024, 1, 1), seed=0):
+    """Yield (page_type, path, html) for a run of consecutive dates and their articles"""
+    for i in range(dates):
+        date = start + timedelta(days=i)
+        yield 'date', f"/{date:%Y/%m/%d}/", date_page(date, seed)
+        for path, _, _ in article_urls_for_date(date, seed=seed):
+            yield 'article', path, article_page(path, seed)
+
+
+def save_page(directory, page_type, path, html):
+    """Store a recorded page as <directory>/<page_type>/<path as filename>.html"""
+    folder = os.path.join(directory, page_type)
+    os.makedirs(folder, exist_ok=True)
+    name = path.strip('/').replace('/', '_') or 'index'
+    with open(os.path.join(folder, f"{name}.html"), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def load_pages(directory):
+    """Yield (page_type, path, html) for every recorded page in a fixtures directory"""
+    for page_type in ('date', 'article'):
+        folder = os.path.join(directory, page_type)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.html'):
+                with open(os.path.join(folder, name), encoding='utf-8') as f:
+                    path = '/' + name[:-5].replace('_', '/') + '/'
+                    yield page_type, path, f.read()
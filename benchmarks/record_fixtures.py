@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Record live newsday.co.tt pages into a fixtures directory
+Saves a few date pages and the articles they link to, for the offline
+benchmark server. Recorded pages stay local (benchmarks/fixtures/ is ignored).
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsday_crawler import NewsdayCrawler
+from benchmarks.fixtures import save_page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record newsday pages for offline benchmarks")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures'))
+    parser.add_argument('--dates', type=int, default=5, help="Number of recent days to record")
+    parser.add_argument('--articles-per-date', type=int, default=10)
+    args = parser.parse_args()
+
+    crawler = NewsdayCrawler(headless=True)
+    for days in range(1, args.dates + 1):
+        date = datetime.now() - timedelta(days=days)
+        path = f"/{date:%Y/%m/%d}/"
+        url = crawler.base_url + path
+        crawler.rate_limiter.acquire(url)
+        response = crawler.http_fetcher.fetch(url)
+        if response['status'] != 200:
+            print(f"Skipping {url}: HTTP {response['status']}")
+            continue
+        save_page(args.out, 'date', path, response['content'])
+
+        soup = crawler.parser.parse(response['content'])
+        articles = crawler.extract_articles_from_page(soup, url)[:args.articles_per_date]
+        for article in articles:
+            crawler.rate_limiter.acquire(article['url'])
+            page = crawler.http_fetcher.fetch(article['url'])
+            if page['status'] == 200:
+                save_page(args.out, 'article', urlparse(article['url']).path, page['content'])
+        print(f"Recorded {path} with {len(articles)} articles")
+
+
+if __name__ == "__main__":
+    main()
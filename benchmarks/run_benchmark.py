@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Offline crawl benchmark
+Runs crawl_historical_data against the local fixture server and reports
+pages/sec, articles/sec, fetch latency percentiles, CPU time and peak RSS
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsday_crawler import NewsdayCrawler
+from rate_limiter import AdaptiveRateLimiter
+from benchmarks.fixture_server import FixtureServer
+
+
+class BenchmarkCrawler(NewsdayCrawler):
+    """Crawls a fixed window of days instead of years back from today"""
+
+    def __init__(self, days=30, end_date=datetime(2024, 1, 30), **kwargs):
+        super().__init__(**kwargs)
+        self.days = days
+        self.end_date = end_date
+
+    def generate_date_urls(self, years_back=15, start_date=None):
+        urls = []
+        if start_date is not None:
+            days = (self.end_date - start_date).days + 1
+        else:
+            days = self.days
+        for offset in range(days - 1, -1, -1):
+            date = self.end_date - timedelta(days=offset)
+            urls.append({'url': f"{self.base_url}/{date:%Y/%m/%d}/", 'date': date.strftime("%Y-%m-%d")})
+        return urls
+
+
+def serve(conn, options):
+    """Run the fixture server in its own process so it doesn't skew CPU/RSS"""
+    server = FixtureServer(**options).start()
+    conn.send(server.url)
+    conn.recv()
+    conn.send(server.stats)
+    server.stop()
+
+
+def cpu_time():
+    """User + system CPU seconds of this process and its reaped children (parse workers)"""
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def peak_rss_kib(pid='self'):
+    """VmHWM (peak resident set) of a process from /proc, None where unavailable"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def track_worker_rss(crawler):
+    """Record each parse worker's peak RSS (KiB) just before the pool shuts down
+
+    RUSAGE_CHILDREN can't be used for this: it reports the largest child ever
+    reaped, which includes helpers run at import (ctypes runs ldconfig) that
+    can outgrow the workers.
+    """
+    peaks = []
+    close_parse_pool = crawler.close_parse_pool
+
+    def tracked_close_parse_pool():
+        if crawler.parse_pool:
+            # ProcessPoolExecutor keeps its workers by pid
+            for pid in list(crawler.parse_pool.executor._processes or {}):
+                peak = peak_rss_kib(pid)
+                if peak is not None:
+                    peaks.append(peak)
+        close_parse_pool()
+
+    crawler.close_parse_pool = tracked_close_parse_pool
+    return peaks
+
+
+def time_fetches(crawler):
+    """Record the latency of every fetch the crawler makes, by tier
+
+    Wraps record_fetch, which both tiers (and both engines) report to, so
+    browser fetches are timed as well as plain-HTTP ones.
+    """
+    latencies = {}
+    lock = threading.Lock()
+    record_fetch = crawler.record_fetch
+
+    def timed_record_fetch(tier, status, elapsed, size=0):
+        with lock:
+            latencies.setdefault(tier, []).append(elapsed)
+        record_fetch(tier, status, elapsed, size)
+
+    crawler.record_fetch = timed_record_fetch
+    return latencies
+
+
+def latency_summary(latencies):
+    return {
+        'fetches': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+def run(args):
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(child, {
+        'directory': args.fixtures,
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'port': args.port,
+    }), daemon=True)
+    server.start()
+    base_url = parent.recv()
+
+    output = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False).name
+    crawler = BenchmarkCrawler(
+        days=args.days,
+        end_date=datetime(2024, 1, 1) + timedelta(days=args.days - 1),
+        headless=True,
+        base_url=base_url,
+        fetch_mode=args.fetch_mode,
+        output_path=output,
+        http_cache_path=args.http_cache,
+        parse_workers=args.parse_workers,
+        rate_limiter=AdaptiveRateLimiter(initial_rate=args.rate, max_rate=args.rate, burst=args.rate),
+    )
+    latencies = time_fetches(crawler)
+    worker_rss = track_worker_rss(crawler)
+
+    usage_before = cpu_time()
+    start = time.perf_counter()
+    if args.engine == 'async':
+        crawler.crawl_historical_data_async(concurrency=args.concurrency, delay=0)
+    else:
+        crawler.crawl_historical_data(max_workers=args.workers, article_workers=args.article_workers, delay=0)
+    wall = time.perf_counter() - start
+    cpu = cpu_time() - usage_before
+
+    parent.send('stop')
+    server_stats = parent.recv()
+    server.join(timeout=10)
+
+    with open(output, encoding='utf-8') as f:
+        articles = sum(1 for line in f if line.strip())
+    os.unlink(output)
+    all_latencies = [elapsed for values in latencies.values() for elapsed in values]
+
+    return {
+        'engine': args.engine,
+        'days': args.days,
+        'wall_seconds': round(wall, 3),
+        'date_pages_per_sec': round(args.days / wall, 2),
+        'articles': articles,
+        'articles_per_sec': round(articles / wall, 2),
+        'fetches': len(all_latencies),
+        'fetch_p50_ms': round(percentile(all_latencies, 50) * 1000, 1),
+        'fetch_p95_ms': round(percentile(all_latencies, 95) * 1000, 1),
+        'fetch_latency_by_tier': {tier: latency_summary(values) for tier, values in sorted(latencies.items())},
+        'cpu_seconds': round(cpu, 3),
+        'cpu_utilization': round(cpu / wall, 2),
+        # Peaks are per process: the crawler itself, and its parse workers
+        'peak_rss_mb': {
+            'crawler': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            'parse_worker_max': round(max(worker_rss) / 1024, 1) if worker_rss else None,
+            'parse_workers_sum': round(sum(worker_rss) / 1024, 1) if worker_rss else None,
+        },
+        'fetch_tiers': crawler.get_fetch_stats(),
+        'http_cache': crawler.http_cache_stats,
+        'server': server_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against a local fixture server")
+    parser.add_argument('--fixtures', help="Recorded fixtures directory (default: generated pages)")
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--engine', choices=('threads', 'async'), default='threads')
+    parser.add_argument('--workers', type=int, default=2, help="Date discovery workers (threads engine)")
+    parser.add_argument('--article-workers', type=int, default=8, help="Article workers (threads engine)")
+    parser.add_argument('--concurrency', type=int, default=50, help="Concurrent fetches (async engine)")
+    parser.add_argument('--fetch-mode', choices=NewsdayCrawler.FETCH_MODES, default='http')
+    parser.add_argument('--rate', type=float, default=1000.0, help="Requests/sec cap for the rate limiter")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds of latency per response")
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--parse-workers', type=int, help="Parse in this many processes")
+    parser.add_argument('--port', type=int, default=0, help="Fixture server port (default: any free port)")
+    parser.add_argument('--http-cache',
+                        help="Validator cache file; run twice with a fixed --port to measure 304 recrawls")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    for key, value in results.items():
+        print(f"{key:20s} {value}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Shared Chromium browser pool for the Newsday crawler
+Keeps a few long-lived browsers alive and hands page loads out to them
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from playwright.async_api import async_playwright
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def wait_for_element(page, selector, timeout):
+    """Wait until selector is attached to the DOM; give up quietly after timeout ms"""
+    try:
+        page.wait_for_selector(selector, state='attached', timeout=max(1, timeout))
+        return True
+    except PlaywrightTimeoutError:
+        logger.debug(f"{selector!r} not found on {page.url} within timeout")
+        return False
+
+
+async def wait_for_element_async(page, selector, timeout):
+    try:
+        await page.wait_for_selector(selector, state='attached', timeout=max(1, timeout))
+        return True
+    except PlaywrightTimeoutError:
+        logger.debug(f"{selector!r} not found on {page.url} within timeout")
+        return False
+
+
+def stage_span(spans, name):
+    """A timing span from a spans.SpanRecorder, or nothing without one"""
+    return spans.span(name) if spans else contextlib.nullcontext()
+
+
+def summarize_stats(stats, resource_blocker):
+    """Add average page load time and request-blocking savings to pool stats"""
+    pages = stats['pages']
+    stats['avg_load_ms'] = round(stats.pop('load_seconds') / pages * 1000, 1) if pages else 0.0
+    if resource_blocker:
+        stats['blocking'] = resource_blocker.get_stats()
+    return stats
+
+
+class BrowserPool:
+    """Fixed set of long-lived browsers shared by all crawler threads.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    browser lives on its own dedicated thread. Crawler threads submit page
+    loads to a shared job queue and block on the result; whichever browser
+    is free picks the job up.
+    """
+
+    def __init__(self, size=2, headless=True, user_agent=None, max_pages_per_browser=200,
+                 resource_blocker=None, spans=None):
+        self.size = max(1, size)
+        self.headless = headless
+        self.user_agent = user_agent
+        self.max_pages_per_browser = max_pages_per_browser
+        self.resource_blocker = resource_blocker
+        self.spans = spans
+        self.jobs = queue.Queue()
+        self.workers = []
+        self.stats = {'launches': 0, 'recycles': 0, 'restarts': 0, 'pages': 0, 'load_seconds': 0.0,
+                      'active_pages': 0}
+        self.stats_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def start(self):
+        """Start the browser threads (idempotent)"""
+        with self.lock:
+            if self.workers or self.closed:
+                return
+            for i in range(self.size):
+                worker = _BrowserWorker(self, i)
+                worker.start()
+                self.workers.append(worker)
+        logger.info(f"Browser pool started with {self.size} browsers")
+
+    def fetch(self, url, wait_until='load', timeout=30000, wait_for_selector=None):
+        """Load a URL in a pooled browser and return {'status', 'content', 'headers', 'load_time'}
+
+        With wait_for_selector, content is returned as soon as that element
+        is in the DOM (or after the timeout, with whatever has loaded); error
+        responses are returned straight away, without waiting for it.
+        Navigation errors are re-raised in the calling thread.
+        """
+        self.start()
+        future = Future()
+        # Under the lock, so close() either sees the job (and runs or fails
+        # it) or has already made us raise
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Browser pool is closed")
+            # Run in the caller's context so timing spans nest under its own
+            self.jobs.put((future, contextvars.copy_context(), url, wait_until, timeout, wait_for_selector))
+        return future.result()
+
+    def record(self, key, amount=1):
+        with self.stats_lock:
+            self.stats[key] += amount
+
+    def get_stats(self):
+        """Snapshot of pool counters, page load times and blocking savings"""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats['browsers'] = sum(1 for w in self.workers if w.browser is not None)
+        stats['queued'] = self.jobs.qsize()
+        return summarize_stats(stats, self.resource_blocker)
+
+    def close(self):
+        """Stop all browsers and wait for their threads to exit"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            workers = list(self.workers)
+        for _ in workers:
+            self.jobs.put(_STOP)
+        for worker in workers:
+            worker.join(timeout=30)
+        # Anything still queued can never run now
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is not _STOP:
+                job[0].set_exception(RuntimeError("Browser pool is closed"))
+        logger.info(f"Browser pool closed: {self.get_stats()}")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class _BrowserWorker(threading.Thread):
+    """Owns one Playwright instance, browser, context and page"""
+
+    def __init__(self, pool, index):
+        super().__init__(name=f"browser-{index}", daemon=True)
+        self.pool = pool
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.pages_served = 0
+
+    def run(self):
+        try:
+            with sync_playwright() as p:
+                self.playwright = p
+                try:
+                    self.serve(self.load)
+                finally:
+                    self.shutdown()
+                    self.playwright = None
+        except Exception as e:
+            # Playwright itself failed to start; fail jobs instead of hanging callers
+            logger.error(f"{self.name}: Playwright failed: {e}")
+            error = e
+
+            def fail(*args):
+                raise RuntimeError(f"Browser unavailable: {error}")
+
+            self.serve(fail)
+
+    def serve(self, handler):
+        while True:
+            job = self.pool.jobs.get()
+            if job is _STOP:
+                return
+            future, context, url, wait_until, timeout, wait_for_selector = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(context.run(handler, url, wait_until, timeout, wait_for_selector))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def healthy(self):
+        """Browser is connected and the reusable page is still usable"""
+        try:
+            return (self.browser is not None and self.browser.is_connected()
+                    and self.page is not None and not self.page.is_closed())
+        except Exception:
+            return False
+
+    def launch(self):
+        self.browser = self.playwright.chromium.launch(headless=self.pool.headless)
+        self.context = self.browser.new_context(user_agent=self.pool.user_agent)
+        blocker = self.pool.resource_blocker
+        if blocker:
+            self.context.route('**/*', blocker.handle_route)
+            self.context.on('response', blocker.handle_response)
+        self.page = self.context.new_page()
+        self.pages_served = 0
+        self.pool.record('launches')
+
+    def shutdown(self):
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except Exception as e:
+                logger.debug(f"{self.name}: error closing browser: {e}")
+        self.browser = self.context = self.page = None
+
+    def load(self, url, wait_until, timeout, wait_for_selector=None):
+        if self.pages_served >= self.pool.max_pages_per_browser:
+            # Recycle to contain renderer memory growth
+            self.shutdown()
+            self.pool.record('recycles')
+        elif self.browser is not None and not self.healthy():
+            logger.warning(f"{self.name}: browser unhealthy, restarting")
+            self.shutdown()
+            self.pool.record('restarts')
+        if self.browser is None:
+            with stage_span(self.pool.spans, 'launch'):
+                self.launch()
+
+        self.pages_served += 1
+        self.pool.record('pages')
+        self.pool.record('active_pages')
+        start = time.time()
+        try:
+            with stage_span(self.pool.spans, 'navigate'):
+                response = self.page.goto(url, wait_until=wait_until, timeout=timeout)
+                if wait_for_selector and response is not None and response.status == 200:
+                    wait_for_element(self.page, wait_for_selector, timeout - (time.time() - start) * 1000)
+            with stage_span(self.pool.spans, 'content'):
+                content = self.page.content()
+            load_time = time.time() - start
+            self.pool.record('load_seconds', load_time)
+            return {
+                'status': response.status if response else None,
+                'content': content,
+                'headers': response.headers if response else {},
+                'load_time': load_time,
+            }
+        except Exception:
+            # Don't reuse a page that may be stuck mid-navigation
+            if not self.healthy():
+                self.shutdown()
+            else:
+                self.reset_page()
+            raise
+        finally:
+            self.pool.record('active_pages', -1)
+
+    def reset_page(self):
+        try:
+            self.page.close()
+            self.page = self.context.new_page()
+        except Exception:
+            self.shutdown()
+
+
+class AsyncBrowserPool:
+    """Few browsers, many concurrent pages, for the asyncio crawl engine.
+
+    Pages are spread over the least busy browser; a semaphore bounds the
+    number of navigations in flight across the whole pool. Browsers that have
+    served max_pages_per_browser pages are replaced and closed once their
+    in-flight pages finish.
+    """
+
+    def __init__(self, size=2, headless=True, user_agent=None, max_pages_per_browser=200, max_concurrency=50,
+                 resource_blocker=None, spans=None):
+        self.size = max(1, size)
+        self.headless = headless
+        self.user_agent = user_agent
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_concurrency = max_concurrency
+        self.resource_blocker = resource_blocker
+        self.spans = spans
+        self.semaphore = None
+        self.playwright = None
+        self.slots = []
+        self.stats = {'launches': 0, 'recycles': 0, 'restarts': 0, 'pages': 0, 'load_seconds': 0.0}
+
+    async def start(self):
+        if self.playwright is not None:
+            return
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.playwright = await async_playwright().start()
+        self.slots = [_AsyncBrowserSlot() for _ in range(self.size)]
+        logger.info(f"Async browser pool started with {self.size} browsers, "
+                    f"{self.max_concurrency} concurrent pages")
+
+    async def launch(self):
+        browser = await self.playwright.chromium.launch(headless=self.headless)
+        context = await browser.new_context(user_agent=self.user_agent)
+        if self.resource_blocker:
+            await context.route('**/*', self.resource_blocker.handle_route_async)
+            context.on('response', self.resource_blocker.handle_response)
+        self.stats['launches'] += 1
+        return _AsyncBrowser(browser, context)
+
+    async def acquire(self):
+        """Pick the least busy slot and return a browser ready for a new page"""
+        slot = min(self.slots, key=lambda s: s.current.active if s.current else 0)
+        async with slot.lock:
+            current = slot.current
+            if current is not None and current.served >= self.max_pages_per_browser:
+                self.stats['recycles'] += 1
+                await self.retire(current)
+                slot.current = None
+            elif current is not None and not current.browser.is_connected():
+                logger.warning("Async browser disconnected, restarting")
+                self.stats['restarts'] += 1
+                await self.retire(current)
+                slot.current = None
+            if slot.current is None:
+                with stage_span(self.spans, 'launch'):
+                    slot.current = await self.launch()
+            browser = slot.current
+            browser.served += 1
+            browser.active += 1
+            return browser
+
+    async def retire(self, browser):
+        browser.retired = True
+        if browser.active == 0:
+            await browser.close()
+
+    async def release(self, browser):
+        browser.active -= 1
+        if browser.retired and browser.active == 0:
+            await browser.close()
+
+    async def fetch(self, url, wait_until='load', timeout=30000, wait_for_selector=None):
+        """Load a URL in a new page and return {'status', 'content', 'headers', 'load_time'}"""
+        await self.start()
+        async with self.semaphore:
+            browser = await self.acquire()
+            page = None
+            try:
+                page = await browser.context.new_page()
+                self.stats['pages'] += 1
+                start = time.time()
+                with stage_span(self.spans, 'navigate'):
+                    response = await page.goto(url, wait_until=wait_until, timeout=timeout)
+                    if wait_for_selector and response is not None and response.status == 200:
+                        await wait_for_element_async(page, wait_for_selector, timeout - (time.time() - start) * 1000)
+                with stage_span(self.spans, 'content'):
+                    content = await page.content()
+                load_time = time.time() - start
+                self.stats['load_seconds'] += load_time
+                return {
+                    'status': response.status if response else None,
+                    'content': content,
+                    'headers': response.headers if response else {},
+                    'load_time': load_time,
+                }
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception as e:
+                        logger.debug(f"Error closing page for {url}: {e}")
+                await self.release(browser)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['browsers'] = sum(1 for s in self.slots if s.current is not None)
+        stats['active_pages'] = sum(s.current.active for s in self.slots if s.current is not None)
+        return summarize_stats(stats, self.resource_blocker)
+
+    async def close(self):
+        for slot in self.slots:
+            if slot.current is not None:
+                await slot.current.close()
+                slot.current = None
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+        logger.info(f"Async browser pool closed: {self.get_stats()}")
+
+
+class _AsyncBrowserSlot:
+    def __init__(self):
+        self.current = None
+        self.lock = asyncio.Lock()
+
+
+class _AsyncBrowser:
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.served = 0
+        self.active = 0
+        self.retired = False
+        self.closed = False
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.browser.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser: {e}")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+On-disk crawl checkpoint for the Newsday crawler
+Records completed date pages and the state of every article in SQLite so a
+crashed crawl can resume without recrawling
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+from url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dates (
+    url TEXT PRIMARY KEY,
+    date TEXT,
+    article_count INTEGER,
+    completed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    status TEXT,
+    data TEXT,
+    updated_at TEXT,
+    crawl_date TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_status ON articles (status);
+"""
+
+# What is kept of an article streamed to the output file: enough to queue it
+# again, not its content
+LISTING_FIELDS = ('url', 'title', 'preview_text', 'section', 'crawl_date', 'source_url', 'lastmod')
+
+# Rows read per query by articles(), so the lock isn't held while they're used
+BATCH_SIZE = 1000
+
+
+class CheckpointStore:
+    """SQLite record of completed date pages and pending/fetched articles.
+
+    A date is marked complete together with the article links discovered on
+    it, which are stored as 'pending' until their content has been fetched,
+    so no discovered article is lost if the crawl dies in between.
+
+    An article streamed to the output file is 'written' (only its listing
+    fields are kept) until the stream is next fsynced, when mark_synced()
+    makes it 'done'. Without an output stream the checkpoint is the only
+    durable copy, so record_article() keeps the whole record.
+    """
+
+    def __init__(self, path='newsday_checkpoint.db'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        if 'crawl_date' not in [row[1] for row in self.conn.execute('PRAGMA table_info(articles)')]:
+            # A checkpoint written before articles had a crawl_date column
+            self.conn.execute('ALTER TABLE articles ADD COLUMN crawl_date TEXT')
+        self.conn.commit()
+
+    def reset(self):
+        """Forget all progress (start a fresh crawl)
+
+        The high-water mark goes too: the fresh crawl rewrites the output it
+        describes, and sets a new mark once its dates are done.
+        """
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM dates')
+            self.conn.execute('DELETE FROM articles')
+            self.conn.execute('DELETE FROM meta')
+
+    def record_date(self, date_info, articles):
+        """Mark a date page complete and store its articles as pending"""
+        now = datetime.now().isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO articles (url, status, data, updated_at, crawl_date) VALUES (?, ?, ?, ?, ?)',
+                [(canonicalize_url(a['url']), 'pending', json.dumps(a, ensure_ascii=False), now, a.get('crawl_date'))
+                 for a in articles if a.get('url')]
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO dates (url, date, article_count, completed_at) VALUES (?, ?, ?, ?)',
+                (date_info['url'], date_info['date'], len(articles), now)
+            )
+
+    def record_article(self, article):
+        """Store a fetched article, whole"""
+        if not article.get('url'):
+            return
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO articles (url, status, data, updated_at, crawl_date) VALUES (?, ?, ?, ?, ?)',
+                (canonicalize_url(article['url']), 'done', json.dumps(article, ensure_ascii=False),
+                 datetime.now().isoformat(), article.get('crawl_date'))
+            )
+
+    def record_written(self, article):
+        """Mark a fetched article as written to the (not yet synced) output stream"""
+        if not article.get('url'):
+            return
+        listing = {field: article[field] for field in LISTING_FIELDS if field in article}
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO articles (url, status, data, updated_at, crawl_date) VALUES (?, ?, ?, ?, ?) '
+                "ON CONFLICT (url) DO UPDATE SET status = 'written', updated_at = excluded.updated_at, "
+                'crawl_date = coalesce(excluded.crawl_date, crawl_date)',
+                (canonicalize_url(article['url']), 'written', json.dumps(listing, ensure_ascii=False),
+                 datetime.now().isoformat(), article.get('crawl_date'))
+            )
+
+    def mark_synced(self, offset):
+        """The output stream is on disk up to byte offset: what was written is done"""
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE articles SET status = 'done' WHERE status = 'written'")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_offset', ?)", (str(offset),))
+
+    def settle_written(self, streamed):
+        """After a crash, make 'written' articles whose record is in the stream's
+        unsynced tail (streamed: their canonical URLs) done, and the rest
+        pending again; returns (done, pending) counts"""
+        with self.lock, self.conn:
+            written = [row[0] for row in self.conn.execute("SELECT url FROM articles WHERE status = 'written'")]
+            found = [(url,) for url in written if url in streamed]
+            self.conn.executemany("UPDATE articles SET status = 'done' WHERE url = ?", found)
+            self.conn.execute("UPDATE articles SET status = 'pending' WHERE status = 'written'")
+        return len(found), len(written) - len(found)
+
+    def count(self, status):
+        with self.lock:
+            return self.conn.execute('SELECT count(*) FROM articles WHERE status = ?', (status,)).fetchone()[0]
+
+    def completed_dates(self):
+        """URLs of date pages that were fully discovered"""
+        with self.lock:
+            return set(row[0] for row in self.conn.execute('SELECT url FROM dates'))
+
+    def article_urls(self, before=None):
+        """Canonical URLs of all known articles, pending or done
+
+        With before (a YYYY-MM-DD date), only articles whose crawl_date is
+        earlier, or unknown.
+        """
+        query, params = 'SELECT url FROM articles', ()
+        if before:
+            # Rows from before the crawl_date column only have it in data
+            query += " WHERE coalesce(crawl_date, json_extract(data, '$.crawl_date'), '') < ?"
+            params = (before,)
+        with self.lock:
+            return [row[0] for row in self.conn.execute(query, params)]
+
+    def articles(self, status):
+        """Yield stored article dicts with the given status, BATCH_SIZE rows at a time"""
+        last = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    'SELECT rowid, data FROM articles WHERE status = ? AND rowid > ? ORDER BY rowid LIMIT ?',
+                    (status, last, BATCH_SIZE)).fetchall()
+            for last, data in rows:
+                yield json.loads(data)
+            if len(rows) < BATCH_SIZE:
+                return
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
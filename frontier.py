@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Shared URL frontier for multi-node crawls
+Date and article URLs are leased to crawler nodes for a limited time; nodes
+renew their leases while working, and leases of nodes that die expire so
+another node picks the work up
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    key TEXT PRIMARY KEY,
+    kind TEXT,
+    payload TEXT,
+    state TEXT,
+    owner TEXT,
+    lease_expires REAL,
+    attempts INTEGER DEFAULT 0,
+    error TEXT,
+    updated_at REAL,
+    not_before REAL
+);
+CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, kind, lease_expires);
+"""
+
+# Articles first, so discovered work is finished before more is discovered
+KIND_ORDER = ('article', 'date')
+
+
+class Frontier(ABC):
+    """Interface shared by frontier backends.
+
+    Items are dicts with a 'url'; their key is the canonical URL, so the same
+    page added by several nodes is only crawled once. lease() hands out
+    queued items, or leased ones whose lease has expired, and marks them
+    leased to the node until time.time() + ttl. A failed item given back for
+    another attempt is not leased again until its retry delay is up.
+    """
+
+    @abstractmethod
+    def add(self, kind, items):
+        """Queue items of a kind ('date' or 'article'); returns how many were new"""
+
+    @abstractmethod
+    def lease(self, node_id, limit=1, ttl=300):
+        """Lease up to limit items; returns [(kind, item)]"""
+
+    @abstractmethod
+    def heartbeat(self, node_id, urls, ttl=300):
+        """Extend the node's leases on these URLs"""
+
+    @abstractmethod
+    def complete(self, node_id, url):
+        """Mark an item done; returns False (and changes nothing) if the node's
+        lease was lost, e.g. it expired and another node took the item"""
+
+    @abstractmethod
+    def fail(self, node_id, url, error=None, max_attempts=3, retry_delay=None):
+        """Give the item back for another attempt, or mark it failed after
+        max_attempts; like complete(), only while the node holds the lease
+
+        retry_delay(attempt), with attempt the number of earlier failures,
+        returns the seconds until the item may be leased again, or None to
+        give up on it now. Returns the item's new state ('queued' or
+        'failed'), or None if the lease was lost.
+        """
+
+    @abstractmethod
+    def counts(self):
+        """{state: count} with 'leased' only counting unexpired leases"""
+
+    def is_finished(self):
+        counts = self.counts()
+        return not counts.get('queued') and not counts.get('leased')
+
+    def close(self):
+        pass
+
+
+def next_state(attempts, max_attempts, retry_delay, now):
+    """(state, not_before) for an item failing after `attempts` earlier failures"""
+    delay = retry_delay(attempts) if retry_delay else 0
+    if delay is None or attempts + 1 >= max_attempts:
+        return 'failed', None
+    return 'queued', now + delay
+
+
+class SQLiteFrontier(Frontier):
+    """Frontier in an SQLite file every node can open (e.g. on a shared volume).
+
+    Leasing runs in a BEGIN IMMEDIATE transaction, so two nodes never lease
+    the same item. The rollback journal is used instead of WAL, which needs
+    shared memory and so doesn't work across machines.
+    """
+
+    def __init__(self, path='newsday_frontier.db', timeout=60):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.conn.executescript(SCHEMA)
+        if 'not_before' not in [row[1] for row in self.conn.execute('PRAGMA table_info(frontier)')]:
+            # A frontier file created before failed items waited out a retry delay
+            try:
+                self.conn.execute('ALTER TABLE frontier ADD COLUMN not_before REAL')
+            except sqlite3.OperationalError:
+                pass  # another node added it first
+
+    def _write(self, func):
+        """Run func(conn) in an immediate (write-locked) transaction"""
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = func(self.conn)
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return result
+
+    def add(self, kind, items):
+        now = time.time()
+        rows = [(canonicalize_url(item['url']), kind, json.dumps(item, ensure_ascii=False), now)
+                for item in items if item.get('url')]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO frontier (key, kind, payload, state, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?)", rows)
+            return conn.total_changes - before
+        return self._write(insert)
+
+    def lease(self, node_id, limit=1, ttl=300):
+        def take(conn):
+            now = time.time()
+            leased = []
+            for kind in KIND_ORDER:
+                if len(leased) >= limit:
+                    break
+                rows = conn.execute(
+                    "SELECT key, payload FROM frontier WHERE kind = ? AND "
+                    "((state = 'queued' AND coalesce(not_before, 0) <= ?) "
+                    "OR (state = 'leased' AND lease_expires < ?)) LIMIT ?",
+                    (kind, now, now, limit - len(leased))).fetchall()
+                conn.executemany(
+                    "UPDATE frontier SET state = 'leased', owner = ?, lease_expires = ?, updated_at = ? "
+                    "WHERE key = ?", [(node_id, now + ttl, now, key) for key, _ in rows])
+                leased.extend((kind, json.loads(payload)) for _, payload in rows)
+            return leased
+        return self._write(take)
+
+    def heartbeat(self, node_id, urls, ttl=300):
+        now = time.time()
+        rows = [(now + ttl, now, canonicalize_url(url), node_id) for url in urls]
+        self._write(lambda conn: conn.executemany(
+            "UPDATE frontier SET lease_expires = ?, updated_at = ? "
+            "WHERE key = ? AND owner = ? AND state = 'leased'", rows))
+
+    def complete(self, node_id, url):
+        key = canonicalize_url(url)
+        updated = self._write(lambda conn: conn.execute(
+            "UPDATE frontier SET state = 'done', lease_expires = NULL, updated_at = ? "
+            "WHERE key = ? AND owner = ? AND state = 'leased'",
+            (time.time(), key, node_id)).rowcount)
+        if not updated:
+            logger.warning(f"{node_id} no longer holds the lease on {url}; not marking it done")
+        return bool(updated)
+
+    def fail(self, node_id, url, error=None, max_attempts=3, retry_delay=None):
+        key = canonicalize_url(url)
+
+        def give_back(conn):
+            row = conn.execute("SELECT attempts FROM frontier WHERE key = ? AND owner = ? AND state = 'leased'",
+                               (key, node_id)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            state, not_before = next_state(row[0], max_attempts, retry_delay, now)
+            conn.execute(
+                "UPDATE frontier SET attempts = attempts + 1, error = ?, owner = NULL, lease_expires = NULL, "
+                "state = ?, not_before = ?, updated_at = ? WHERE key = ?",
+                (str(error) if error else None, state, not_before, now, key))
+            return state
+        state = self._write(give_back)
+        if state is None:
+            logger.warning(f"{node_id} no longer holds the lease on {url}; not failing it")
+        return state
+
+    def counts(self):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT CASE WHEN state = 'leased' AND lease_expires < ? THEN 'expired' ELSE state END, "
+                "count(*) FROM frontier GROUP BY 1", (time.time(),)).fetchall()
+        counts = {}
+        for state, count in rows:
+            # Expired leases are up for grabs again
+            state = 'queued' if state == 'expired' else state
+            counts[state] = counts.get(state, 0) + count
+        return counts
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class MemoryFrontier(Frontier):
+    """In-process frontier with the same semantics, for tests and single-host runs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = {}
+
+    def add(self, kind, items):
+        added = 0
+        with self.lock:
+            for item in items:
+                if not item.get('url'):
+                    continue
+                key = canonicalize_url(item['url'])
+                if key not in self.items:
+                    self.items[key] = {'kind': kind, 'payload': dict(item), 'state': 'queued',
+                                       'owner': None, 'lease_expires': None, 'attempts': 0,
+                                       'not_before': None}
+                    added += 1
+        return added
+
+    def _available(self, entry, now):
+        if entry['state'] == 'queued':
+            return (entry['not_before'] or 0) <= now
+        return entry['state'] == 'leased' and entry['lease_expires'] < now
+
+    def lease(self, node_id, limit=1, ttl=300):
+        now = time.time()
+        leased = []
+        with self.lock:
+            for kind in KIND_ORDER:
+                for entry in self.items.values():
+                    if len(leased) >= limit:
+                        return leased
+                    if entry['kind'] == kind and self._available(entry, now):
+                        entry.update(state='leased', owner=node_id, lease_expires=now + ttl)
+                        leased.append((kind, dict(entry['payload'])))
+        return leased
+
+    def heartbeat(self, node_id, urls, ttl=300):
+        now = time.time()
+        with self.lock:
+            for url in urls:
+                entry = self.items.get(canonicalize_url(url))
+                if entry and entry['owner'] == node_id and entry['state'] == 'leased':
+                    entry['lease_expires'] = now + ttl
+
+    def _held(self, node_id, url):
+        # Caller holds the lock
+        entry = self.items.get(canonicalize_url(url))
+        if entry and entry['owner'] == node_id and entry['state'] == 'leased':
+            return entry
+        return None
+
+    def complete(self, node_id, url):
+        with self.lock:
+            entry = self._held(node_id, url)
+            if entry:
+                entry.update(state='done', lease_expires=None)
+        if not entry:
+            logger.warning(f"{node_id} no longer holds the lease on {url}; not marking it done")
+        return entry is not None
+
+    def fail(self, node_id, url, error=None, max_attempts=3, retry_delay=None):
+        with self.lock:
+            entry = self._held(node_id, url)
+            if entry:
+                state, not_before = next_state(entry['attempts'], max_attempts, retry_delay, time.time())
+                entry['attempts'] += 1
+                entry.update(state=state, not_before=not_before, owner=None, lease_expires=None)
+        if not entry:
+            logger.warning(f"{node_id} no longer holds the lease on {url}; not failing it")
+            return None
+        return entry['state']
+
+    def counts(self):
+        now = time.time()
+        counts = {}
+        with self.lock:
+            for entry in self.items.values():
+                state = 'queued' if self._available(entry, now) else entry['state']
+                counts[state] = counts.get(state, 0) + 1
+        return counts
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+HTML parser backends for the Newsday crawler
+Builds BeautifulSoup trees with the fastest tree builder available
+"""
+
+import logging
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+logger = logging.getLogger(__name__)
+
+# Fastest first; 'html.parser' is pure Python and always available
+PARSER_BACKENDS = ('lxml', 'html.parser')
+
+
+def available_backends():
+    """Backends that can actually be used in this environment"""
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', backend)
+        except FeatureNotFound:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def default_backend():
+    return available_backends()[0]
+
+
+class HtmlParser:
+    """Parses pages into BeautifulSoup trees with a configurable tree builder.
+
+    Extraction code only sees the BeautifulSoup API, so switching backend
+    doesn't change what extract_articles_from_page / extract_article_data do.
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            backend = default_backend()
+        elif backend not in available_backends():
+            raise ValueError(f"Parser backend {backend!r} is not available; "
+                             f"choose from {available_backends()}")
+        self.backend = backend
+
+    def parse(self, html):
+        return BeautifulSoup(html, self.backend)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+HTTP validator cache for the Newsday crawler
+Remembers each article's ETag / Last-Modified, a hash of its body and the
+record extracted from it, so recrawls can send conditional requests and
+skip unchanged pages
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+from rate_limiter import get_header
+from url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    record TEXT,
+    fetched_at TEXT
+);
+"""
+
+
+def content_hash(content):
+    return hashlib.sha1((content or '').encode('utf-8', 'replace')).hexdigest()
+
+
+class ValidatorCache:
+    """SQLite map of URL -> (ETag, Last-Modified, content hash, extracted record).
+
+    A 304 (or a 200 whose body hashes the same as last time) means the stored
+    record is still current, so the page is neither downloaded again in full
+    nor re-parsed. Counts are kept per instance, i.e. per run.
+    """
+
+    def __init__(self, path='newsday_http_cache.db'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.stats = {'lookups': 0, 'conditional': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0}
+
+    def lookup(self, url):
+        """Cached entry for a URL ({'etag', 'last_modified', 'content_hash', 'record'}) or None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, content_hash, record FROM validators WHERE url = ?',
+                (canonicalize_url(url),)
+            ).fetchone()
+            self.stats['lookups'] += 1
+            if row and (row[0] or row[1]):
+                self.stats['conditional'] += 1
+        if not row:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2],
+                'record': json.loads(row[3]) if row[3] else None}
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers for a cached entry"""
+        headers = {}
+        if entry and entry.get('record') is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, headers, content, record):
+        """Remember the validators and extracted record of a freshly fetched page"""
+        with self.lock, self.conn:
+            self.stats['changed'] += 1
+            self.conn.execute(
+                'INSERT OR REPLACE INTO validators VALUES (?, ?, ?, ?, ?, ?)',
+                (canonicalize_url(url), get_header(headers, 'ETag'), get_header(headers, 'Last-Modified'),
+                 content_hash(content), json.dumps(record, ensure_ascii=False), datetime.now().isoformat())
+            )
+
+    def record_hit(self, not_modified=True):
+        """Count a page answered from the cache (304, or an identical body)"""
+        with self.lock:
+            self.stats['not_modified' if not_modified else 'unchanged'] += 1
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        answered = stats['not_modified'] + stats['unchanged'] + stats['changed']
+        stats['not_modified_ratio'] = round(stats['not_modified'] / answered, 3) if answered else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Plain-HTTP fetch tier for the Newsday crawler
+Pooled keep-alive requests session used before falling back to a browser
+"""
+
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class HttpFetcher:
+    """Keep-alive, gzip-enabled HTTP client shared by all crawler threads"""
+
+    def __init__(self, user_agent=None, pool_size=10, timeout=30):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.set_pool_size(pool_size)
+        self.session.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+
+    def set_pool_size(self, pool_size):
+        """Keep up to pool_size idle connections per host"""
+        self.pool_size = pool_size
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url, headers=None):
+        """GET a URL and return {'status', 'content', 'headers', 'bytes'}
+
+        Connection errors and timeouts are raised to the caller.
+        """
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return {
+            'status': response.status_code,
+            'content': response.text,
+            'headers': response.headers,
+            'bytes': len(response.content),
+        }
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Negative cache for the Newsday crawler
+Remembers date pages that were missing (404/410) or listed no articles, so
+reruns don't fetch them again while the answer can't have changed
+"""
+
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS negatives (
+    url TEXT PRIMARY KEY,
+    date TEXT,
+    outcome TEXT,
+    status INTEGER,
+    checked_at TEXT
+);
+"""
+
+MISSING = 'missing'
+EMPTY = 'empty'
+# No articles, but the listing may not have been rendered yet when the page
+# was read; looked up as EMPTY
+UNCONFIRMED = 'unconfirmed'
+
+
+def period_end(date):
+    """Last day covered by a date page: the day itself, or a month archive's last day"""
+    if len(date) == 7:
+        return datetime.strptime(date, "%Y-%m") + relativedelta(months=1, days=-1)
+    return datetime.strptime(date, "%Y-%m-%d")
+
+
+class NegativeCache:
+    """SQLite map of date URL -> (outcome, status, when it was checked).
+
+    An entry for a page whose day was more than settle_days old when it was
+    checked never expires: the archive for that day is not going to gain
+    articles. A page checked sooner than that (today's page before anything
+    is published, a late back-fill) is trusted for recent_ttl only, then
+    fetched again. An unconfirmed empty page never settles: it is trusted for
+    unconfirmed_ttl at most. Counts are kept per instance, i.e. per run.
+    """
+
+    def __init__(self, path='newsday_negative_cache.db', settle_days=30, recent_ttl=timedelta(hours=6),
+                 unconfirmed_ttl=timedelta(days=7)):
+        self.path = path
+        self.settle_days = settle_days
+        self.recent_ttl = recent_ttl
+        self.unconfirmed_ttl = unconfirmed_ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.stats = {'lookups': 0, 'hits': 0, 'expired': 0, 'recorded': 0}
+
+    def is_settled(self, date, checked_at):
+        return checked_at - period_end(date) > timedelta(days=self.settle_days)
+
+    def lookup(self, date_info, now=None):
+        """Cached outcome ('missing' or 'empty') for a date page still in date, else None"""
+        now = now or datetime.now()
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT outcome, checked_at FROM negatives WHERE url = ?',
+                (canonicalize_url(date_info['url']),)
+            ).fetchone()
+            self.stats['lookups'] += 1
+            if not row:
+                return None
+            outcome, checked_at = row[0], datetime.fromisoformat(row[1])
+            ttl = self.recent_ttl
+            if self.is_settled(date_info['date'], checked_at):
+                ttl = self.unconfirmed_ttl if outcome == UNCONFIRMED else None
+            if ttl is None or now - checked_at < ttl:
+                self.stats['hits'] += 1
+                return EMPTY if outcome == UNCONFIRMED else outcome
+            self.stats['expired'] += 1
+        return None
+
+    def record(self, date_info, outcome, status=None):
+        """Remember that a date page was missing or listed no articles (see UNCONFIRMED)"""
+        with self.lock, self.conn:
+            self.stats['recorded'] += 1
+            self.conn.execute(
+                'INSERT OR REPLACE INTO negatives VALUES (?, ?, ?, ?, ?)',
+                (canonicalize_url(date_info['url']), date_info['date'], outcome, status,
+                 datetime.now().isoformat())
+            )
+
+    def forget(self, date_info):
+        """Drop the entry of a page that turned out to have articles after all"""
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM negatives WHERE url = ?', (canonicalize_url(date_info['url']),))
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats['hit_ratio'] = round(stats['hits'] / stats['lookups'], 3) if stats['lookups'] else 0.0
+        return stats
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
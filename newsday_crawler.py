@@ -6,34 +6,429 @@ Crawls historical articles from newsday.co.tt going back 15 years
 
 import os
 import json
+import argparse
+import asyncio
 import pandas as pd
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
 from tqdm import tqdm
 import time
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import threading
+import socket
+import queue
 import re
+import shutil
+import tempfile
 from urllib.parse import urljoin, urlparse
 
+from browser_pool import AsyncBrowserPool, BrowserPool
+from http_client import HttpFetcher
+from resource_blocker import ResourceBlocker
+from html_parser import HtmlParser
+from selector_cache import SelectorCache
+from structured_data import head_metadata
+from url_classifier import ArticleUrlClassifier
+from url_utils import SeenUrlSet, canonicalize_url
+from checkpoint import CheckpointStore
+from rate_limiter import THROTTLE_STATUSES, AdaptiveRateLimiter, get_header, parse_retry_after
+from sitemap import SitemapReader, parse_lastmod
+from http_cache import ValidatorCache, content_hash
+from negative_cache import EMPTY, MISSING, UNCONFIRMED, NegativeCache
+from page_store import PageStore
+from parse_pool import ParsePool
+from frontier import SQLiteFrontier
+from metrics import CrawlMetrics, MetricsServer
+from spans import SpanRecorder, stage
+from retry_policy import PERMANENT, DelayedQueue, FetchFailed, RetryPolicy, classify
+from profiler import profile_crawl
+from output_sink import DEFAULT_FORMATS, OUTPUT_FORMATS, JsonlSink, convert_jsonl, iter_jsonl, iter_latest
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class NewsdayCrawler:
-    def __init__(self, headless=False, user_agent=None):
-        self.base_url = "https://newsday.co.tt"
+    # Content selectors, in priority order
+    CONTENT_SELECTORS = [
+        '.article-content', '.entry-content', '.post-content', 
+        '[class*="content"]', '.story-body', 'article'
+    ]
+
+    # What a plain-HTTP article response must contain to count as rendered:
+    # the content selectors minus the catch-all, which app shells match too
+    RENDERED_ARTICLE_SELECTOR = '.article-content, .entry-content, .post-content, .story-body, article'
+
+    # Candidate selectors per article field, highest priority first
+    FIELD_SELECTORS = {
+        'title': ['h1', '.headline', '.title', '[class*="title"]', '[class*="headline"]'],
+        'content': CONTENT_SELECTORS,
+        'author': ['.author', '.byline', '[class*="author"]', '[class*="byline"]'],
+        'date': ['.date', '.published', '[class*="date"]', 'time'],
+        'category': ['.category', '.section', '[class*="category"]'],
+    }
+
+    FETCH_MODES = ('auto', 'http', 'browser')
+
+    DISCOVERY_MODES = ('dates', 'archive', 'sitemap')
+
+    # Pages that are gone for good: no point retrying or escalating them
+    MISSING_STATUSES = (404, 410)
+
+    # Playwright load states a navigation can wait for; 'selector' waits for the
+    # page type's rendered selector and 'selector:<css>' for a specific one
+    WAIT_STATES = ('commit', 'domcontentloaded', 'load', 'networkidle')
+    DEFAULT_WAIT_STRATEGIES = {'date': 'domcontentloaded', 'article': 'selector'}
+
+    def __init__(self, headless=False, user_agent=None, browser_pool_size=None, max_pages_per_browser=200,
+                 fetch_mode='auto', rendered_selectors=None, output_path=None, rate_limiter=None,
+                 parser_backend=None, base_url="https://newsday.co.tt", block_resources=True,
+                 resource_blocker=None, wait_strategies=None, navigation_timeout=30000,
+                 http_cache_path=None, page_store_path=None, parse_workers=None, metrics_port=None,
+                 retry_policy=None, dead_letter_path=None, negative_cache_path=None, metrics_host='127.0.0.1'):
+        self.base_url = base_url.rstrip('/')
         self.articles_data = []
         self.articles_lock = threading.Lock()
         self.headless = headless
         self.user_agent = user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        
-    def generate_date_urls(self, years_back=15):
-        """Generate URLs for date-based crawling"""
+        self.browser_pool_size = browser_pool_size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.browser_pool = None
+        self.pool_lock = threading.Lock()
+        self.browser_stats = {}
+
+        # Only the document (and first-party scripts) is fetched during navigation
+        if resource_blocker is None and block_resources:
+            resource_blocker = ResourceBlocker(first_party_hosts=[urlparse(self.base_url).hostname])
+        self.resource_blocker = resource_blocker
+
+        # Fetch tiers: plain HTTP first, Playwright only when needed
+        if fetch_mode not in self.FETCH_MODES:
+            raise ValueError(f"fetch_mode must be one of {self.FETCH_MODES}")
+        self.fetch_mode = fetch_mode
+        # Date pages have no selector: they look rendered when they link to
+        # an article (see looks_rendered)
+        self.rendered_selectors = {'article': self.RENDERED_ARTICLE_SELECTOR}
+        self.rendered_selectors.update(rendered_selectors or {})
+
+        # How long browser navigation waits before reading the DOM, per page type
+        self.navigation_timeout = navigation_timeout
+        self.wait_strategies = dict(self.DEFAULT_WAIT_STRATEGIES)
+        self.wait_strategies.update(wait_strategies or {})
+        for page_type in self.wait_strategies:
+            self.navigation_options(page_type)
+        self.http_fetcher = HttpFetcher(user_agent=self.user_agent)
+
+        # Which links are on-site articles, and their section
+        self.url_classifier = ArticleUrlClassifier(self.base_url)
+
+        # Which extraction selector works on this site, learned as we go
+        self.selector_cache = SelectorCache()
+
+        # Tree builder used for every page (lxml when installed)
+        self.parser = HtmlParser(parser_backend)
+
+        # With parse_workers, parsing and extraction run in worker processes
+        # instead of the fetch threads (which otherwise contend for the GIL)
+        self.parse_workers = parse_workers
+        self.parse_pool = None
+
+        # Shared per-host pacing for every fetch path
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.fetch_stats = {'http': 0, 'browser': 0, 'escalated': 0}
+        self.stats_lock = threading.Lock()
+
+        # Discovery -> content pipeline state
+        self.article_queue = None
+        self.pipeline_stats = {'dates_done': 0, 'articles_queued': 0, 'articles_done': 0}
+
+        # Articles already fetched this run (the same links appear on many date pages)
+        self.seen_urls = SeenUrlSet()
+
+        # Optional on-disk progress record, opened per crawl
+        self.checkpoint = None
+
+        # With output_path, finished articles stream to a JSON Lines file
+        # instead of accumulating in self.articles_data
+        self.output_path = output_path
+        self.sink = None
+
+        # With http_cache_path, article fetches are conditional on the
+        # validators seen last time and 304s reuse the stored record
+        self.http_cache_path = http_cache_path
+        self.http_cache = None
+        self.http_cache_stats = {}
+
+        # With negative_cache_path, date pages found missing or empty are
+        # not fetched again on later runs until their entry expires
+        self.negative_cache_path = negative_cache_path
+        self.negative_cache = None
+        self.negative_cache_stats = {}
+
+        # With page_store_path, every fetched page body is kept (zstd,
+        # content-addressed) so extraction can be rerun without the network
+        self.page_store_path = page_store_path
+        self.page_store = None
+
+        # Counters and latency histograms, served at /metrics with metrics_port
+        # (on metrics_host, loopback only by default)
+        self.metrics = CrawlMetrics()
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.metrics_server = None
+        self.crawl_started = None
+        self.async_browser_pool = None
+        self.register_gauges()
+
+        # Per-stage timing breakdown of the current run
+        self.spans = SpanRecorder()
+
+        # Which failed fetches are retried, and when; with dead_letter_path,
+        # work given up on is kept in a JSON Lines file for redrive_dead_letters
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.dead_letter_path = dead_letter_path
+        self.dead_letter_sink = None
+
+    def register_gauges(self):
+        """Gauges read from live crawler state at scrape time"""
+        self.metrics.gauge('newsday_queue_depth', "Articles waiting for the content stage",
+                           func=lambda: self.article_queue.qsize() if self.article_queue else 0)
+        self.metrics.gauge('newsday_queue_capacity', "Size bound of the article queue",
+                           func=lambda: self.article_queue.maxsize if self.article_queue else 0)
+        self.metrics.gauge('newsday_browsers', "Browsers running in the pool",
+                           func=lambda: self.get_browser_stats().get('browsers', 0))
+        self.metrics.gauge('newsday_active_pages', "Browser pages currently loading",
+                           func=lambda: self.get_browser_stats().get('active_pages', 0))
+        self.metrics.gauge('newsday_pipeline_items', "Pipeline progress this run", ('stage',),
+                           func=lambda: {(k,): v for k, v in self.get_pipeline_stats().items()
+                                         if k not in ('queue_depth', 'queue_size')})
+        self.metrics.gauge('newsday_request_rate', "Current requests/second allowed per host", ('host',),
+                           func=lambda: {(host,): rate for host, rate in self.rate_limiter.get_rates().items()})
+        self.metrics.gauge('newsday_articles_per_second', "Articles stored per second since the crawl started",
+                           func=self.articles_per_second)
+
+    def articles_per_second(self):
+        if not self.crawl_started:
+            return 0.0
+        return self.metrics.articles.get() / max(time.time() - self.crawl_started, 1e-9)
+
+    def record_fetch(self, tier, status, elapsed, size=0):
+        """Count a fetch (status None for one that raised) and its latency"""
+        self.metrics.fetches.inc(tier=tier, status='error' if status is None else status)
+        self.metrics.fetch_seconds.observe(elapsed, tier=tier)
+        if size:
+            self.metrics.downloaded_bytes.inc(size, tier=tier)
+
+    def get_browser_pool(self):
+        """Return the shared browser pool, starting it on first use"""
+        with self.pool_lock:
+            if self.browser_pool is None:
+                self.browser_pool = BrowserPool(
+                    size=self.browser_pool_size or 2,
+                    headless=self.headless,
+                    user_agent=self.user_agent,
+                    max_pages_per_browser=self.max_pages_per_browser,
+                    resource_blocker=self.resource_blocker,
+                    spans=self.spans
+                )
+                self.browser_pool.start()
+            return self.browser_pool
+
+    def close(self):
+        """Shut down the browser pool and the HTTP tier's pooled connections"""
+        with self.pool_lock:
+            pool, self.browser_pool = self.browser_pool, None
+        if pool:
+            pool.close()
+            self.browser_stats = pool.get_stats()
+        # The session reconnects if the crawler is used again
+        self.http_fetcher.close()
+
+    def get_browser_stats(self):
+        """Browser pool counters: launches, recycles, average page load time and
+        requests blocked / bytes saved by the resource blocker"""
+        with self.pool_lock:
+            pool = self.browser_pool or self.async_browser_pool
+        return pool.get_stats() if pool else dict(self.browser_stats)
+
+    def count_fetch(self, tier):
+        with self.stats_lock:
+            self.fetch_stats[tier] += 1
+
+    def get_fetch_stats(self):
+        """Per-tier fetch counts: pages served by HTTP, by browser, and escalations"""
+        with self.stats_lock:
+            return dict(self.fetch_stats)
+
+    def looks_rendered(self, soup, page_type):
+        """Check that a plain-HTTP response already contains the DOM we need
+
+        Without a rendered selector, a date page counts as rendered when it
+        links to at least one article; navigation and footer links are in an
+        unrendered shell too.
+        """
+        selector = self.rendered_selectors.get(page_type)
+        if selector:
+            return soup.select_one(selector) is not None
+        if page_type == 'date':
+            return any(self.url_classifier.is_article(link['href']) for link in soup.find_all('a', href=True))
+        return True
+
+    def navigation_options(self, page_type):
+        """Browser pool fetch arguments for a page type's wait strategy"""
+        strategy = self.wait_strategies.get(page_type, 'load')
+        options = {'wait_until': strategy, 'timeout': self.navigation_timeout, 'wait_for_selector': None}
+        if strategy == 'selector' or strategy.startswith('selector:'):
+            selector = strategy.partition(':')[2] or self.rendered_selectors.get(page_type)
+            if not selector:
+                raise ValueError(f"No selector to wait for on {page_type} pages")
+            # Wait for the parsed DOM (not the slow 'load' of ads and images),
+            # then only as long as it takes for the element to be rendered
+            options['wait_until'] = 'domcontentloaded'
+            options['wait_for_selector'] = selector
+        elif strategy not in self.WAIT_STATES:
+            raise ValueError(f"Unknown wait strategy {strategy!r} for {page_type} pages")
+        return options
+
+    @stage('fetch')
+    def fetch_page(self, url, page_type, cached=None):
+        """Fetch and parse a page, escalating from plain HTTP to Playwright
+
+        Returns {'status', 'soup', 'tier', 'headers', 'content'}; soup is None
+        for non-200 responses. With a validator cache entry the HTTP request
+        is conditional (see try_http_tier).
+        """
+        # Every page fetched grows the retry budget a little
+        self.retry_policy.record_request()
+        if self.fetch_mode != 'browser':
+            result = self.try_http_tier(url, page_type, cached=cached)
+            if result:
+                return self.archive_page(url, page_type, result)
+
+        with self.spans.span('rate_limit'):
+            self.rate_limiter.acquire(url)
+        start = time.time()
+        try:
+            with self.spans.span('browser'):
+                response = self.get_browser_pool().fetch(url, **self.navigation_options(page_type))
+        except Exception as e:
+            self.rate_limiter.feedback(url, error=e)
+            self.record_fetch('browser', None, time.time() - start)
+            raise
+        self.rate_limiter.feedback(url, response['status'], time.time() - start, response.get('headers'))
+        self.record_fetch('browser', response['status'] or 200, time.time() - start,
+                          len(response['content'].encode('utf-8')) if response.get('content') else 0)
+        return self.archive_page(url, page_type, self.browser_result(response, url, page_type))
+
+    @stage('archive')
+    def archive_page(self, url, page_type, result):
+        """Keep a fetched page body in the page store (when one is open)"""
+        if self.page_store and result['status'] == 200 and result.get('content'):
+            try:
+                self.page_store.put(url, page_type, result['content'])
+            except Exception as e:
+                logger.warning(f"Could not store page {url}: {e}")
+        return result
+
+    def try_http_tier(self, url, page_type, throttle=True, cached=None):
+        """Plain-HTTP tier; returns a fetch result, or None when the page must escalate
+
+        With a cached validator entry, a 304, or a 200 whose body is identical
+        to the cached one, comes back unparsed as {'status': 304 or 200,
+        'soup': None, 'unchanged': True}.
+        """
+        if throttle:
+            with self.spans.span('rate_limit'):
+                self.rate_limiter.acquire(url)
+        start = time.time()
+        try:
+            headers = self.http_cache.conditional_headers(cached) if cached else None
+            with self.spans.span('http'):
+                response = self.http_fetcher.fetch(url, headers=headers)
+            self.rate_limiter.feedback(url, response['status'], time.time() - start, response['headers'])
+            self.record_fetch('http', response['status'], time.time() - start, response.get('bytes', 0))
+        except Exception as e:
+            self.rate_limiter.feedback(url, error=e)
+            self.record_fetch('http', None, time.time() - start)
+            if self.fetch_mode == 'http':
+                raise
+            logger.debug(f"HTTP fetch failed for {url}: {e}")
+            response = None
+
+        if response is not None:
+            status = response['status']
+            result = {'status': status, 'soup': None, 'tier': 'http',
+                      'headers': response['headers'], 'content': response['content']}
+            if cached and cached.get('record') is not None and (
+                    status == 304 or (status == 200 and content_hash(response['content']) == cached['content_hash'])):
+                self.count_fetch('http')
+                result['unchanged'] = True
+                return result
+
+            if status == 200:
+                self.parse_result(url, page_type, result)
+            # Missing pages won't render any better in a browser, and server
+            # errors and throttling aren't worth launching one for
+            if (self.fetch_mode == 'http' or status in self.MISSING_STATUSES or status in THROTTLE_STATUSES
+                    or status >= 500 or result.get('rendered')):
+                self.count_fetch('http')
+                return result
+        self.count_fetch('escalated')
+        return None
+
+    def browser_result(self, response, url=None, page_type=None):
+        """Turn a browser pool response into a fetch result"""
+        self.count_fetch('browser')
+        status = response['status'] or 200
+        result = {'status': status, 'soup': None, 'tier': 'browser',
+                  'headers': response.get('headers'), 'content': response['content']}
+        if status == 200:
+            self.parse_result(url, page_type, result)
+        return result
+
+    def parse_result(self, url, page_type, result):
+        """Parse a 200 fetch result in place
+
+        In-thread this sets 'soup' (extraction happens later, in the caller);
+        with a parse pool the worker process parses and extracts at once and
+        only 'extracted' comes back. Either way 'rendered' says whether the
+        page already has the DOM its type needs.
+        """
+        with self.metrics.parse_seconds.time(page_type=page_type), self.spans.span('parse'):
+            if self.parse_pool:
+                result['rendered'], result['extracted'], stats = self.parse_pool.extract(
+                    url, page_type, result['content'])
+                self.merge_parse_stats(page_type, stats)
+            else:
+                result['soup'] = self.parser.parse(result['content'])
+                result['rendered'] = self.looks_rendered(result['soup'], page_type)
+        return result
+
+    def merge_parse_stats(self, page_type, stats):
+        """Count a parse worker's selector cache use, spans and extraction time as ours
+
+        The worker's spans nest under the current ('parse') span.
+        """
+        self.selector_cache.add_stats(stats['selectors'])
+        extract = stats['spans'].get(('extract',))
+        if extract:
+            self.metrics.extract_seconds.observe(extract['total'], page_type=page_type)
+        self.spans.merge(stats['spans'])
+
+    def extracted(self, url, page_type, result):
+        """Extraction output for a parsed fetch result (see parse_result)"""
+        if 'extracted' in result:
+            return result['extracted']
+        with self.metrics.extract_seconds.time(page_type=page_type), self.spans.span('extract'):
+            if page_type == 'article':
+                return self.extract_article_data(result['soup'], url)
+            return self.extract_articles_from_page(result['soup'], url)
+
+    def generate_date_urls(self, years_back=15, start_date=None):
+        """Generate URLs for date-based crawling, from start_date if given"""
         end_date = datetime.now()
-        start_date = end_date - relativedelta(years=years_back)
+        if start_date is None:
+            start_date = end_date - relativedelta(years=years_back)
         
         urls = []
         current_date = start_date
@@ -49,281 +444,1449 @@ class NewsdayCrawler:
             
         return urls
     
+    def generate_month_urls(self, years_back=15):
+        """Generate WordPress monthly archive URLs (paginated) for archive discovery"""
+        end_date = datetime.now()
+        current_date = (end_date - relativedelta(years=years_back)).replace(day=1)
+
+        urls = []
+        while current_date <= end_date:
+            urls.append({
+                'url': f"{self.base_url}/{current_date.strftime('%Y/%m')}/",
+                'date': current_date.strftime("%Y-%m"),
+                'paginate': True
+            })
+            current_date += relativedelta(months=1)
+
+        return urls
+
+    @stage('crawl_page')
+    def crawl_page_once(self, url):
+        """One attempt at crawl_page; raises FetchFailed instead of retrying"""
+        try:
+            response = self.fetch_page(url, 'date')
+
+            if response['status'] in self.MISSING_STATUSES:
+                # Nothing published that day: an empty (but complete) page
+                return {'articles': [], 'status': response['status']}
+
+            if response['status'] == 200:
+                return {'articles': self.extracted(url, 'date', response),
+                        'tier': response['tier'], 'rendered': response.get('rendered')}
+        except Exception as e:
+            raise FetchFailed.from_error(url, e) from e
+        raise self.response_failure(url, response)
+
     def crawl_page(self, url, max_retries=3):
-        """Crawl a single page using Playwright"""
+        """Crawl a single page over HTTP, falling back to Playwright
+
+        Transient and throttled failures are retried (up to max_retries
+        attempts in all) after the retry policy's backoff, which blocks this
+        thread; the pipeline re-queues failed dates instead (see
+        retry_later). Returns None on failure.
+        """
         for attempt in range(max_retries):
             try:
-                with sync_playwright() as p:
-                    browser = p.chromium.launch(headless=self.headless)
-                    context = browser.new_context(user_agent=self.user_agent)
-                    page = context.new_page()
-                    
-                    # Navigate to the page
-                    response = page.goto(url, wait_until='load', timeout=30000)
-
-                    if response and response.status != 200:
-                        logger.warning(f"HTTP {response.status} for {url}")
-                        browser.close()
-                        continue
-                    
-                    # Get page content
-                    content = page.content()
-                    browser.close()
-                    
-                    # Parse with BeautifulSoup
-                    soup = BeautifulSoup(content, 'html.parser')
-                    articles = self.extract_articles_from_page(soup, url)
-                    
-                    return {'articles': articles}
-                    
-            except Exception as e:
+                return self.crawl_page_once(url)
+            except FetchFailed as e:
                 logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                else:
-                    logger.error(f"Failed to crawl {url} after {max_retries} attempts")
+                delay, reason = self.retry_policy.retry_delay(e, attempt, max_retries)
+                if delay is None:
+                    logger.error(f"Failed to crawl {url} after {attempt + 1} attempts ({reason})")
                     return None
-    
+                self.metrics.retries.inc(page_type='date')
+                time.sleep(delay)
+
+    def response_failure(self, url, response):
+        """FetchFailed for a non-200 response, carrying any Retry-After"""
+        status = response['status']
+        logger.warning(f"HTTP {status} for {url}")
+        return FetchFailed(url, classify(status), status=status,
+                           retry_after=parse_retry_after(get_header(response.get('headers'), 'Retry-After')))
+
     def extract_articles_from_page(self, soup, page_url):
         """Extract articles from a date page using BeautifulSoup"""
         articles = []
-        
+        classify = self.url_classifier.classify
+
         # Look for article links - adjust selectors based on newsday.co.tt structure
-        article_links = soup.find_all('a', href=True)
-        
-        for link in article_links:
-            href = link.get('href')
+        for link in soup.find_all('a', href=True):
+            href = link.get('href').strip()
             if not href:
                 continue
-                
-            # Convert relative URLs to absolute
-            full_url = urljoin(self.base_url, href)
-            
-            # Filter for actual article URLs (adjust pattern as needed)
-            if self.is_article_url(full_url):
-                title = link.get_text(strip=True)
-                if title and len(title) > 10:  # Filter out very short titles
-                    articles.append({
-                        'title': title,
-                        'url': full_url,
-                        'preview_text': title
-                    })
-        
+
+            # Filter for on-site article URLs before doing any other work
+            kind = classify(href)
+            if kind is None:
+                continue
+
+            title = link.get_text(strip=True)
+            if title and len(title) > 10:  # Filter out very short titles
+                articles.append({
+                    'title': title,
+                    'url': urljoin(self.base_url, href),
+                    'preview_text': title,
+                    'section': kind[0]
+                })
+
         return articles
-    
+
     def is_article_url(self, url):
-        """Check if URL looks like an article URL"""
-        # Adjust patterns based on newsday.co.tt URL structure
-        article_patterns = [
-            r'/\d{4}/\d{2}/\d{2}/.+',  # Date-based URLs
-            r'/news/',
-            r'/sports/',
-            r'/features/',
-            r'/editorial/',
-            r'/entertainment/'
-        ]
-        
-        for pattern in article_patterns:
-            if re.search(pattern, url):
-                return True
-        return False
-    
-    def crawl_article_content(self, article_url):
-        """Crawl full content of individual articles"""
+        """Check if URL looks like an on-site article URL (see ArticleUrlClassifier)"""
+        return self.url_classifier.is_article(url)
+
+    @stage('crawl_article_content')
+    def crawl_article_once(self, article_url):
+        """Fetch and extract an article; raises FetchFailed when the fetch fails
+
+        Returns None for a missing (404/410) article.
+        """
+        cached = self.http_cache.lookup(article_url) if self.http_cache else None
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=self.headless)
-                context = browser.new_context(user_agent=self.user_agent)
-                page = context.new_page()
-                
-                response = page.goto(article_url, wait_until='load', timeout=30000)
-                
-                if response and response.status != 200:
-                    browser.close()
-                    return None
-                
-                content = page.content()
-                browser.close()
-                
-                # Parse article content
-                soup = BeautifulSoup(content, 'html.parser')
-                article_data = self.extract_article_data(soup, article_url)
-                
-                return article_data
-                
+            response = self.fetch_page(article_url, 'article', cached)
+
+            if response.get('unchanged') or response['status'] == 200 or response['status'] in self.MISSING_STATUSES:
+                # Parse article content (unless it is unchanged since last time)
+                return self.article_from_response(article_url, response, cached)
         except Exception as e:
+            raise FetchFailed.from_error(article_url, e) from e
+        raise self.response_failure(article_url, response)
+
+    def crawl_article_content(self, article_url):
+        """Crawl full content of individual articles (one attempt; None on failure)"""
+        try:
+            return self.crawl_article_once(article_url)
+        except FetchFailed as e:
             logger.error(f"Failed to crawl article {article_url}: {str(e)}")
             return None
-    
+
+    def article_from_response(self, article_url, response, cached=None):
+        """Extracted record for an article fetch, reusing the cached one when unchanged"""
+        if response.get('unchanged'):
+            self.http_cache.record_hit(not_modified=response['status'] == 304)
+            return cached['record']
+
+        if response['status'] != 200:
+            return None
+
+        article_data = self.extracted(article_url, 'article', response)
+        if self.http_cache:
+            self.http_cache.store(article_url, response.get('headers'), response.get('content'), article_data)
+        return article_data
+
     def extract_article_data(self, soup, url):
-        """Extract structured data from article page"""
+        """Extract structured data from article page
+
+        Metadata comes from JSON-LD / OpenGraph tags in <head> when present.
+        Other fields (always the content) take the first of their
+        FIELD_SELECTORS that matches; the selector cache remembers the winner
+        per site so usually only that one is tried.
+        """
         data = {'url': url}
-        
-        # Extract title
-        title_selectors = ['h1', '.headline', '.title', '[class*="title"]', '[class*="headline"]']
-        for selector in title_selectors:
-            title_elem = soup.select_one(selector)
-            if title_elem:
-                data['title'] = title_elem.get_text(strip=True)
-                break
-        
-        # Extract content
-        content_selectors = [
-            '.article-content', '.entry-content', '.post-content', 
-            '[class*="content"]', '.story-body', 'article'
-        ]
-        for selector in content_selectors:
-            content_elem = soup.select_one(selector)
-            if content_elem:
+        host = urlparse(url).netloc
+        with self.spans.span('head_metadata'):
+            metadata = head_metadata(soup)
+
+        for field, selectors in self.FIELD_SELECTORS.items():
+            if metadata.get(field):
+                data[field] = metadata[field]
+                continue
+
+            with self.spans.span('selectors'):
+                elem = self.selector_cache.select(soup, host, field, selectors)
+            if elem is None:
+                continue
+
+            if field == 'content':
                 # Remove script and style elements
-                for script in content_elem(["script", "style"]):
+                for script in elem(["script", "style"]):
                     script.decompose()
-                data['content'] = content_elem.get_text(separator='\n', strip=True)
-                break
-        
-        # Extract author
-        author_selectors = ['.author', '.byline', '[class*="author"]', '[class*="byline"]']
-        for selector in author_selectors:
-            author_elem = soup.select_one(selector)
-            if author_elem:
-                data['author'] = author_elem.get_text(strip=True)
-                break
-        
-        # Extract date
-        date_selectors = ['.date', '.published', '[class*="date"]', 'time']
-        for selector in date_selectors:
-            date_elem = soup.select_one(selector)
-            if date_elem:
-                date_text = date_elem.get('datetime') or date_elem.get_text(strip=True)
-                data['date'] = date_text
-                break
-        
-        # Extract category
-        category_selectors = ['.category', '.section', '[class*="category"]']
-        for selector in category_selectors:
-            cat_elem = soup.select_one(selector)
-            if cat_elem:
-                data['category'] = cat_elem.get_text(strip=True)
-                break
-        
+                data['content'] = elem.get_text(separator='\n', strip=True)
+            elif field == 'date':
+                data['date'] = elem.get('datetime') or elem.get_text(strip=True)
+            else:
+                data[field] = elem.get_text(strip=True)
+
         return data
-    
+
+    @stage('store')
+    def store_article(self, article):
+        """Keep a finished article and record it in the checkpoint
+
+        A streamed article's record lives in the output file, so the
+        checkpoint only tracks its state (see stream_synced).
+        """
+        if self.sink:
+            self.sink.write(article)
+            if self.checkpoint:
+                self.checkpoint.record_written(article)
+        else:
+            with self.articles_lock:
+                self.articles_data.append(article)
+            if self.checkpoint:
+                self.checkpoint.record_article(article)
+        self.metrics.articles.inc()
+
+    def stream_synced(self, offset):
+        """Output stream callback after an fsync: what was written is on disk"""
+        if self.checkpoint:
+            self.checkpoint.mark_synced(offset)
+
+    def recover_unsynced(self):
+        """Settle articles streamed after the last fsync of a crawl that died
+
+        Only the stream's tail past the last synced offset is read. Articles
+        whose record made it there are done; the rest are pending again.
+        """
+        offset = int(self.checkpoint.get_meta('synced_offset', 0))
+        streamed = set()
+        if os.path.exists(self.sink.path) and os.path.getsize(self.sink.path) >= offset:
+            streamed = set(canonicalize_url(r['url']) for r in iter_jsonl(self.sink.path, offset) if r.get('url'))
+        done, lost = self.checkpoint.settle_written(streamed)
+        if done or lost:
+            logger.info(f"Output stream past its last fsync: {done} articles found, {lost} to fetch again")
+
+    def known_empty(self, date_info):
+        """True (and the date recorded as done) when the negative cache still
+        has the date page down as missing or empty"""
+        if not self.negative_cache or not self.negative_cache.lookup(date_info):
+            return False
+        self.record_date(date_info, [])
+        return True
+
+    def remember_date_outcome(self, date_info, result):
+        """Keep a missing or empty date page in the negative cache
+
+        A page only counts as empty for good when it looked rendered (see
+        looks_rendered). A plain-HTTP page without article links may just be
+        a shell whose listing is filled in by JavaScript, so it isn't cached;
+        neither may a browser have filled it in by the time the date page
+        wait strategy (DOM-ready by default) let it be read, so an unrendered
+        browser page is only cached as UNCONFIRMED, which expires.
+        """
+        if not self.negative_cache:
+            return
+        if result.get('status') in self.MISSING_STATUSES:
+            self.negative_cache.record(date_info, MISSING, result['status'])
+        elif result.get('articles'):
+            self.negative_cache.forget(date_info)
+        elif result.get('rendered'):
+            self.negative_cache.record(date_info, EMPTY, 200)
+        elif result.get('tier') == 'browser':
+            self.negative_cache.record(date_info, UNCONFIRMED, 200)
+
+    def record_date(self, date_info, articles):
+        """Mark a date page as discovered in the checkpoint"""
+        if self.checkpoint:
+            self.checkpoint.record_date(date_info, articles)
+
+    def open_checkpoint(self, checkpoint_path, resume, date_urls):
+        """Open the checkpoint for a crawl and work out what is left to do
+
+        Returns (remaining date URLs, articles discovered but not yet fetched).
+        """
+        if not resume:
+            # Nothing is seen yet, even by a crawler that has crawled before
+            self.seen_urls = SeenUrlSet()
+        if resume and not checkpoint_path:
+            checkpoint_path = 'newsday_checkpoint.db'
+        if not checkpoint_path:
+            self.checkpoint = None
+            return date_urls, []
+
+        self.checkpoint = CheckpointStore(checkpoint_path)
+        if not resume:
+            self.checkpoint.reset()
+            return date_urls, []
+
+        done_dates = self.checkpoint.completed_dates()
+        remaining = [d for d in date_urls if d['url'] not in done_dates]
+        if self.sink:
+            # The stream may be missing the last few unsynced records
+            self.recover_unsynced()
+        else:
+            for article in self.checkpoint.articles('done'):
+                with self.articles_lock:
+                    self.articles_data.append(article)
+        fetched = self.checkpoint.count('done')
+        pending = list(self.checkpoint.articles('pending'))
+        self.seen_urls = SeenUrlSet(self.checkpoint.article_urls())
+        logger.info(f"Resuming from {checkpoint_path}: {len(date_urls) - len(remaining)} dates and "
+                    f"{fetched} articles already done, {len(pending)} articles pending")
+        return remaining, pending
+
+    def open_sink(self, resume=False):
+        """Open the streaming output file, appending to it when resuming"""
+        if self.output_path:
+            self.sink = JsonlSink(self.output_path, append=resume, on_sync=self.stream_synced)
+            logger.info(f"Streaming articles to {self.output_path}")
+
+    def open_http_cache(self):
+        """Open the validator cache for a crawl (counts start from zero each run)"""
+        if self.http_cache_path and self.http_cache is None:
+            self.http_cache = ValidatorCache(self.http_cache_path)
+
+    def close_http_cache(self):
+        if self.http_cache:
+            self.http_cache_stats = self.http_cache.get_stats()
+            logger.info(f"HTTP validator cache: {self.http_cache_stats}")
+            self.http_cache.close()
+            self.http_cache = None
+
+    def open_negative_cache(self):
+        if self.negative_cache_path and self.negative_cache is None:
+            self.negative_cache = NegativeCache(self.negative_cache_path)
+
+    def close_negative_cache(self):
+        if self.negative_cache:
+            self.negative_cache_stats = self.negative_cache.get_stats()
+            logger.info(f"Negative cache: {self.negative_cache_stats}")
+            self.negative_cache.close()
+            self.negative_cache = None
+
+    def open_page_store(self):
+        if self.page_store_path and self.page_store is None:
+            self.page_store = PageStore(self.page_store_path)
+            logger.info(f"Storing raw pages in {self.page_store_path}")
+
+    def close_page_store(self):
+        if self.page_store:
+            self.page_store.close()
+            self.page_store = None
+
+    def open_metrics(self):
+        """Start the articles/sec clock and, with metrics_port, the /metrics endpoint"""
+        self.crawl_started = time.time()
+        if self.metrics_port is not None and self.metrics_server is None:
+            self.metrics_server = MetricsServer(self.metrics, self.metrics_port, self.metrics_host).start()
+
+    def close_metrics(self):
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def open_dead_letters(self):
+        if self.dead_letter_path and self.dead_letter_sink is None:
+            self.dead_letter_sink = JsonlSink(self.dead_letter_path)
+
+    def close_dead_letters(self):
+        if self.dead_letter_sink:
+            if self.dead_letter_sink.count:
+                logger.warning(f"{self.dead_letter_sink.count} dead letters in {self.dead_letter_path}; "
+                               f"retry them with --redrive")
+            self.dead_letter_sink.close()
+            self.dead_letter_sink = None
+
+    def open_parse_pool(self):
+        if self.parse_workers and self.parse_pool is None:
+            options = {'base_url': self.base_url, 'parser_backend': self.parser.backend,
+                       'rendered_selectors': self.rendered_selectors, 'block_resources': False}
+            self.parse_pool = ParsePool(self.parse_workers, type(self), options)
+            logger.info(f"Parsing in {self.parse_workers} worker processes")
+
+    def close_parse_pool(self):
+        if self.parse_pool:
+            self.parse_pool.close()
+            self.parse_pool = None
+
+    def close_sink(self):
+        if self.sink:
+            self.sink.close()
+            self.sink = None
+
+    def article_count(self):
+        """Number of articles collected so far"""
+        if self.sink:
+            return self.sink.count
+        return len(self.articles_data)
+
+    def close_checkpoint(self):
+        if self.checkpoint:
+            self.checkpoint.close()
+            self.checkpoint = None
+
+    @stage('process_date_batch')
     def process_date_batch(self, date_info, delay=0.5):
-        """Process a single date URL"""
+        """Process a single date URL
+
+        delay seeds the rate limiter's starting interval between requests to a host.
+        """
+        self.rate_limiter.set_initial_interval(delay)
         try:
+            if self.known_empty(date_info):
+                return 0
             result = self.crawl_page(date_info['url'])
             batch_articles = []
-            
+            if result is not None:
+                self.remember_date_outcome(date_info, result)
+
             if result and result.get('articles'):
-                articles = result['articles']
-                
-                for article in articles:
+                articles = []
+                for article in result['articles']:
+                    # Skip articles already fetched from another date page
+                    if article.get('url') and not self.seen_urls.add(article['url']):
+                        continue
+
                     article['crawl_date'] = date_info['date']
                     article['source_url'] = date_info['url']
-                    
+                    articles.append(article)
+
+                self.record_date(date_info, articles)
+
+                for article in articles:
                     # Get full article content if URL is available
                     if article.get('url'):
                         full_content = self.crawl_article_content(article['url'])
                         if full_content:
                             article.update(full_content)
-                        
-                        # Small delay between article requests
-                        time.sleep(0.1)
                     
+                    # Thread-safe addition to main articles list
+                    self.store_article(article)
                     batch_articles.append(article)
-                
-                # Thread-safe addition to main articles list
-                with self.articles_lock:
-                    self.articles_data.extend(batch_articles)
                     
                 logger.info(f"Found {len(batch_articles)} articles for {date_info['date']}")
-            
-            # Rate limiting per thread
-            time.sleep(delay)
+            elif result is not None:
+                self.record_date(date_info, [])
+
             return len(batch_articles)
             
         except Exception as e:
             logger.error(f"Error processing {date_info['date']}: {str(e)}")
             return 0
     
-    def crawl_historical_data(self, years_back=15, max_workers=2, delay=0.5):
-        """Main method to crawl historical data with concurrent processing"""
+    def new_articles(self, date_info, page_articles):
+        """Annotate a listing page's articles, dropping ones already seen this run"""
+        articles = []
+        for article in page_articles or []:
+            # Skip articles already fetched from another date page
+            if article.get('url') and not self.seen_urls.add(article['url']):
+                continue
+
+            article['crawl_date'] = date_info['date']
+            article['source_url'] = date_info['url']
+            articles.append(article)
+        return articles
+
+    @stage('discover_date')
+    def discover_date(self, date_info, article_queue, max_pages=50):
+        """Pipeline stage 1: find article links on a date page and queue them
+
+        Archive pages (date_info['paginate']) are followed through /page/N/
+        until a page is missing or yields no new articles. Returns the number
+        of articles queued. Raises FetchFailed when the date page itself
+        can't be fetched, for the caller to retry later; returns None on
+        other errors.
+        """
+        try:
+            if self.known_empty(date_info):
+                with self.stats_lock:
+                    self.pipeline_stats['dates_done'] += 1
+                return 0
+
+            result = self.crawl_page_once(date_info['url'])
+            self.remember_date_outcome(date_info, result)
+            articles = self.new_articles(date_info, result.get('articles'))
+
+            if date_info.get('paginate'):
+                found = articles
+                for page in range(2, max_pages + 1):
+                    if not found:
+                        break
+                    next_page = self.crawl_page(f"{date_info['url']}page/{page}/", max_retries=1)
+                    found = self.new_articles(date_info, next_page and next_page.get('articles'))
+                    articles.extend(found)
+
+            # Record before queueing so a crash can't lose discovered links
+            self.record_date(date_info, articles)
+
+            queued = 0
+            for article in articles:
+                # Blocks while the content stage is behind (backpressure)
+                article_queue.put(article)
+                queued += 1
+
+            if queued:
+                logger.info(f"Found {queued} articles for {date_info['date']}")
+
+            with self.stats_lock:
+                self.pipeline_stats['dates_done'] += 1
+                self.pipeline_stats['articles_queued'] += queued
+
+            return queued
+
+        except FetchFailed:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing {date_info['date']}: {str(e)}")
+            return None
+
+    def discover_sitemaps(self, article_queue, start_date, since=None):
+        """Pipeline stage 1 for sitemap discovery: stream article URLs from the
+        site's sitemaps straight onto the article queue"""
+        reader = SitemapReader(self.http_fetcher.session, self.rate_limiter)
+        roots = reader.find_sitemaps(self.base_url)
+        if not roots:
+            logger.error(f"No sitemaps found for {self.base_url}")
+            return 0
+        logger.info(f"Reading sitemaps: {roots}")
+
+        done = self.checkpoint.completed_dates() if self.checkpoint else set()
+        since = parse_lastmod(since) if isinstance(since, str) else since
+        queued = 0
+        batch = []
+        with tqdm(desc="Reading sitemaps", unit=" articles") as pbar:
+            for kind, loc, lastmod, sitemap_url in reader.walk(roots, since=since, skip=done):
+                if kind == 'end':
+                    # Sitemap fully read: record it (and its articles as pending)
+                    self.record_date({'url': sitemap_url, 'date': 'sitemap'}, batch)
+                    with self.stats_lock:
+                        self.pipeline_stats['dates_done'] += 1
+                    batch = []
+                    continue
+
+                if not self.is_article_url(loc):
+                    continue
+                published = self.url_date(loc) or lastmod
+                if published and published < start_date:
+                    continue
+                if not self.seen_urls.add(loc):
+                    continue
+
+                article = {
+                    'url': loc,
+                    'lastmod': lastmod.isoformat() if lastmod else None,
+                    'crawl_date': published.strftime("%Y-%m-%d") if published else None,
+                    'source_url': sitemap_url
+                }
+                batch.append(article)
+                article_queue.put(article)
+                queued += 1
+                with self.stats_lock:
+                    self.pipeline_stats['articles_queued'] += 1
+                pbar.update(1)
+                if queued % 100 == 0:
+                    pbar.set_postfix({'articles': self.article_count(), 'queue': article_queue.qsize()})
+
+        return queued
+
+    def url_date(self, url):
+        """Publication date encoded in a /YYYY/MM/DD/ article URL, if any"""
+        match = re.search(r'/(\d{4})/(\d{2})/(\d{2})/', url)
+        if not match:
+            return None
+        try:
+            return datetime(*map(int, match.groups()))
+        except ValueError:
+            return None
+
+    def date_worker(self, date_queue, article_queue, progress=None):
+        """Pipeline stage 1 worker: discover queued dates until a None sentinel
+
+        A date page that fails goes back on date_queue after its backoff
+        (see retry_later), freeing this worker for other dates meanwhile.
+        progress is called once per date finished or given up on.
+        """
+        while True:
+            date_info = date_queue.get()
+            try:
+                if date_info is None:
+                    return
+
+                try:
+                    self.discover_date(date_info, article_queue)
+                except FetchFailed as e:
+                    if self.retry_later(date_queue, date_info, e, 'date'):
+                        continue
+                else:
+                    self.retry_policy.forget(date_info['url'])
+
+                if progress:
+                    progress()
+
+            except Exception as e:
+                logger.error(f"Error with {date_info['date']}: {str(e)}")
+            finally:
+                date_queue.task_done()
+
+    def article_worker(self, article_queue):
+        """Pipeline stage 2: fetch full content for queued articles until a None sentinel"""
+        while True:
+            article = article_queue.get()
+            try:
+                if article is None:
+                    return
+
+                if article.get('url'):
+                    try:
+                        full_content = self.crawl_article_once(article['url'])
+                    except FetchFailed as e:
+                        # Back on the queue for later, or into the dead letters
+                        self.retry_later(article_queue, article, e, 'article')
+                        continue
+                    self.retry_policy.forget(article['url'])
+                    if full_content:
+                        article.update(full_content)
+
+                self.store_article(article)
+                with self.stats_lock:
+                    self.pipeline_stats['articles_done'] += 1
+
+            except Exception as e:
+                logger.error(f"Error fetching article {article.get('url')}: {str(e)}")
+            finally:
+                article_queue.task_done()
+
+    def retry_later(self, work_queue, item, failure, page_type):
+        """Put failed work back on its DelayedQueue after the retry policy's backoff
+
+        Returns False, after dead-lettering the item, when the failure is
+        permanent, the item is out of attempts or the crawl out of retry budget.
+        """
+        delay, reason, attempts = self.retry_policy.schedule(item['url'], failure)
+        if delay is None:
+            self.dead_letter(page_type, item, failure, reason, attempts)
+            return False
+        logger.info(f"Retrying {item['url']} in {delay:.1f}s ({failure.kind}: {str(failure)})")
+        self.metrics.retries.inc(page_type=page_type)
+        work_queue.put_later(item, delay)
+        return True
+
+    def dead_letter(self, page_type, item, failure, reason, attempts):
+        """Keep work given up on in the dead-letter file (see redrive_dead_letters)
+
+        Nothing is stored or checkpointed for it, so --resume tries it again too.
+        """
+        logger.error(f"Giving up on {item['url']} after {attempts} attempts ({reason}): {str(failure)}")
+        self.metrics.dead_letters.inc(page_type=page_type, reason=reason)
+        if self.dead_letter_sink:
+            self.dead_letter_sink.write({
+                'page_type': page_type,
+                'url': item['url'],
+                'kind': failure.kind,
+                'reason': reason,
+                'status': failure.status,
+                'error': str(failure),
+                'attempts': attempts,
+                'failed_at': datetime.now().isoformat(),
+                'item': item,
+            })
+
+    def get_pipeline_stats(self):
+        """Progress of both pipeline stages, including current queue depth"""
+        with self.stats_lock:
+            stats = dict(self.pipeline_stats)
+        article_queue = self.article_queue
+        stats['queue_depth'] = article_queue.qsize() if article_queue else 0
+        stats['queue_size'] = article_queue.maxsize if article_queue else 0
+        return stats
+
+    def crawl_historical_data(self, years_back=15, max_workers=2, delay=0.5,
+                              article_workers=None, queue_size=1000,
+                              checkpoint_path=None, resume=False, discovery='dates', since=None):
+        """Main method to crawl historical data with a two-stage pipeline
+
+        max_workers threads discover article links on date pages and feed a
+        bounded queue; article_workers threads (default: max_workers) drain it
+        and fetch full article content. Requests are paced per host by the
+        shared adaptive rate limiter, starting at one request per `delay`
+        seconds. With checkpoint_path, progress is recorded on disk;
+        resume=True skips dates and articles already done.
+
+        discovery picks how article URLs are found: 'dates' (one page per
+        day), 'archive' (paginated monthly archives) or 'sitemap' (XML
+        sitemaps, optionally only entries modified on or after `since`).
+        """
+        if discovery not in self.DISCOVERY_MODES:
+            raise ValueError(f"discovery must be one of {self.DISCOVERY_MODES}")
         logger.info(f"Starting crawl for {years_back} years of data from newsday.co.tt")
-        logger.info(f"Using {max_workers} concurrent workers")
-        
-        # Generate date URLs
+
+        # Generate date URLs (archive months; none up front for sitemaps)
+        if discovery == 'dates':
+            date_urls = self.generate_date_urls(years_back)
+        elif discovery == 'archive':
+            date_urls = self.generate_month_urls(years_back)
+        else:
+            date_urls = []
+        logger.info(f"Discovering articles via {discovery}: {len(date_urls)} listing URLs to crawl")
+        all_dates = date_urls
+
+        sitemap_start = None
+        if discovery == 'sitemap':
+            sitemap_start = datetime.now() - relativedelta(years=years_back)
+        try:
+            article_workers = self.prepare_crawl(delay, max_workers, article_workers, queue_size)
+            self.open_sink(resume)
+            date_urls, pending = self.open_checkpoint(checkpoint_path, resume, date_urls)
+            self.run_pipeline(date_urls, pending, max_workers, article_workers, queue_size,
+                              sitemap_start, since)
+            if self.checkpoint and discovery == 'dates':
+                # So a later crawl_incremental picks up where this backfill ended
+                mark = self.advance_high_water_mark(all_dates, self.checkpoint.get_meta('high_water_mark'))
+                logger.info(f"High-water mark is now {mark}")
+        finally:
+            self.finish_crawl()
+
+    def crawl_incremental(self, recheck_days=3, max_workers=2, delay=0.5, article_workers=None,
+                          queue_size=1000, checkpoint_path='newsday_checkpoint.db', years_back=15):
+        """Crawl only what appeared since the last run
+
+        The checkpoint keeps a high-water mark (the last date whose page, and
+        every page before it, was fully discovered) and every known article.
+        Only dates after the mark are crawled, plus the last `recheck_days`
+        before it, whose articles are fetched again to pick up late edits.
+        Without a mark (or completed dates in the checkpoint to work one out
+        from) this is a full `years_back` crawl that sets one.
+        """
+        if not checkpoint_path:
+            raise ValueError("crawl_incremental needs a checkpoint_path")
+        try:
+            article_workers = self.prepare_crawl(delay, max_workers, article_workers, queue_size)
+            self.checkpoint = CheckpointStore(checkpoint_path)
+
+            mark = self.checkpoint.get_meta('high_water_mark')
+            if not mark and self.checkpoint.completed_dates():
+                # A checkpoint written before full crawls kept a mark
+                mark = self.advance_high_water_mark(self.generate_date_urls(years_back), None)
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            if mark:
+                start_date = datetime.strptime(mark, "%Y-%m-%d") + timedelta(days=1 - recheck_days)
+                logger.info(f"Last run reached {mark}; crawling from {start_date:%Y-%m-%d}")
+            else:
+                start_date = today - relativedelta(years=years_back)
+                logger.info(f"No high-water mark in {checkpoint_path}; crawling {years_back} years")
+            date_urls = self.generate_date_urls(start_date=min(start_date, today))
+
+            self.open_sink(resume=True)
+            if self.sink:
+                self.recover_unsynced()
+
+            # Articles from before the recheck window are never fetched again
+            window = date_urls[0]['date']
+            self.seen_urls = SeenUrlSet(self.checkpoint.article_urls(before=window))
+            pending = list(self.checkpoint.articles('pending'))
+            for article in pending:
+                self.seen_urls.add(article['url'])
+            logger.info(f"{len(self.seen_urls)} known articles skipped, {len(pending)} pending, "
+                        f"{len(date_urls)} dates to crawl")
+
+            self.run_pipeline(date_urls, pending, max_workers, article_workers, queue_size)
+            mark = self.advance_high_water_mark(date_urls, mark)
+            logger.info(f"High-water mark is now {mark}")
+        finally:
+            self.finish_crawl()
+        return mark
+
+    def advance_high_water_mark(self, date_urls, mark):
+        """Move the mark to the last date before the first one still incomplete"""
+        done = self.checkpoint.completed_dates()
+        for date_info in date_urls:
+            if date_info['url'] not in done:
+                break
+            if not mark or date_info['date'] > mark:
+                mark = date_info['date']
+        if mark:
+            self.checkpoint.set_meta('high_water_mark', mark)
+        return mark
+
+    def redrive_dead_letters(self, path=None, max_workers=2, delay=0.5, article_workers=None,
+                             queue_size=1000, checkpoint_path=None):
+        """Crawl the dates and articles in the dead-letter file again
+
+        The file is moved aside (to <path>.redrive) first, so whatever fails
+        again is dead-lettered afresh; an interrupted re-drive is picked up
+        by the next one. Returns the number of entries re-driven.
+        """
+        path = path or self.dead_letter_path
+        if not path:
+            raise ValueError("redrive_dead_letters needs a dead-letter path")
+        redrive_path = f"{path}.redrive"
+        if os.path.exists(path):
+            if os.path.exists(redrive_path):
+                with open(path, encoding='utf-8') as f, open(redrive_path, 'a', encoding='utf-8') as out:
+                    out.write(f.read())
+                os.remove(path)
+            else:
+                os.replace(path, redrive_path)
+        if not os.path.exists(redrive_path):
+            logger.info(f"No dead letters in {path}")
+            return 0
+
+        entries = list(iter_jsonl(redrive_path))
+        date_urls = [entry['item'] for entry in entries if entry['page_type'] == 'date']
+        pending = [entry['item'] for entry in entries if entry['page_type'] == 'article']
+        logger.info(f"Re-driving {len(date_urls)} dates and {len(pending)} articles from {path}")
+
+        self.dead_letter_path = path
+        try:
+            article_workers = self.prepare_crawl(delay, max_workers, article_workers, queue_size)
+            if checkpoint_path:
+                self.checkpoint = CheckpointStore(checkpoint_path)
+                # Articles already known don't get queued again from a re-driven date page
+                self.seen_urls = SeenUrlSet(self.checkpoint.article_urls())
+            for article in pending:
+                self.seen_urls.add(article['url'])
+            self.open_sink(resume=True)
+            self.run_pipeline(date_urls, pending, max_workers, article_workers, queue_size)
+        finally:
+            self.finish_crawl()
+        os.remove(redrive_path)
+        return len(entries)
+
+    def crawl_frontier(self, frontier, node_id=None, years_back=15, workers=4, delay=0.5,
+                       discovery='dates', lease_ttl=300, lease_batch=2, poll_interval=5, max_attempts=3):
+        """Crawl as one node of a multi-node crawl sharing a frontier
+
+        Every node seeds the frontier with the same date (or archive) URLs,
+        which is a no-op once they are there, then leases work from it:
+        articles found on a leased date page go back into the frontier for
+        any node to fetch. Leases last lease_ttl seconds and are renewed
+        while held, so the work of a node that dies is picked up by the
+        others once its leases expire. Returns when nothing is left queued
+        or leased. Each node writes its own output file.
+        """
+        if discovery not in ('dates', 'archive'):
+            raise ValueError("crawl_frontier supports 'dates' and 'archive' discovery")
+        node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        if discovery == 'dates':
+            date_urls = self.generate_date_urls(years_back)
+        else:
+            date_urls = self.generate_month_urls(years_back)
+        added = frontier.add('date', date_urls)
+        logger.info(f"Node {node_id}: seeded {added} of {len(date_urls)} listing URLs "
+                    f"(frontier: {frontier.counts()})")
+
+        with self.stats_lock:
+            self.pipeline_stats = {'dates_done': 0, 'articles_queued': 0, 'articles_done': 0}
+        held = set()
+        held_lock = threading.Lock()
+        stopped = threading.Event()
+
+        def heartbeat():
+            while not stopped.wait(lease_ttl / 3):
+                with held_lock:
+                    urls = list(held)
+                try:
+                    frontier.heartbeat(node_id, urls, lease_ttl)
+                except Exception as e:
+                    logger.warning(f"Lease heartbeat failed: {str(e)}")
+
+        def work():
+            while not stopped.is_set():
+                leased = frontier.lease(node_id, lease_batch, lease_ttl)
+                if not leased:
+                    if frontier.is_finished():
+                        return
+                    # Other nodes still hold work (and may add articles)
+                    stopped.wait(poll_interval)
+                    continue
+                with held_lock:
+                    held.update(item['url'] for _, item in leased)
+                for kind, item in leased:
+                    try:
+                        self.crawl_frontier_item(frontier, node_id, kind, item, max_attempts)
+                    finally:
+                        with held_lock:
+                            held.discard(item['url'])
+
+        heartbeat_thread = threading.Thread(target=heartbeat, name='lease-heartbeat', daemon=True)
+        heartbeat_thread.start()
+        try:
+            self.prepare_crawl(delay, workers, workers, 0)
+            self.open_sink(resume=True)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='frontier') as executor:
+                for future in [executor.submit(work) for _ in range(workers)]:
+                    future.result()
+        finally:
+            stopped.set()
+            heartbeat_thread.join()
+            logger.info(f"Node {node_id}: {self.get_pipeline_stats()}, frontier: {frontier.counts()}")
+            self.finish_crawl()
+
+    def crawl_frontier_item(self, frontier, node_id, kind, item, max_attempts=3):
+        """Crawl one leased date page or article and report the outcome to the frontier"""
+        try:
+            if kind == 'date':
+                found = queue.Queue()
+                if self.discover_date(item, found) is None:
+                    raise FetchFailed(item['url'], PERMANENT, error="date page could not be crawled")
+                articles = [found.get_nowait() for _ in range(found.qsize())]
+                frontier.add('article', articles)
+            else:
+                full_content = self.crawl_article_once(item['url'])
+                if full_content:
+                    item.update(full_content)
+                self.store_article(item)
+                with self.stats_lock:
+                    self.pipeline_stats['articles_done'] += 1
+            frontier.complete(node_id, item['url'])
+        except Exception as e:
+            failure = FetchFailed.from_error(item['url'], e)
+            logger.warning(f"Failed to crawl {item['url']}: {str(failure)}")
+            self.fail_frontier_item(frontier, node_id, kind, item, failure, max_attempts)
+
+    def fail_frontier_item(self, frontier, node_id, kind, item, failure, max_attempts):
+        """Give a failed item back to the frontier under the retry policy
+
+        No node leases it again until its backoff (jittered, honouring
+        Retry-After) is up. Once the policy gives up on it (permanent failure,
+        max_attempts across all nodes, or this node's retry budget spent) it
+        is marked failed and dead-lettered.
+        """
+        outcome = {}
+
+        def retry_delay(attempt):
+            delay, reason = self.retry_policy.retry_delay(failure, attempt, max_attempts)
+            outcome.update(attempts=attempt + 1, delay=delay, reason=reason or 'attempts')
+            return delay
+
+        state = frontier.fail(node_id, item['url'], failure, max_attempts, retry_delay)
+        if state == 'failed':
+            self.dead_letter(kind, item, failure, outcome['reason'], outcome['attempts'])
+        elif state == 'queued':
+            logger.info(f"Retrying {item['url']} in {outcome['delay']:.1f}s ({failure.kind}: {str(failure)})")
+            self.metrics.retries.inc(page_type=kind)
+
+    def prepare_crawl(self, delay, max_workers, article_workers, queue_size):
+        """Common setup for the threaded crawls; returns the article worker count"""
+        self.rate_limiter.set_initial_interval(delay)
+        article_workers = article_workers or max_workers
+        logger.info(f"Using {max_workers} date workers and {article_workers} article workers "
+                    f"(queue size {queue_size})")
+        if self.browser_pool_size is None:
+            # One pooled browser per article worker unless configured otherwise
+            self.browser_pool_size = article_workers
+        self.open_http_cache()
+        self.open_negative_cache()
+        self.open_page_store()
+        self.open_parse_pool()
+        self.open_metrics()
+        self.open_dead_letters()
+        self.spans.reset()
+        return article_workers
+
+    def run_pipeline(self, date_urls, pending, max_workers, article_workers, queue_size,
+                     sitemap_start=None, since=None):
+        """Run the discovery and content stages until every date URL is done
+
+        pending articles are queued first; with sitemap_start, article URLs
+        are also read from the site's sitemaps.
+        """
+        self.article_queue = DelayedQueue(maxsize=queue_size)
+        date_queue = DelayedQueue()
+        for date_info in date_urls:
+            date_queue.put(date_info)
+        with self.stats_lock:
+            self.pipeline_stats = {'dates_done': 0, 'articles_queued': 0, 'articles_done': 0}
+
+        with ThreadPoolExecutor(max_workers=article_workers, thread_name_prefix='article') as article_executor:
+            consumers = [
+                article_executor.submit(self.article_worker, self.article_queue)
+                for _ in range(article_workers)
+            ]
+
+            try:
+                # Articles discovered before a crash go first
+                for article in pending:
+                    self.article_queue.put(article)
+
+                if sitemap_start is not None:
+                    self.discover_sitemaps(self.article_queue, sitemap_start, since)
+
+                # Track progress
+                with tqdm(total=len(date_urls), desc="Crawling dates", disable=not date_urls) as pbar:
+                    progress_lock = threading.Lock()
+
+                    def progress():
+                        with progress_lock:
+                            pbar.set_postfix({'articles': self.article_count(),
+                                              'queue': self.article_queue.qsize()})
+                            pbar.update(1)
+
+                    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='date') as executor:
+                        workers = [
+                            executor.submit(self.date_worker, date_queue, self.article_queue, progress)
+                            for _ in range(max_workers)
+                        ]
+                        try:
+                            # Every date discovered or given up on, retries included
+                            date_queue.join()
+                        finally:
+                            for _ in workers:
+                                date_queue.put(None)
+            finally:
+                # Let the content stage drain (waiting retries too), then stop it
+                self.article_queue.join()
+                for _ in consumers:
+                    self.article_queue.put(None)
+                date_queue.close()
+                self.article_queue.close()
+
+        logger.info(f"Pipeline: {self.get_pipeline_stats()}")
+
+    def finish_crawl(self):
+        """Release browsers, checkpoint and output stream, and log run totals"""
+        self.close()
+        # The sink's last fsync marks its articles done in the checkpoint
+        self.close_sink()
+        self.close_checkpoint()
+        self.close_http_cache()
+        self.close_negative_cache()
+        self.close_page_store()
+        self.close_parse_pool()
+        self.close_metrics()
+        self.close_dead_letters()
+        logger.info(f"Fetch tiers: {self.get_fetch_stats()}")
+        logger.info(f"Retries: {self.retry_policy.get_stats()}")
+        logger.info(f"Selector cache: {self.selector_cache.get_stats()}")
+        logger.info(f"Skipped {self.seen_urls.duplicates} duplicate article fetches")
+        logger.info(f"Final request rates (req/s per host): {self.rate_limiter.get_rates()}")
+        logger.info(f"Stage breakdown:\n{self.spans.report()}")
+
+    def crawl_historical_data_async(self, years_back=15, concurrency=50, browsers=2, delay=0.5,
+                                    checkpoint_path=None, resume=False):
+        """Crawl historical data on a single asyncio event loop
+
+        Alternative to crawl_historical_data: many concurrent pages over a few
+        browsers instead of one blocking browser session per thread.
+        """
+        self.rate_limiter.set_initial_interval(delay)
+        return asyncio.run(self._crawl_historical_data_async(
+            years_back, concurrency, browsers, checkpoint_path, resume))
+
+    async def _crawl_historical_data_async(self, years_back, concurrency, browsers,
+                                           checkpoint_path, resume):
+        logger.info(f"Starting async crawl for {years_back} years of data from newsday.co.tt")
+        logger.info(f"Using {browsers} browsers with up to {concurrency} concurrent fetches")
+
         date_urls = self.generate_date_urls(years_back)
         logger.info(f"Generated {len(date_urls)} date URLs to crawl")
-        
-        # Process URLs concurrently
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all tasks
-            future_to_date = {
-                executor.submit(self.process_date_batch, date_info, delay): date_info 
-                for date_info in date_urls
-            }
-            
-            # Track progress
-            with tqdm(total=len(date_urls), desc="Crawling dates") as pbar:
-                for future in as_completed(future_to_date):
-                    date_info = future_to_date[future]
+
+        pool = AsyncBrowserPool(
+            size=browsers,
+            headless=self.headless,
+            user_agent=self.user_agent,
+            max_pages_per_browser=self.max_pages_per_browser,
+            max_concurrency=concurrency,
+            resource_blocker=self.resource_blocker,
+            spans=self.spans
+        )
+        self.async_browser_pool = pool
+        # Blocking HTTP fetches run on this executor; size it to the concurrency
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        if self.http_fetcher.pool_size < concurrency:
+            self.http_fetcher.set_pool_size(concurrency)
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(executor)
+
+        try:
+            self.open_sink(resume)
+            self.open_http_cache()
+            self.open_negative_cache()
+            self.open_page_store()
+            self.open_parse_pool()
+            self.open_metrics()
+            self.open_dead_letters()
+            self.spans.reset()
+            date_urls, pending = self.open_checkpoint(checkpoint_path, resume, date_urls)
+
+            date_queue = asyncio.Queue()
+            for date_info in date_urls:
+                date_queue.put_nowait(date_info)
+            # Articles discovered before a crash go to their own workers, a
+            # fixed number of tasks however many are pending
+            article_queue = asyncio.Queue()
+            for article in pending:
+                article_queue.put_nowait(article)
+
+            async def article_worker():
+                while True:
                     try:
-                        article_count = future.result()
-                        pbar.set_postfix({'articles': len(self.articles_data)})
-                    except Exception as e:
-                        logger.error(f"Error with {date_info['date']}: {str(e)}")
-                    pbar.update(1)
-    
-    def save_data(self, filename_prefix="newsday_articles"):
-        """Save crawled data to various formats"""
+                        article = article_queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await self.fetch_article_async(article, pool)
+
+            with tqdm(total=len(date_urls), desc="Crawling dates") as pbar:
+                async def worker():
+                    while True:
+                        try:
+                            date_info = date_queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            return
+                        await self.process_date_batch_async(date_info, pool)
+                        pbar.set_postfix({'articles': self.article_count()})
+                        pbar.update(1)
+
+                await asyncio.gather(
+                    *(article_worker() for _ in range(min(concurrency, len(pending)))),
+                    *(worker() for _ in range(concurrency))
+                )
+        finally:
+            await pool.close()
+            self.http_fetcher.close()
+            self.browser_stats = pool.get_stats()
+            self.async_browser_pool = None
+            self.close_sink()
+            self.close_checkpoint()
+            self.close_http_cache()
+            self.close_negative_cache()
+            self.close_page_store()
+            self.close_parse_pool()
+            self.close_metrics()
+            self.close_dead_letters()
+            executor.shutdown(wait=False)
+            logger.info(f"Fetch tiers: {self.get_fetch_stats()}")
+            logger.info(f"Skipped {self.seen_urls.duplicates} duplicate article fetches")
+            logger.info(f"Final request rates (req/s per host): {self.rate_limiter.get_rates()}")
+            logger.info(f"Stage breakdown:\n{self.spans.report()}")
+
+    @stage('fetch')
+    async def fetch_page_async(self, url, page_type, pool, cached=None):
+        """Async counterpart of fetch_page using an AsyncBrowserPool"""
+        self.retry_policy.record_request()
+        if self.fetch_mode != 'browser':
+            with self.spans.span('rate_limit'):
+                await self.rate_limiter.acquire_async(url)
+            result = await asyncio.to_thread(self.try_http_tier, url, page_type, False, cached)
+            if result:
+                return await asyncio.to_thread(self.archive_page, url, page_type, result)
+
+        with self.spans.span('rate_limit'):
+            await self.rate_limiter.acquire_async(url)
+        start = time.time()
+        try:
+            with self.spans.span('browser'):
+                response = await pool.fetch(url, **self.navigation_options(page_type))
+        except Exception as e:
+            self.rate_limiter.feedback(url, error=e)
+            self.record_fetch('browser', None, time.time() - start)
+            raise
+        self.rate_limiter.feedback(url, response['status'], time.time() - start, response.get('headers'))
+        self.record_fetch('browser', response['status'] or 200, time.time() - start,
+                          len(response['content'].encode('utf-8')) if response.get('content') else 0)
+        # Parsing blocks, so keep it off the event loop
+        result = await asyncio.to_thread(self.browser_result, response, url, page_type)
+        # So is compressing and writing the page store blob
+        return await asyncio.to_thread(self.archive_page, url, page_type, result)
+
+    @stage('crawl_page')
+    async def crawl_page_once_async(self, url, pool):
+        """Async counterpart of crawl_page_once"""
+        try:
+            response = await self.fetch_page_async(url, 'date', pool)
+
+            if response['status'] in self.MISSING_STATUSES:
+                return {'articles': [], 'status': response['status']}
+
+            if response['status'] == 200:
+                # Extraction is CPU-bound; keep it off the event loop
+                return {'articles': await asyncio.to_thread(self.extracted, url, 'date', response),
+                        'tier': response['tier'], 'rendered': response.get('rendered')}
+        except Exception as e:
+            raise FetchFailed.from_error(url, e) from e
+        raise self.response_failure(url, response)
+
+    async def crawl_page_async(self, url, pool, max_retries=3):
+        """Async counterpart of crawl_page"""
+        for attempt in range(max_retries):
+            try:
+                return await self.crawl_page_once_async(url, pool)
+            except FetchFailed as e:
+                logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
+                delay, reason = self.retry_policy.retry_delay(e, attempt, max_retries)
+                if delay is None:
+                    logger.error(f"Failed to crawl {url} after {attempt + 1} attempts ({reason})")
+                    return None
+                self.metrics.retries.inc(page_type='date')
+                # Only this task waits; the event loop carries on with the others
+                await asyncio.sleep(delay)
+
+    async def retry_async(self, item, page_type, attempt):
+        """Await attempt() until it succeeds, waiting out the retry policy's
+        backoff between tries (only this task waits)
+
+        Returns (result, True), or (None, False) once the item has been
+        dead-lettered, as retry_later does for the threaded pipeline.
+        """
+        while True:
+            try:
+                result = await attempt()
+            except FetchFailed as e:
+                delay, reason, attempts = self.retry_policy.schedule(item['url'], e)
+                if delay is None:
+                    self.dead_letter(page_type, item, e, reason, attempts)
+                    return None, False
+                logger.info(f"Retrying {item['url']} in {delay:.1f}s ({e.kind}: {str(e)})")
+                self.metrics.retries.inc(page_type=page_type)
+                await asyncio.sleep(delay)
+                continue
+            self.retry_policy.forget(item['url'])
+            return result, True
+
+    @stage('crawl_article_content')
+    async def crawl_article_once_async(self, article_url, pool):
+        """Async counterpart of crawl_article_once"""
+        cached = self.http_cache.lookup(article_url) if self.http_cache else None
+        try:
+            response = await self.fetch_page_async(article_url, 'article', pool, cached)
+
+            if response.get('unchanged') or response['status'] == 200 or response['status'] in self.MISSING_STATUSES:
+                return await asyncio.to_thread(self.article_from_response, article_url, response, cached)
+        except Exception as e:
+            raise FetchFailed.from_error(article_url, e) from e
+        raise self.response_failure(article_url, response)
+
+    async def crawl_article_content_async(self, article_url, pool):
+        """Async counterpart of crawl_article_content"""
+        try:
+            return await self.crawl_article_once_async(article_url, pool)
+        except FetchFailed as e:
+            logger.error(f"Failed to crawl article {article_url}: {str(e)}")
+            return None
+
+    async def fetch_article_async(self, article, pool):
+        """Fill in full content for a discovered article and store it
+
+        Failed fetches are retried after a backoff; returns None when the
+        article was dead-lettered instead of stored.
+        """
+        if article.get('url'):
+            full_content, fetched = await self.retry_async(
+                article, 'article', lambda: self.crawl_article_once_async(article['url'], pool))
+            if not fetched:
+                return None
+            if full_content:
+                article.update(full_content)
+        # The sink write (and its periodic fsync) blocks
+        await asyncio.to_thread(self.store_article, article)
+        return article
+
+    @stage('process_date_batch')
+    async def process_date_batch_async(self, date_info, pool):
+        """Process a single date URL, fetching its articles concurrently"""
+        try:
+            if await asyncio.to_thread(self.known_empty, date_info):
+                return 0
+            result, fetched = await self.retry_async(
+                date_info, 'date', lambda: self.crawl_page_once_async(date_info['url'], pool))
+            batch_articles = []
+
+            if fetched:
+                await asyncio.to_thread(self.remember_date_outcome, date_info, result)
+                # Skip articles already fetched from another date page
+                articles = [
+                    article for article in result.get('articles') or []
+                    if not article.get('url') or self.seen_urls.add(article['url'])
+                ]
+                for article in articles:
+                    article['crawl_date'] = date_info['date']
+                    article['source_url'] = date_info['url']
+                await asyncio.to_thread(self.record_date, date_info, articles)
+
+                stored = await asyncio.gather(*(self.fetch_article_async(a, pool) for a in articles))
+                batch_articles = [article for article in stored if article is not None]
+
+                if batch_articles:
+                    logger.info(f"Found {len(batch_articles)} articles for {date_info['date']}")
+
+            return len(batch_articles)
+
+        except Exception as e:
+            logger.error(f"Error processing {date_info['date']}: {str(e)}")
+            return 0
+
+    def save_data(self, filename_prefix="newsday_articles", formats=DEFAULT_FORMATS):
+        """Save crawled data to various formats ('parquet' needs pyarrow)"""
+        if self.output_path and os.path.exists(self.output_path):
+            return self.save_stream(filename_prefix, formats)
+
         if not self.articles_data:
             logger.warning("No data to save")
             return
+        unknown = set(formats) - set(OUTPUT_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown output formats: {sorted(unknown)}")
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        outputs = {}
         
         # Save as JSON
-        json_filename = f"{filename_prefix}_{timestamp}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(self.articles_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved {len(self.articles_data)} articles to {json_filename}")
+        if 'json' in formats:
+            outputs['json'] = f"{filename_prefix}_{timestamp}.json"
+            with open(outputs['json'], 'w', encoding='utf-8') as f:
+                json.dump(self.articles_data, f, indent=2, ensure_ascii=False)
+            logger.info(f"Saved {len(self.articles_data)} articles to {outputs['json']}")
         
-        # Save as CSV
         df = pd.DataFrame(self.articles_data)
-        csv_filename = f"{filename_prefix}_{timestamp}.csv"
-        df.to_csv(csv_filename, index=False, encoding='utf-8')
-        logger.info(f"Saved data to {csv_filename}")
+
+        # Save as CSV
+        if 'csv' in formats:
+            outputs['csv'] = f"{filename_prefix}_{timestamp}.csv"
+            df.to_csv(outputs['csv'], index=False, encoding='utf-8')
+            logger.info(f"Saved data to {outputs['csv']}")
         
         # Save as Excel
-        excel_filename = f"{filename_prefix}_{timestamp}.xlsx"
-        df.to_excel(excel_filename, index=False, engine='openpyxl')
-        logger.info(f"Saved data to {excel_filename}")
+        if 'excel' in formats:
+            outputs['excel'] = f"{filename_prefix}_{timestamp}.xlsx"
+            df.to_excel(outputs['excel'], index=False, engine='openpyxl')
+            logger.info(f"Saved data to {outputs['excel']}")
+
+        # Save as Parquet
+        if 'parquet' in formats:
+            outputs['parquet'] = f"{filename_prefix}_{timestamp}.parquet"
+            df.to_parquet(outputs['parquet'], index=False, engine='pyarrow')
+            logger.info(f"Saved data to {outputs['parquet']}")
         
-        return {
-            'json': json_filename,
-            'csv': csv_filename,
-            'excel': excel_filename,
-            'total_articles': len(self.articles_data)
-        }
-
-def main():
+        outputs['total_articles'] = len(self.articles_data)
+        return outputs
+
+    def save_stream(self, filename_prefix="newsday_articles", formats=DEFAULT_FORMATS):
+        """Convert the streamed JSON Lines output into other formats"""
+        self.close_sink()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        outputs = convert_jsonl(self.output_path, f"{filename_prefix}_{timestamp}", formats)
+        outputs['jsonl'] = self.output_path
+        outputs['total_articles'] = sum(1 for _ in iter_latest(self.output_path))
+        return outputs
+
+# Files a crawl keeps between runs, by command line option
+STATE_PATHS = {
+    'http_cache': 'newsday_http_cache.db',
+    'negative_cache': 'newsday_negative_cache.db',
+    'pages': 'newsday_pages',
+    'dead_letters': 'newsday_dead_letters.jsonl',
+}
+
+
+def state_path(args, option, scratch=None):
+    """Path for one of STATE_PATHS, or None when disabled with ''
+
+    Unless the option was given, the default name is used, inside scratch
+    when there is one.
+    """
+    value = getattr(args, option)
+    if value is None:
+        value = STATE_PATHS[option]
+        if scratch:
+            value = os.path.join(scratch, value)
+    return value or None
+
+
+def parse_args(argv=None):
+    """Command line options for main()"""
+    parser = argparse.ArgumentParser(description="Crawl historical articles from newsday.co.tt")
+    parser.add_argument('--checkpoint', default='newsday_checkpoint.db',
+                        help="SQLite file recording crawl progress")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip dates and articles already recorded in the checkpoint")
+    parser.add_argument('--output', default='newsday_articles.jsonl',
+                        help="JSON Lines file articles are streamed to as they complete")
+    parser.add_argument('--formats', nargs='+', choices=OUTPUT_FORMATS, default=list(DEFAULT_FORMATS),
+                        help="Formats the articles are saved in after the crawl (parquet needs pyarrow)")
+    parser.add_argument('--http-cache',
+                        help="SQLite file of ETag/Last-Modified validators for conditional refetches "
+                             f"(default: {STATE_PATHS['http_cache']}; '' to disable)")
+    parser.add_argument('--negative-cache',
+                        help="SQLite file of date pages found missing or empty, skipped on reruns "
+                             f"(default: {STATE_PATHS['negative_cache']}; '' to disable)")
+    parser.add_argument('--pages',
+                        help="Directory raw pages are stored in for reextract.py "
+                             f"(default: {STATE_PATHS['pages']}; '' to disable)")
+    parser.add_argument('--parse-workers', type=int,
+                        help="Parse and extract pages in this many processes (default: in the fetch threads)")
+    parser.add_argument('--discovery', choices=NewsdayCrawler.DISCOVERY_MODES, default='dates',
+                        help="Find articles from daily date pages, monthly archives or XML sitemaps")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only crawl dates after the checkpoint's high-water mark (nightly runs)")
+    parser.add_argument('--recheck-days', type=int, default=3,
+                        help="With --incremental, also refetch articles from this many already-crawled days")
+    parser.add_argument('--since',
+                        help="With --discovery sitemap, only entries modified on or after this date")
+    parser.add_argument('--dead-letters',
+                        help="JSON Lines file dates and articles that failed for good are written to "
+                             f"(default: {STATE_PATHS['dead_letters']}; '' to disable)")
+    parser.add_argument('--redrive', action='store_true',
+                        help="Crawl the dates and articles in --dead-letters again instead of a full crawl")
+    parser.add_argument('--frontier',
+                        help="SQLite file (on a volume every node can reach) to share the crawl between "
+                             "nodes through; each node runs with the same --frontier")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics at http://<host>:PORT/metrics while crawling")
+    parser.add_argument('--metrics-host', default='127.0.0.1',
+                        help="Interface the metrics endpoint listens on (0.0.0.0 for all; default: loopback only)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Crawl a random sample of dates under cProfile and tracemalloc and write "
+                             "profile and flame-graph files instead of doing a full crawl")
+    parser.add_argument('--profile-dates', type=int, default=7, help="With --profile, how many dates to crawl")
+    parser.add_argument('--profile-output', default='newsday_profile',
+                        help="With --profile, path prefix of the files written")
+    parser.add_argument('--node-id', help="With --frontier, this node's name (default: host-pid)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function to run the crawler"""
+    args = parse_args(argv)
+    # A profile run keeps its sample of articles out of the real output, and
+    # its caches, pages and dead letters in a scratch directory unless given
+    scratch = tempfile.mkdtemp(prefix='newsday_profile_') if args.profile else None
     try:
         # Initialize crawler with Playwright
-        crawler = NewsdayCrawler(headless=True)
+        crawler = NewsdayCrawler(headless=True, output_path=None if args.profile else args.output,
+                                 http_cache_path=state_path(args, 'http_cache', scratch),
+                                 negative_cache_path=state_path(args, 'negative_cache', scratch),
+                                 page_store_path=state_path(args, 'pages', scratch),
+                                 parse_workers=args.parse_workers,
+                                 metrics_port=args.metrics_port,
+                                 metrics_host=args.metrics_host,
+                                 dead_letter_path=state_path(args, 'dead_letters', scratch))
 
-        # Crawl 15 years of data with 5 concurrent workers
-        crawler.crawl_historical_data(years_back=15, max_workers=5, delay=0.5)
+        if args.profile:
+            try:
+                paths = profile_crawl(crawler, dates=args.profile_dates, prefix=args.profile_output,
+                                      max_workers=5, delay=0.5)
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+            print(f"\nProfile written:")
+            for kind, path in paths.items():
+                print(f"  - {kind}: {path}")
+            return
+
+        if args.redrive:
+            # Only what failed for good last time
+            crawler.redrive_dead_letters(max_workers=5, delay=0.5, checkpoint_path=args.checkpoint)
+        elif args.frontier:
+            # One node of a multi-node crawl; dates and articles are leased from the frontier
+            frontier = SQLiteFrontier(args.frontier)
+            try:
+                crawler.crawl_frontier(frontier, node_id=args.node_id, years_back=15, workers=5,
+                                       delay=0.5, discovery=args.discovery)
+            finally:
+                frontier.close()
+        elif args.incremental:
+            # Only what is new since the last run
+            crawler.crawl_incremental(recheck_days=args.recheck_days, max_workers=5, delay=0.5,
+                                      checkpoint_path=args.checkpoint)
+        else:
+            # Crawl 15 years of data with 5 concurrent workers
+            crawler.crawl_historical_data(years_back=15, max_workers=5, delay=0.5,
+                                          checkpoint_path=args.checkpoint, resume=args.resume,
+                                          discovery=args.discovery, since=args.since)
         
         # Save results
-        results = crawler.save_data()
+        results = crawler.save_data(formats=args.formats)
         
         print(f"\nCrawling completed!")
+        if not results:
+            print("No articles collected")
+            return
         print(f"Total articles collected: {results['total_articles']}")
+        print(f"Duplicate article fetches avoided: {crawler.seen_urls.duplicates}")
         print(f"Files saved:")
-        print(f"  - JSON: {results['json']}")
-        print(f"  - CSV: {results['csv']}")
-        print(f"  - Excel: {results['excel']}")
+        # Only a streamed crawl (--output) has a JSON Lines file
+        for key, label in (('jsonl', 'JSON Lines'), ('json', 'JSON'), ('csv', 'CSV'),
+                           ('excel', 'Excel'), ('parquet', 'Parquet')):
+            if results.get(key):
+                print(f"  - {label}: {results[key]}")
         
     except Exception as e:
         logger.error(f"Crawler failed: {str(e)}")
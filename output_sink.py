@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Streaming output for the Newsday crawler
+Appends each finished article to a JSON Lines file and converts the stream
+to JSON/CSV/Excel/Parquet afterwards without loading it all into memory
+"""
+
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Formats convert_jsonl writes by default, and all it can write (parquet
+# needs the optional pyarrow package)
+DEFAULT_FORMATS = ('json', 'csv', 'excel')
+OUTPUT_FORMATS = DEFAULT_FORMATS + ('parquet',)
+
+
+class JsonlSink:
+    """Thread-safe append-only JSON Lines writer with periodic fsync
+
+    on_sync(offset) is called after every fsync, still holding the write
+    lock, with the file's size: every record written so far is on disk.
+    """
+
+    def __init__(self, path, append=True, fsync_every=100, on_sync=None):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.on_sync = on_sync
+        self.lock = threading.Lock()
+        self.count = count_lines(path) if append and os.path.exists(path) else 0
+        self.unsynced = 0
+        torn = append and ends_mid_line(path)
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+        if torn:
+            # Don't glue the next record onto a line cut short by a crash
+            self.file.write('\n')
+
+    def write(self, article):
+        line = json.dumps(article, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.count += 1
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every:
+                self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        if self.on_sync:
+            self.on_sync(os.fstat(self.file.fileno()).st_size)
+
+    def flush(self):
+        with self.lock:
+            self._sync()
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self._sync()
+                self.file.close()
+
+
+def ends_mid_line(path):
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return False
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b'\n'
+
+
+def count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
+def iter_jsonl(path, offset=0):
+    """Yield article dicts from a JSON Lines file, skipping a torn last line
+
+    With offset, reading starts at that byte (the start of a line), and line
+    numbers in warnings count from there.
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                logger.warning(f"Skipping unreadable line {number} in {path}")
+
+
+def iter_latest(path):
+    """Yield each article once, as its last record in the file
+
+    Incremental runs append a fresh copy of every rechecked article, so an
+    article can appear several times; records are matched by canonical URL.
+    Records without a URL are all kept.
+    """
+    last = {}
+    for index, record in enumerate(iter_jsonl(path)):
+        if record.get('url'):
+            last[canonicalize_url(record['url'])] = index
+    for index, record in enumerate(iter_jsonl(path)):
+        if not record.get('url') or last[canonicalize_url(record['url'])] == index:
+            yield record
+
+
+def iter_chunks(path, chunksize):
+    chunk = []
+    for record in iter_latest(path):
+        chunk.append(record)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def jsonl_columns(path):
+    """Union of keys across all records, in first-seen order"""
+    columns = {}
+    for record in iter_latest(path):
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def convert_jsonl(path, filename_prefix, formats=DEFAULT_FORMATS, chunksize=5000):
+    """Convert a JSON Lines stream into other formats, one chunk at a time
+
+    Each article is written once, from its latest record (see iter_latest).
+    Returns a dict mapping each format to the file written.
+    """
+    columns = jsonl_columns(path)
+    outputs = {}
+
+    for fmt in formats:
+        if fmt == 'json':
+            filename = f"{filename_prefix}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write('[\n')
+                for i, record in enumerate(iter_latest(path)):
+                    if i:
+                        f.write(',\n')
+                    f.write(json.dumps(record, indent=2, ensure_ascii=False))
+                f.write('\n]\n')
+
+        elif fmt == 'csv':
+            filename = f"{filename_prefix}.csv"
+            header = True
+            with open(filename, 'w', encoding='utf-8', newline='') as f:
+                for chunk in iter_chunks(path, chunksize):
+                    df = pd.DataFrame(chunk).reindex(columns=columns)
+                    df.to_csv(f, index=False, header=header)
+                    header = False
+                if header:
+                    pd.DataFrame(columns=columns).to_csv(f, index=False)
+
+        elif fmt == 'excel':
+            from openpyxl import Workbook
+
+            filename = f"{filename_prefix}.xlsx"
+            # Write-only mode streams rows to disk instead of building the sheet in memory
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(columns)
+            for record in iter_latest(path):
+                sheet.append([_cell(record.get(column)) for column in columns])
+            workbook.save(filename)
+
+        elif fmt == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+
+            filename = f"{filename_prefix}.parquet"
+            schema = pa.schema([(column, pa.string()) for column in columns])
+            with pq.ParquetWriter(filename, schema) as writer:
+                for chunk in iter_chunks(path, chunksize):
+                    rows = {column: [_cell(r.get(column)) for r in chunk] for column in columns}
+                    writer.write_table(pa.table(rows, schema=schema))
+
+        else:
+            raise ValueError(f"Unknown output format: {fmt}")
+
+        outputs[fmt] = filename
+        logger.info(f"Saved data to {filename}")
+
+    return outputs
+
+
+def _cell(value):
+    """Flatten non-scalar values (e.g. tag lists) for tabular formats"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Raw page store for the Newsday crawler
+Keeps every fetched page as a zstd-compressed, content-addressed blob with a
+SQLite index by URL and fetch time, so extraction can be rerun offline
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetches (
+    url TEXT,
+    page_type TEXT,
+    status INTEGER,
+    digest TEXT,
+    fetched_at TEXT
+);
+CREATE INDEX IF NOT EXISTS fetches_url ON fetches (url, fetched_at);
+CREATE INDEX IF NOT EXISTS fetches_time ON fetches (fetched_at);
+"""
+
+
+class PageStore:
+    """Directory of compressed page bodies named by their SHA-256.
+
+    Identical bodies (the same page fetched twice, or mirrored URLs) are
+    stored once; the index records every fetch. Layout:
+    <root>/objects/ab/abcdef....zst and <root>/index.db.
+    """
+
+    def __init__(self, root='newsday_pages', level=3):
+        self.root = root
+        self.level = level
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _codecs(self):
+        # zstd (de)compressor objects must not be shared between threads
+        if not hasattr(self.local, 'compressor'):
+            self.local.compressor = zstandard.ZstdCompressor(level=self.level)
+            self.local.decompressor = zstandard.ZstdDecompressor()
+        return self.local.compressor, self.local.decompressor
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], f"{digest}.zst")
+
+    def put(self, url, page_type, html, status=200, fetched_at=None):
+        """Store a fetched page body and index the fetch; returns its digest"""
+        data = html.encode('utf-8') if isinstance(html, str) else html
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            compressor, _ = self._codecs()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a crash never leaves a truncated blob
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressor.compress(data))
+            os.replace(tmp, path)
+
+        fetched_at = (fetched_at or datetime.now()).isoformat()
+        with self.lock, self.conn:
+            self.conn.execute('INSERT INTO fetches VALUES (?, ?, ?, ?, ?)',
+                              (url, page_type, status, digest, fetched_at))
+        return digest
+
+    def get(self, digest):
+        """Page body for a digest, as text"""
+        _, decompressor = self._codecs()
+        with open(self.blob_path(digest), 'rb') as f:
+            return decompressor.decompress(f.read()).decode('utf-8', 'replace')
+
+    def latest(self, page_type=None, before=None):
+        """(url, page_type, digest, fetched_at) of the newest successful fetch of each URL
+
+        With before (an ISO timestamp), the newest fetch older than it.
+        """
+        query = ('SELECT url, page_type, digest, max(fetched_at) FROM fetches '
+                 'WHERE status = 200')
+        params = []
+        if page_type:
+            query += ' AND page_type = ?'
+            params.append(page_type)
+        if before:
+            query += ' AND fetched_at < ?'
+            params.append(before)
+        query += ' GROUP BY url, page_type ORDER BY url'
+        with self.lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
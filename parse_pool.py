@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Process-pool parsing stage for the Newsday crawler
+Fetch threads hand raw HTML to worker processes, which parse it and run the
+extraction code, so CPU-bound BeautifulSoup work isn't serialized on the GIL
+"""
+
+import contextvars
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Crawler instance of each worker process, built by init_worker
+_crawler = None
+
+
+def init_worker(crawler_class, options):
+    global _crawler
+    _crawler = crawler_class(**options)
+
+
+def extract_page(url, page_type, html):
+    """Parse a page and extract it; returns (looks rendered, extracted data, stats)
+
+    The extracted data is extract_article_data's record for article pages
+    and extract_articles_from_page's list for date pages. stats holds the
+    selector cache counters and timing spans of this call, for the calling
+    crawler to merge into its own (see NewsdayCrawler.merge_parse_stats).
+    """
+    selectors_before = _crawler.selector_cache.get_stats()
+    # A forked worker inherits the forking thread's open spans; start from none
+    rendered, extracted = contextvars.Context().run(parse_and_extract, url, page_type, html)
+    selectors = {name: count - selectors_before[name]
+                 for name, count in _crawler.selector_cache.get_stats().items()}
+    return rendered, extracted, {'selectors': selectors, 'spans': _crawler.spans.drain()}
+
+
+def parse_and_extract(url, page_type, html):
+    soup = _crawler.parser.parse(html)
+    rendered = _crawler.looks_rendered(soup, page_type)
+    with _crawler.spans.span('extract'):
+        if page_type == 'article':
+            return rendered, _crawler.extract_article_data(soup, url)
+        return rendered, _crawler.extract_articles_from_page(soup, url)
+
+
+class ParsePool:
+    """Worker processes that each hold their own crawler for extraction.
+
+    The crawler class and its parsing options are sent once per process, so
+    subclasses that override the extraction methods are honoured; only the
+    HTML and the extracted dicts cross process boundaries.
+    """
+
+    def __init__(self, workers, crawler_class, options):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                            initargs=(crawler_class, options))
+
+    def extract(self, url, page_type, html):
+        """Blocking call from a fetch thread; see extract_page"""
+        return self.executor.submit(extract_page, url, page_type, html).result()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Profiling mode for the Newsday crawler
+Crawls a random sample of dates under cProfile (every thread), tracemalloc and
+a stack sampler, and writes pstats, allocation and flame-graph files
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def thread_group(name):
+    """'date_3', 'article_12' -> 'date', 'article' so a pool's threads fold together"""
+    return re.sub(r'[_-]?\d+$', '', name) or name
+
+
+class StackSampler:
+    """Samples every thread's Python stack every `interval` seconds.
+
+    Counts are kept per collapsed stack ('thread;outer;...;inner'), the
+    folded format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = {}
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame))
+                    frame = frame.f_back
+                stack.append(thread_group(names.get(ident, 'thread')))
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.counts.items()))
+
+
+class Profiler:
+    """cProfile in every thread, tracemalloc and a stack sampler around a block
+
+    Threads started while profiling get their own cProfile.Profile (merged
+    when dumped). From Python 3.12 cProfile can't run one profiler per
+    thread; there the calling thread's profiler is the only one.
+    """
+
+    def __init__(self, interval=0.005, traceback_frames=10):
+        self.interval = interval
+        self.traceback_frames = traceback_frames
+        self.profiles = []
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.sampler = None
+        self.elapsed = 0.0
+
+    def _profile_thread(self, frame, event, arg):
+        # First event in a new thread: swap this hook for a real profiler
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            sys.setprofile(None)
+            return
+        with self.lock:
+            self.profiles.append(profile)
+
+    def start(self):
+        tracemalloc.start(self.traceback_frames)
+        # Started first so the sampler's own thread isn't profiled
+        self.sampler = StackSampler(self.interval).start()
+        self.main = cProfile.Profile()
+        self.main.enable()
+        threading.setprofile(self._profile_thread)
+        self.started = time.perf_counter()
+        return self
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+        threading.setprofile(None)
+        self.main.disable()
+        self.sampler.stop()
+        self.snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def stats(self):
+        stats = pstats.Stats(self.main)
+        with self.lock:
+            profiles = list(self.profiles)
+        for profile in profiles:
+            stats.add(profile)
+        return stats
+
+    def allocations(self, limit=30):
+        """Top allocation sites still holding memory when profiling stopped"""
+        snapshot = self.snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        lines = []
+        for stat in snapshot.statistics('traceback')[:limit]:
+            lines.append(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks")
+            lines.extend(f"    {line}" for line in stat.traceback.format())
+        total = sum(stat.size for stat in snapshot.statistics('filename'))
+        lines.insert(0, f"{total / 1024 / 1024:.1f} MiB traced at the end of the run")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, prefix, spans=None):
+        """Write <prefix>.prof (pstats: snakeviz, gprof2dot), <prefix>.folded
+        (sampled stacks: flamegraph.pl, speedscope), <prefix>.alloc.txt and,
+        with a SpanRecorder, <prefix>.spans.txt and <prefix>.spans.folded;
+        returns the paths written"""
+        paths = {'pstats': f"{prefix}.prof", 'folded': f"{prefix}.folded", 'alloc': f"{prefix}.alloc.txt"}
+        self.stats().dump_stats(paths['pstats'])
+        with open(paths['folded'], 'w') as f:
+            f.write(self.sampler.collapsed())
+        with open(paths['alloc'], 'w') as f:
+            f.write(self.allocations())
+        if spans is not None:
+            paths['spans'] = f"{prefix}.spans.txt"
+            paths['spans_folded'] = f"{prefix}.spans.folded"
+            with open(paths['spans'], 'w') as f:
+                f.write(spans.report() + '\n')
+            with open(paths['spans_folded'], 'w') as f:
+                f.write(spans.collapsed())
+        return paths
+
+
+def sample_dates(date_urls, count, seed=0):
+    """count date URLs spread at random over the range, in date order"""
+    if count >= len(date_urls):
+        return list(date_urls)
+    return sorted(random.Random(seed).sample(date_urls, count), key=lambda d: d['date'])
+
+
+def profile_crawl(crawler, dates=7, prefix='newsday_profile', years_back=15, max_workers=2,
+                  delay=0.5, seed=0):
+    """Crawl `dates` randomly chosen dates under the profilers and write the
+    profile files (see Profiler.dump); returns their paths"""
+    sample = sample_dates(crawler.generate_date_urls(years_back), dates, seed)
+    logger.info(f"Profiling a crawl of {len(sample)} dates: {', '.join(d['date'] for d in sample)}")
+
+    profiler = Profiler()
+    article_workers = crawler.prepare_crawl(delay, max_workers, None, 1000)
+    crawler.open_sink()
+    with profiler:
+        try:
+            crawler.run_pipeline(sample, [], max_workers, article_workers, 1000)
+        finally:
+            crawler.finish_crawl()
+
+    paths = profiler.dump(prefix, crawler.spans)
+    top = profiler.stats().sort_stats('cumulative')
+    logger.info(f"Profiled {profiler.elapsed:.1f}s, {profiler.sampler.samples} stack samples; "
+                f"wrote {', '.join(paths.values())}")
+    top.print_stats(25)
+    return paths
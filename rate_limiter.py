@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-host rate limiting for the Newsday crawler
+Token buckets shared by every fetch path, tuned by server feedback (AIMD)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def get_header(headers, name):
+    """Case-insensitive header lookup (Playwright lower-cases header names)"""
+    if not headers:
+        return None
+    return headers.get(name) or headers.get(name.lower())
+
+
+def is_timeout(error):
+    return error is not None and 'timeout' in type(error).__name__.lower()
+
+
+class _HostBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket whose rate adapts to server responses.
+
+    Fast 200s and 304s raise the rate additively; 429/503 responses and
+    timeouts cut it multiplicatively. A Retry-After header pauses the host
+    entirely until it expires. All crawler threads (and the async engine) share one limiter,
+    so the aggregate request rate no longer scales with the worker count.
+    """
+
+    def __init__(self, initial_rate=2.0, min_rate=0.1, max_rate=20.0, burst=2,
+                 increase=0.1, decrease=0.5, fast_response=1.0):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.fast_response = fast_response
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def set_initial_interval(self, seconds):
+        """Start new hosts at one request per `seconds`"""
+        if seconds and seconds > 0:
+            self.initial_rate = min(self.max_rate, max(self.min_rate, 1.0 / seconds))
+
+    def _bucket(self, host):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return bucket
+
+    def reserve(self, url):
+        """Take a token for the URL's host; returns how long the caller must wait"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            # Going negative reserves a future token for this caller
+            bucket.tokens -= 1
+            wait = 0.0 if bucket.tokens >= 0 else -bucket.tokens / bucket.rate
+            return max(wait, bucket.blocked_until - now)
+
+    def acquire(self, url):
+        """Block until a request to the URL's host is allowed"""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url):
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def feedback(self, url, status=None, elapsed=None, headers=None, error=None):
+        """Adjust the host's rate from the outcome of a request"""
+        host = urlparse(url).netloc
+        retry_after = parse_retry_after(get_header(headers, 'Retry-After'))
+        with self.lock:
+            bucket = self._bucket(host)
+            if status in THROTTLE_STATUSES or is_timeout(error):
+                old = bucket.rate
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                logger.info(f"Backing off {host}: {old:.2f} -> {bucket.rate:.2f} req/s "
+                            f"({status or type(error).__name__})")
+            elif status in (200, 304) and elapsed is not None and elapsed < self.fast_response:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+            if retry_after:
+                bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+                logger.info(f"{host} asked us to wait {retry_after:.0f}s (Retry-After)")
+
+    def get_rates(self):
+        """Current requests/second per host"""
+        with self.lock:
+            return {host: round(bucket.rate, 2) for host, bucket in self.buckets.items()}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rerun extraction over the raw page store
+Applies the current extract_articles_from_page / extract_article_data to
+every stored page on all cores and writes fresh article records, with no
+network access
+"""
+
+import argparse
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tqdm import tqdm
+
+from newsday_crawler import NewsdayCrawler
+from output_sink import JsonlSink
+from page_store import PageStore
+from url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+DATE_IN_URL = re.compile(r'/(\d{4})/(\d{2})/(\d{2})/?$')
+
+# Per-process state set up by _init_worker
+_store = None
+_crawler = None
+
+
+def _init_worker(store_root, base_url, parser_backend):
+    global _store, _crawler
+    _store = PageStore(store_root)
+    _crawler = NewsdayCrawler(base_url=base_url, parser_backend=parser_backend, block_resources=False)
+
+
+def _extract(task):
+    """Extract one stored page: article links for date pages, the record for articles"""
+    url, page_type, digest = task
+    try:
+        soup = _crawler.parser.parse(_store.get(digest))
+        if page_type == 'article':
+            return url, page_type, _crawler.extract_article_data(soup, url)
+        return url, page_type, _crawler.extract_articles_from_page(soup, url)
+    except Exception as e:
+        logger.error(f"Could not re-extract {url}: {e}")
+        return url, page_type, None
+
+
+def reextract(store_root='newsday_pages', output='newsday_articles_reextracted.jsonl', workers=None,
+              base_url="https://newsday.co.tt", parser_backend=None, before=None, chunksize=64):
+    """Re-extract every stored page in parallel and write merged article records
+
+    Date pages are processed first so each article keeps the listing fields
+    (title, preview_text, crawl_date, source_url) it would get from a crawl.
+    Returns the number of articles written.
+    """
+    workers = workers or os.cpu_count()
+    store = PageStore(store_root)
+    date_pages = [(url, page_type, digest) for url, page_type, digest, _ in store.latest('date', before)]
+    article_pages = [(url, page_type, digest) for url, page_type, digest, _ in store.latest('article', before)]
+    store.close()
+    logger.info(f"Re-extracting {len(date_pages)} date pages and {len(article_pages)} articles "
+                f"with {workers} processes")
+
+    start = time.time()
+    listings = {}
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(store_root, base_url, parser_backend)) as executor:
+        results = executor.map(_extract, date_pages, chunksize=chunksize)
+        for url, _, articles in tqdm(results, total=len(date_pages), desc="Date pages"):
+            match = DATE_IN_URL.search(url)
+            crawl_date = '-'.join(match.groups()) if match else None
+            for article in articles or []:
+                article['crawl_date'] = crawl_date
+                article['source_url'] = url
+                listings.setdefault(canonicalize_url(article['url']), article)
+
+        sink = JsonlSink(output, append=False)
+        try:
+            results = executor.map(_extract, article_pages, chunksize=chunksize)
+            for url, _, record in tqdm(results, total=len(article_pages), desc="Articles"):
+                if record is None:
+                    continue
+                article = dict(listings.get(canonicalize_url(url), {}))
+                article.update(record)
+                sink.write(article)
+                written += 1
+        finally:
+            sink.close()
+
+    elapsed = time.time() - start
+    logger.info(f"Wrote {written} articles to {output} in {elapsed:.1f}s "
+                f"({(len(date_pages) + len(article_pages)) / max(elapsed, 1e-9):.0f} pages/s)")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-extract articles from stored raw pages")
+    parser.add_argument('--pages', default='newsday_pages', help="Page store directory")
+    parser.add_argument('--output', default='newsday_articles_reextracted.jsonl')
+    parser.add_argument('--workers', type=int, help="Processes (default: all cores)")
+    parser.add_argument('--base-url', default="https://newsday.co.tt")
+    parser.add_argument('--parser', help="Parser backend (default: fastest available)")
+    parser.add_argument('--before', help="Use the newest fetch older than this ISO timestamp")
+    args = parser.parse_args(argv)
+    reextract(args.pages, args.output, args.workers, args.base_url, args.parser, args.before)
+
+
+if __name__ == "__main__":
+    main()
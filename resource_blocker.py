@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Request blocking for Playwright navigation
+Aborts images, fonts, media, stylesheets, trackers and third-party scripts so
+a page load only fetches what page.content() needs
+"""
+
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = ('image', 'media', 'font', 'stylesheet', 'texttrack', 'manifest', 'other')
+
+DEFAULT_BLOCKED_DOMAINS = (
+    'doubleclick.net', 'googlesyndication.com', 'googletagmanager.com',
+    'google-analytics.com', 'googletagservices.com', 'adservice.google.com',
+    'facebook.net', 'facebook.com', 'twitter.com', 'twimg.com',
+    'scorecardresearch.com', 'quantserve.com', 'taboola.com', 'outbrain.com',
+    'amazon-adsystem.com', 'pubmatic.com', 'rubiconproject.com', 'criteo.com',
+)
+
+# Rough median transfer sizes per resource type (HTTP Archive), used to
+# estimate what blocking saved since aborted requests never report a size
+TYPICAL_BYTES = {
+    'image': 25000, 'media': 500000, 'font': 30000, 'stylesheet': 20000,
+    'script': 30000, 'xhr': 5000, 'fetch': 5000, 'texttrack': 2000,
+    'manifest': 1000, 'other': 5000,
+}
+
+
+def host_matches(host, domains):
+    """True if host is one of domains or a subdomain of one"""
+    host = (host or '').lower()
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+def _is_main_frame(request):
+    try:
+        return request.frame.parent_frame is None
+    except Exception:
+        return True
+
+
+class ResourceBlocker:
+    """Decides which sub-requests to abort and keeps count of what was saved.
+
+    The page's own document is always loaded; third-party iframes (ads,
+    embeds) are not. Scripts, XHR and fetches are only allowed from
+    first-party hosts (and scripts only when allow_first_party_scripts is
+    set); anything on a blocked domain or of a blocked resource type is
+    aborted.
+    """
+
+    def __init__(self, first_party_hosts=(), blocked_types=DEFAULT_BLOCKED_TYPES,
+                 blocked_domains=DEFAULT_BLOCKED_DOMAINS, allow_first_party_scripts=True):
+        self.first_party_hosts = tuple(h.lower() for h in first_party_hosts if h)
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+        self.allow_first_party_scripts = allow_first_party_scripts
+        self.lock = threading.Lock()
+        self.stats = {'allowed': 0, 'blocked': 0, 'blocked_by_type': {},
+                      'bytes_loaded': 0, 'est_bytes_saved': 0}
+
+    def should_block(self, url, resource_type, main_frame=True):
+        if resource_type == 'document' and main_frame:
+            return False
+        host = urlparse(url).hostname
+        if host_matches(host, self.blocked_domains):
+            return True
+        if resource_type in self.blocked_types:
+            return True
+        first_party = not self.first_party_hosts or host_matches(host, self.first_party_hosts)
+        if resource_type == 'document':
+            return not first_party
+        if resource_type == 'script':
+            return not (first_party and self.allow_first_party_scripts)
+        if resource_type in ('xhr', 'fetch', 'eventsource', 'websocket'):
+            return not first_party
+        return False
+
+    def record_blocked(self, resource_type):
+        with self.lock:
+            self.stats['blocked'] += 1
+            by_type = self.stats['blocked_by_type']
+            by_type[resource_type] = by_type.get(resource_type, 0) + 1
+            self.stats['est_bytes_saved'] += TYPICAL_BYTES.get(resource_type, TYPICAL_BYTES['other'])
+
+    def record_loaded(self, headers):
+        try:
+            size = int((headers or {}).get('content-length') or 0)
+        except ValueError:
+            size = 0
+        with self.lock:
+            self.stats['allowed'] += 1
+            self.stats['bytes_loaded'] += size
+
+    def handle_route(self, route):
+        """Route handler for the sync API: context.route('**/*', blocker.handle_route)"""
+        request = route.request
+        if self.should_block(request.url, request.resource_type, _is_main_frame(request)):
+            self.record_blocked(request.resource_type)
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_route_async(self, route):
+        """Route handler for the async API"""
+        request = route.request
+        if self.should_block(request.url, request.resource_type, _is_main_frame(request)):
+            self.record_blocked(request.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def handle_response(self, response):
+        """context.on('response') listener counting bytes actually downloaded"""
+        self.record_loaded(response.headers)
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['blocked_by_type'] = dict(stats['blocked_by_type'])
+        return stats
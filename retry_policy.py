@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Retry policy for the Newsday crawler
+Classifies fetch failures, spaces retries with jittered backoff under a global
+retry budget, and re-queues failed work after its backoff instead of sleeping
+in the worker that hit the failure
+"""
+
+import heapq
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+
+from rate_limiter import THROTTLE_STATUSES, is_timeout
+
+logger = logging.getLogger(__name__)
+
+PERMANENT = 'permanent'
+TRANSIENT = 'transient'
+THROTTLED = 'throttled'
+
+# Client errors that can't come right on their own; 408 (request timeout) and
+# 429 (throttled) are the 4xx statuses worth retrying
+RETRYABLE_CLIENT_STATUSES = (408, 429)
+
+# Exceptions from the network stack (requests, urllib3, Playwright, sockets)
+TRANSIENT_ERROR_MODULES = ('requests', 'urllib3', 'playwright', 'socket', 'ssl', 'http.client')
+
+
+def classify(status=None, error=None):
+    """PERMANENT, TRANSIENT or THROTTLED for a failed fetch
+
+    Throttling is a 429/503 response; server errors, request timeouts and
+    network-level exceptions are transient; other 4xx responses and errors
+    raised by our own code (a retry would fail the same way) are permanent.
+    """
+    if status is not None:
+        if status in THROTTLE_STATUSES:
+            return THROTTLED
+        if status >= 500 or status in RETRYABLE_CLIENT_STATUSES:
+            return TRANSIENT
+        return PERMANENT
+    if error is not None:
+        if is_timeout(error) or isinstance(error, OSError):
+            return TRANSIENT
+        if type(error).__module__.split('.')[0] in TRANSIENT_ERROR_MODULES:
+            return TRANSIENT
+    return PERMANENT
+
+
+class FetchFailed(Exception):
+    """A page fetch that failed, with its failure class for the retry policy"""
+
+    def __init__(self, url, kind, status=None, error=None, retry_after=None):
+        self.url = url
+        self.kind = kind
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+        super().__init__(f"HTTP {status}" if status is not None else str(error))
+
+    @classmethod
+    def from_error(cls, url, error):
+        if isinstance(error, cls):
+            return error
+        return cls(url, classify(error=error), error=error)
+
+
+class RetryPolicy:
+    """When (and whether) to retry a failed fetch.
+
+    Delays use full jitter (uniform between 0 and base_delay * 2**attempt,
+    capped at max_delay) so workers that failed together don't retry
+    together; throttled fetches back off from throttle_delay instead and
+    never sooner than the server's Retry-After. Permanent failures are not
+    retried. Retries across the whole crawl are capped by a budget of
+    min_budget plus budget_ratio of all requests made, so an outage turns
+    into dead letters instead of a retry storm.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=60.0, throttle_delay=10.0,
+                 budget_ratio=0.2, min_budget=10, seed=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttle_delay = throttle_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.attempts = {}
+        self.requests = 0
+        self.retries = 0
+        self.stats = {'retries': 0, PERMANENT: 0, 'attempts': 0, 'budget': 0}
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def backoff(self, failure, attempt):
+        """Seconds to wait before retry number attempt + 1 (attempt counts from 0)"""
+        base = self.throttle_delay if failure.kind == THROTTLED else self.base_delay
+        with self.lock:
+            delay = self.random.uniform(0, min(self.max_delay, base * 2 ** attempt))
+        if failure.retry_after:
+            delay = max(delay, min(failure.retry_after, self.max_delay))
+        return delay
+
+    def _spend(self):
+        # Caller holds the lock
+        if self.retries >= self.min_budget + self.budget_ratio * self.requests:
+            return False
+        self.retries += 1
+        return True
+
+    def retry_delay(self, failure, attempt, max_attempts=None):
+        """(delay, None) to retry after a failed attempt, or (None, reason) to
+        give up, reason being 'permanent', 'attempts' or 'budget'"""
+        max_attempts = max_attempts or self.max_attempts
+        with self.lock:
+            if failure.kind == PERMANENT:
+                reason = PERMANENT
+            elif attempt + 1 >= max_attempts:
+                reason = 'attempts'
+            elif not self._spend():
+                reason = 'budget'
+            else:
+                reason = None
+            self.stats['retries' if reason is None else reason] += 1
+        if reason:
+            return None, reason
+        return self.backoff(failure, attempt), None
+
+    def schedule(self, key, failure):
+        """retry_delay for work that goes back on a queue, counting its attempts by key"""
+        with self.lock:
+            attempt = self.attempts.get(key, 0)
+        delay, reason = self.retry_delay(failure, attempt)
+        with self.lock:
+            if delay is None:
+                self.attempts.pop(key, None)
+            else:
+                self.attempts[key] = attempt + 1
+        return delay, reason, attempt + 1
+
+    def forget(self, key):
+        """Drop the attempt count of work that finally succeeded"""
+        with self.lock:
+            self.attempts.pop(key, None)
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats['requests'] = self.requests
+        return stats
+
+
+class DelayedQueue(queue.Queue):
+    """A Queue that can also take items back after a delay (put_later).
+
+    Items waiting out their delay count as unfinished, so join() returns only
+    once they have been put back and processed too. A single timer thread
+    does the puts, so no worker sits in a sleep while an item waits.
+    """
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self.delayed = []
+        self.sequence = itertools.count()
+        self.timer_lock = threading.Condition()
+        self.timer = None
+        self.closed = False
+
+    def put_later(self, item, delay):
+        with self.mutex:
+            self.unfinished_tasks += 1
+        with self.timer_lock:
+            heapq.heappush(self.delayed, (time.monotonic() + delay, next(self.sequence), item))
+            if self.timer is None:
+                self.timer = threading.Thread(target=self._run_timer, name='retry-timer', daemon=True)
+                self.timer.start()
+            self.timer_lock.notify()
+
+    def delayed_count(self):
+        with self.timer_lock:
+            return len(self.delayed)
+
+    def _run_timer(self):
+        while True:
+            with self.timer_lock:
+                while not self.closed and (not self.delayed or self.delayed[0][0] > time.monotonic()):
+                    timeout = self.delayed[0][0] - time.monotonic() if self.delayed else None
+                    self.timer_lock.wait(timeout)
+                if self.closed:
+                    return
+                _, _, item = heapq.heappop(self.delayed)
+            # May block on a full queue, which delays later retries too (backpressure)
+            self.put(item)
+            with self.mutex:
+                # put() counted the item again; put_later already had
+                self.unfinished_tasks -= 1
+
+    def close(self):
+        """Stop the timer thread, dropping anything still waiting"""
+        with self.timer_lock:
+            self.closed = True
+            dropped = len(self.delayed)
+            self.delayed.clear()
+            self.timer_lock.notify()
+        if dropped:
+            logger.warning(f"Dropped {dropped} queued retries")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Learned selector cache for article extraction
+Remembers which of a field's candidate CSS selectors matches on each site so
+later pages need one select_one per field instead of trying them all
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SelectorCache:
+    """Per-(host, field) memory of the selector that won the ordered walk.
+
+    The learned selector is tried alone; when it finds nothing, and on every
+    validate_every-th page for that host and field, the full ordered list is
+    walked again and whatever wins is learned instead, so a template change
+    (or a page where a higher-priority selector appears) is picked up.
+    """
+
+    def __init__(self, validate_every=50):
+        self.validate_every = validate_every
+        self.learned = {}
+        self.uses = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'walks': 0, 'relearned': 0}
+
+    def select(self, soup, host, field, selectors):
+        """First element matched for a field, trying the learned selector first"""
+        key = (host, field)
+        with self.lock:
+            index = self.learned.get(key)
+            uses = self.uses[key] = self.uses.get(key, 0) + 1
+
+        if index is not None and uses % self.validate_every:
+            elem = soup.select_one(selectors[index])
+            if elem is not None:
+                self._count('hits')
+                return elem
+            self._count('misses')
+
+        self._count('walks')
+        for i, selector in enumerate(selectors):
+            elem = soup.select_one(selector)
+            if elem is not None:
+                if i != index:
+                    with self.lock:
+                        self.learned[key] = i
+                    if index is not None:
+                        self._count('relearned')
+                        logger.debug(f"{host} {field}: now using {selector!r} instead of {selectors[index]!r}")
+                return elem
+        return None
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_learned(self):
+        """{host: {field: selector index}}"""
+        with self.lock:
+            learned = {}
+            for (host, field), index in self.learned.items():
+                learned.setdefault(host, {})[field] = index
+            return learned
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def add_stats(self, stats):
+        """Count another cache's hits, misses, walks and relearns as ours"""
+        with self.lock:
+            for name, count in stats.items():
+                self.stats[name] += count
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Stage timing spans for the Newsday crawler
+Nested `with recorder.span('fetch'):` blocks are aggregated per call path into a
+per-run breakdown (count, total and self time) and flame-graph stacks
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+# The innermost open span of the current thread / asyncio task
+_current = contextvars.ContextVar('newsday_span', default=None)
+
+
+class SpanRecorder:
+    """Aggregates span timings by path, e.g. ('crawl_page', 'fetch', 'http').
+
+    The open-span path lives in a context variable, so spans nest per thread
+    and per asyncio task, and work handed to another thread nests under the
+    caller when run in a copy of its context (contextvars.copy_context()).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def record(self, path, elapsed, child_time):
+        with self.lock:
+            entry = self.stats.get(path)
+            if entry is None:
+                entry = self.stats[path] = {'count': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0}
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['self'] += elapsed - child_time
+            entry['max'] = max(entry['max'], elapsed)
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def drain(self):
+        """Take the raw {path tuple: entry} stats, leaving the recorder empty"""
+        with self.lock:
+            stats, self.stats = self.stats, {}
+        return stats
+
+    def merge(self, stats):
+        """Add another recorder's drain() under the current span, e.g. spans
+        timed in a worker process around the call that waited for it"""
+        parent = _current.get()
+        prefix = parent.path if parent else ()
+        with self.lock:
+            for path, other in stats.items():
+                entry = self.stats.get(prefix + path)
+                if entry is None:
+                    entry = self.stats[prefix + path] = {'count': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0}
+                entry['count'] += other['count']
+                entry['total'] += other['total']
+                entry['self'] += other['self']
+                entry['max'] = max(entry['max'], other['max'])
+        if parent is not None:
+            parent.child_time += sum(entry['total'] for path, entry in stats.items() if len(path) == 1)
+
+    def get_stats(self):
+        """{'a/b/c': {'count', 'total', 'self', 'max'}} in seconds"""
+        with self.lock:
+            return {'/'.join(path): dict(entry) for path, entry in sorted(self.stats.items())}
+
+    def report(self):
+        """Per-stage breakdown as an indented table, children under their parent"""
+        with self.lock:
+            stats = sorted(self.stats.items())
+        if not stats:
+            return "(no spans recorded)"
+        # Self time of every stage adds up to the time spent inside spans
+        spanned = sum(entry['self'] for _, entry in stats) or 1.0
+        lines = [f"{'stage':44s} {'count':>8s} {'total s':>9s} {'self s':>9s} {'avg ms':>8s} {'max ms':>8s} {'self %':>7s}"]
+        for path, entry in stats:
+            name = '  ' * (len(path) - 1) + path[-1]
+            lines.append(f"{name:44s} {entry['count']:8d} {entry['total']:9.3f} {entry['self']:9.3f} "
+                         f"{entry['total'] / entry['count'] * 1000:8.1f} {entry['max'] * 1000:8.1f} "
+                         f"{entry['self'] / spanned * 100:6.1f}%")
+        return '\n'.join(lines)
+
+    def collapsed(self):
+        """Self time per path in microseconds, one 'a;b;c N' line each
+        (the folded format flamegraph.pl and speedscope read)"""
+        with self.lock:
+            stats = sorted(self.stats.items())
+        return ''.join(f"{';'.join(path)} {round(entry['self'] * 1e6)}\n"
+                       for path, entry in stats if entry['self'] > 0)
+
+
+def stage(name):
+    """Method decorator timing each call as a span of the instance's `spans` recorder"""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(self, *args, **kwargs):
+                with self.spans.span(name):
+                    return await func(self, *args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(self, *args, **kwargs):
+                with self.spans.span(name):
+                    return func(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class _Span:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self.path = (self.parent.path if self.parent else ()) + (self.name,)
+        # Children add their elapsed time here so ours can be split into self time
+        self.child_time = 0.0
+        self.token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        _current.reset(self.token)
+        if self.parent is not None:
+            self.parent.child_time += elapsed
+        # Children running concurrently (asyncio.gather) can add up to more than we took
+        self.recorder.record(self.path, elapsed, min(self.child_time, elapsed))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Article metadata from <head> for the Newsday crawler
+Reads schema.org JSON-LD and OpenGraph / article: meta tags, which WordPress
+emits for every post, so title, author, date and category don't need DOM
+heuristics over the whole body
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_TYPES = {'NewsArticle', 'Article', 'ReportageNews', 'AnalysisNewsArticle',
+                 'OpinionNewsArticle', 'BlogPosting'}
+
+# meta property/name -> field, in order of preference
+META_FIELDS = (
+    ('og:title', 'title'),
+    ('article:published_time', 'date'),
+    ('article:section', 'category'),
+    ('author', 'author'),
+    ('article:author', 'author'),
+)
+
+
+def _text(value):
+    """A JSON-LD value as a plain string (names of objects, lists joined)"""
+    if isinstance(value, list):
+        parts = [_text(v) for v in value]
+        return ', '.join(p for p in parts if p) or None
+    if isinstance(value, dict):
+        return _text(value.get('name'))
+    if isinstance(value, str):
+        return value.strip() or None
+    return None
+
+
+def _article_nodes(data):
+    """schema.org article objects in a JSON-LD document (top level, list or @graph)"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _article_nodes(item)
+    elif isinstance(data, dict):
+        types = data.get('@type')
+        types = set(types) if isinstance(types, list) else {types}
+        if types & ARTICLE_TYPES:
+            yield data
+        yield from _article_nodes(data.get('@graph', []))
+
+
+def json_ld_metadata(head):
+    for script in head.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            logger.debug("Skipping malformed JSON-LD block")
+            continue
+        for node in _article_nodes(data):
+            fields = {
+                'title': _text(node.get('headline')),
+                'author': _text(node.get('author')),
+                'date': _text(node.get('datePublished')),
+                'category': _text(node.get('articleSection')),
+            }
+            return {k: v for k, v in fields.items() if v}
+    return {}
+
+
+def meta_metadata(head):
+    found = {}
+    for tag in head.find_all('meta', content=True):
+        key = tag.get('property') or tag.get('name')
+        found.setdefault(key, tag['content'].strip())
+
+    fields = {}
+    for key, field in META_FIELDS:
+        value = found.get(key)
+        # article:author is often a profile URL rather than a name
+        if value and field not in fields and not value.startswith('http'):
+            fields[field] = value
+    return fields
+
+
+def head_metadata(soup):
+    """{'title', 'author', 'date', 'category'} found in the page's <head>
+
+    JSON-LD wins over meta tags; fields neither provides are left out so
+    the caller can fall back to DOM selectors. Only <head> is searched.
+    """
+    head = soup.head
+    if head is None:
+        return {}
+    fields = meta_metadata(head)
+    fields.update(json_ld_metadata(head))
+    return fields
@@ -7,17 +7,64 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from newsday_crawler import NewsdayCrawler
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
 import logging
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+import requests
+from bs4 import BeautifulSoup
+from openpyxl import load_workbook
+
+from newsday_crawler import NewsdayCrawler, main
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.fixtures import article_page, date_page
+from benchmarks.bench_urls import legacy_is_article
+from benchmarks.run_benchmark import BenchmarkCrawler, run
+import browser_pool
+from browser_pool import AsyncBrowserPool, BrowserPool
+from checkpoint import CheckpointStore
+from frontier import Frontier, MemoryFrontier, SQLiteFrontier
+from html_parser import HtmlParser, available_backends
+from negative_cache import EMPTY, MISSING, NegativeCache
+from output_sink import JsonlSink, convert_jsonl, count_lines, iter_chunks, iter_jsonl
+from page_store import PageStore
+from profiler import profile_crawl
+from rate_limiter import AdaptiveRateLimiter
+from resource_blocker import ResourceBlocker
+from retry_policy import PERMANENT, THROTTLED, TRANSIENT, FetchFailed, RetryPolicy, classify
+from selector_cache import SelectorCache
+from sitemap import SitemapReader
+from structured_data import head_metadata
+from url_classifier import ArticleUrlClassifier
+from url_utils import SeenUrlSet, canonicalize_url
 
 logging.basicConfig(level=logging.INFO)
 
+def fixture_crawler(server, rate=100, crawler_class=BenchmarkCrawler, **options):
+    """A plain-HTTP crawler of the fixture server, paced at a fixed `rate` requests/s"""
+    return crawler_class(fetch_mode='http', base_url=server.url,
+                         rate_limiter=AdaptiveRateLimiter(initial_rate=rate, min_rate=rate, max_rate=rate),
+                         **options)
+
 def test_single_date():
     """Test crawling a single date"""
     crawler = NewsdayCrawler(headless=False)
     
     # Test with a recent date
-    from datetime import datetime, timedelta
     test_date = datetime.now() - timedelta(days=30)
     date_info = {
         'url': f"https://newsday.co.tt/{test_date.strftime('%Y/%m/%d')}/",
@@ -27,6 +74,7 @@ def test_single_date():
     print(f"Testing crawl for: {date_info['url']}")
     
     result = crawler.process_date_batch(date_info, delay=1.0)
+    crawler.close()
     
     print(f"Found {len(crawler.articles_data)} articles")
     
@@ -72,6 +120,1033 @@ def test_article_extraction():
     else:
         print("No articles found")
 
+    crawler.close()
+
+def test_url_deduplication():
+    """Equivalent article URLs are only fetched once"""
+
+    assert canonicalize_url("https://Newsday.co.tt/2024/01/02/story/?utm=x#top") == \
+        "https://newsday.co.tt/2024/01/02/story"
+
+    seen = SeenUrlSet()
+    assert seen.add("https://newsday.co.tt/2024/01/02/story/")
+    assert not seen.add("https://newsday.co.tt/2024/01/02/story?ref=sidebar")
+    assert seen.add("https://newsday.co.tt/2024/01/03/other-story/")
+    assert seen.duplicates == 1
+
+def test_article_url_classifier():
+    """On-site article links are accepted with their section; everything else is rejected"""
+
+    classify = ArticleUrlClassifier("https://newsday.co.tt").classify
+    assert classify("/2024/01/02/story/?utm_source=trending") == (None, '2024-01-02')
+    assert classify("https://www.newsday.co.tt/sports/2024/01/02/story/") == ('sports', '2024-01-02')
+    assert classify("https://newsday.co.tt/news/story/") == ('news', None)
+    for href in ("/news/", "/news/page/2/", "/2024/01/02/page/3/", "https://facebook.com/news/story/",
+                 "//cdn.example.com/2024/01/02/story/", "/wp-content/uploads/2024/01/02/photo.jpg",
+                 "/2024/01/02/photo.jpg", "/tag/carnival/"):
+        assert classify(href) is None, href
+    # Links the old urljoin-then-search check accepted still are, relative ones included
+    for href in ("/2024/01/02/story/", "2024/01/02/story/", " /2024/01/02/story/ ", "news/story/",
+                 "sports/2024/01/02/story/", "https://newsday.co.tt/features/story/"):
+        assert legacy_is_article(href) and classify(href) is not None, href
+    assert classify("2024/01/02/story/") == (None, '2024-01-02')
+    assert classify("javascript:void(0)") is None and classify("#comments") is None
+
+def test_browser_pool():
+    """Browsers are shared by many threads and recycled after max_pages_per_browser"""
+
+    closed = BrowserPool(size=1)
+    closed.close()
+    with pytest.raises(RuntimeError):
+        closed.fetch("https://newsday.co.tt/")
+
+    with FixtureServer() as server, BrowserPool(size=2, headless=True, max_pages_per_browser=3) as pool:
+        try:
+            pool.fetch(f"{server.url}/2024/01/01/", timeout=10000)
+        except Exception as e:
+            pytest.skip(f"Chromium can't be launched here: {str(e).splitlines()[0]}")
+        urls = [f"{server.url}/2024/01/{day:02d}/" for day in range(2, 10)]
+        with ThreadPoolExecutor(4) as executor:
+            responses = list(executor.map(lambda url: pool.fetch(url, wait_until='domcontentloaded'), urls))
+        stats = pool.get_stats()
+
+    assert all(r['status'] == 200 and '<article' in r['content'] for r in responses)
+    # 9 pages can't fit in two browsers' first 3 pages each
+    assert stats['pages'] == 9 and stats['recycles'] >= 1
+    assert stats['launches'] >= 3 and stats['active_pages'] == 0
+
+class FakeBrowser:
+    """A Playwright browser, context and page in one; records selector waits"""
+
+    def __init__(self):
+        self.url = None
+        self.waited = []
+
+    def goto(self, url, **kwargs):
+        self.url = url
+        return SimpleNamespace(status=404 if 'missing' in url else 200, headers={})
+
+    def wait_for_selector(self, selector, **kwargs):
+        self.waited.append(self.url)
+
+    def content(self):
+        return '<html></html>'
+
+    def new_context(self, **kwargs):
+        return self
+
+    def new_page(self):
+        return self
+
+    def is_connected(self):
+        return True
+
+    def is_closed(self):
+        return False
+
+    def close(self):
+        pass
+
+class FakeAsyncBrowser(FakeBrowser):
+    async def goto(self, url, **kwargs):
+        return FakeBrowser.goto(self, url)
+
+    async def wait_for_selector(self, selector, **kwargs):
+        FakeBrowser.wait_for_selector(self, selector)
+
+    async def content(self):
+        return FakeBrowser.content(self)
+
+    async def new_context(self, **kwargs):
+        return self
+
+    async def new_page(self):
+        return self
+
+    async def close(self):
+        pass
+
+def test_browser_pools_skip_selector_wait_on_errors(monkeypatch):
+    """An error response is returned at once instead of waiting out the selector timeout"""
+
+    browser = FakeBrowser()
+    playwright = SimpleNamespace(chromium=SimpleNamespace(launch=lambda **kwargs: browser))
+    monkeypatch.setattr(browser_pool, 'sync_playwright', lambda: contextlib.nullcontext(playwright))
+    with BrowserPool(size=1) as pool:
+        assert pool.fetch("http://fixture/missing/", wait_for_selector='article')['status'] == 404
+        assert pool.fetch("http://fixture/2024/01/02/", wait_for_selector='article')['status'] == 200
+    assert browser.waited == ["http://fixture/2024/01/02/"]
+
+    async_browser = FakeAsyncBrowser()
+
+    async def launch(**kwargs):
+        return async_browser
+
+    async def nothing():
+        pass
+
+    async def start():
+        return SimpleNamespace(chromium=SimpleNamespace(launch=launch), stop=nothing)
+
+    monkeypatch.setattr(browser_pool, 'async_playwright', lambda: SimpleNamespace(start=start))
+
+    async def crawl():
+        pool = AsyncBrowserPool(size=1)
+        try:
+            return [(await pool.fetch(url, wait_for_selector='article'))['status']
+                    for url in ("http://fixture/missing/", "http://fixture/2024/01/02/")]
+        finally:
+            await pool.close()
+
+    assert asyncio.run(crawl()) == [404, 200]
+    assert async_browser.waited == ["http://fixture/2024/01/02/"]
+
+def test_browser_pool_close_releases_waiting_fetches(monkeypatch):
+    """A fetch that races close() raises instead of waiting forever"""
+
+    playwright = SimpleNamespace(chromium=SimpleNamespace(launch=lambda **kwargs: FakeBrowser()))
+    monkeypatch.setattr(browser_pool, 'sync_playwright', lambda: contextlib.nullcontext(playwright))
+    pool = BrowserPool(size=1)
+    pool.start()
+    # close() lands after fetch() got going but before its job is queued
+    pool.start = pool.close
+    errors = []
+
+    def fetch():
+        try:
+            pool.fetch("http://fixture/2024/01/02/")
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=fetch, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+    assert not thread.is_alive() and len(errors) == 1
+
+def test_resource_blocker_decisions():
+    """Only the document and first-party scripts/XHR load; the rest is aborted and counted"""
+
+    blocker = ResourceBlocker(first_party_hosts=['newsday.co.tt'])
+    site = "https://newsday.co.tt"
+    assert not blocker.should_block(f"{site}/2024/01/02/", 'document')
+    assert not blocker.should_block(f"{site}/wp-includes/js/app.js", 'script')
+    assert not blocker.should_block("https://cdn.newsday.co.tt/api/posts", 'fetch')
+    assert blocker.should_block("https://cdn.example.com/lib.js", 'script')
+    assert blocker.should_block("https://api.example.com/feed", 'xhr')
+    assert blocker.should_block(f"{site}/logo.png", 'image')
+    assert blocker.should_block(f"{site}/style.css", 'stylesheet')
+    assert blocker.should_block("https://securepubads.g.doubleclick.net/tag/js/gpt.js", 'script')
+    assert blocker.should_block("https://www.youtube.com/embed/x", 'document', main_frame=False)
+    assert not blocker.should_block(f"{site}/embed/poll/", 'document', main_frame=False)
+    assert ResourceBlocker(['newsday.co.tt'], allow_first_party_scripts=False).should_block(
+        f"{site}/wp-includes/js/app.js", 'script')
+
+    class Route:
+        def __init__(self, url, resource_type):
+            self.request = SimpleNamespace(url=url, resource_type=resource_type,
+                                           frame=SimpleNamespace(parent_frame=None))
+            self.outcome = None
+
+        def abort(self):
+            self.outcome = 'aborted'
+
+        def continue_(self):
+            self.outcome = 'continued'
+
+    routes = [Route(f"{site}/", 'document'), Route(f"{site}/a.jpg", 'image'), Route(f"{site}/b.woff2", 'font')]
+    for route in routes:
+        blocker.handle_route(route)
+    blocker.handle_response(SimpleNamespace(headers={'content-length': '1200'}))
+    assert [route.outcome for route in routes] == ['continued', 'aborted', 'aborted']
+    stats = blocker.get_stats()
+    assert stats['blocked'] == 2 and stats['blocked_by_type'] == {'image': 1, 'font': 1}
+    assert stats['est_bytes_saved'] == 55000 and stats['bytes_loaded'] == 1200
+
+def test_navigation_options():
+    """Wait strategies map to Playwright load states or a selector wait; bad ones fail early"""
+
+    crawler = NewsdayCrawler(fetch_mode='http', navigation_timeout=5000)
+    assert crawler.navigation_options('date') == {
+        'wait_until': 'domcontentloaded', 'timeout': 5000, 'wait_for_selector': None}
+    assert crawler.navigation_options('article') == {
+        'wait_until': 'domcontentloaded', 'timeout': 5000,
+        'wait_for_selector': crawler.rendered_selectors['article']}
+
+    crawler = NewsdayCrawler(fetch_mode='http', wait_strategies={'date': 'commit', 'article': 'selector:.entry-content'})
+    assert crawler.navigation_options('date')['wait_until'] == 'commit'
+    assert crawler.navigation_options('article')['wait_for_selector'] == '.entry-content'
+    # Page types without a strategy wait for the full load
+    assert crawler.navigation_options('sitemap')['wait_until'] == 'load'
+
+    with pytest.raises(ValueError):
+        NewsdayCrawler(wait_strategies={'date': 'idle'})
+    # Date pages have no rendered selector to wait for unless one is given
+    with pytest.raises(ValueError):
+        NewsdayCrawler(wait_strategies={'date': 'selector'})
+    crawler = NewsdayCrawler(wait_strategies={'date': 'selector'}, rendered_selectors={'date': 'article a'})
+    assert crawler.navigation_options('date')['wait_for_selector'] == 'article a'
+
+def test_rate_limiter_backoff():
+    """Throttling responses cut the host rate, fast 200s raise it again"""
+
+    limiter = AdaptiveRateLimiter(initial_rate=4.0, increase=0.5)
+    url = "https://newsday.co.tt/2024/01/02/"
+    limiter.feedback(url, status=429, headers={'Retry-After': '3'})
+    assert limiter.get_rates() == {'newsday.co.tt': 2.0}
+    assert limiter.reserve(url) > 2.5
+
+    limiter.feedback(url, status=200, elapsed=0.2)
+    assert limiter.get_rates() == {'newsday.co.tt': 2.5}
+
+def test_pipeline_bounded_queue():
+    """Date and article workers run through a small queue without losing or repeating work"""
+
+    class DepthCrawler(BenchmarkCrawler):
+        max_depth = 0
+
+        def crawl_article_once(self, url):
+            self.max_depth = max(self.max_depth, self.article_queue.qsize())
+            return super().crawl_article_once(url)
+
+    with FixtureServer() as server:
+        crawler = fixture_crawler(server, crawler_class=DepthCrawler, days=4)
+        crawler.crawl_historical_data(max_workers=2, article_workers=3, queue_size=2, delay=0.01)
+
+    stats = crawler.get_pipeline_stats()
+    urls = [canonicalize_url(article['url']) for article in crawler.articles_data]
+    assert stats['dates_done'] == 4
+    assert stats['articles_done'] == stats['articles_queued'] == len(urls) == len(set(urls)) > 0
+    assert all(article.get('content') for article in crawler.articles_data)
+    assert stats['queue_size'] == 2 and crawler.max_depth <= 2
+
+def test_crawler_reused_for_a_second_crawl():
+    """A fresh (non-resume) crawl on the same crawler fetches every article again"""
+    with FixtureServer() as server:
+        crawler = fixture_crawler(server, days=2)
+        crawler.crawl_historical_data(delay=0.01)
+        first = crawler.get_pipeline_stats()['articles_done']
+        crawler.crawl_historical_data(delay=0.01)
+    assert first > 0 and crawler.get_pipeline_stats()['articles_done'] == first
+    assert len(crawler.articles_data) == 2 * first
+
+def test_incremental_high_water_mark(tmp_path):
+    """Only articles from before the recheck window are treated as known"""
+
+    store = CheckpointStore(str(tmp_path / "checkpoint.db"))
+    store.record_date({'url': 'https://newsday.co.tt/2024/01/01/', 'date': '2024-01-01'}, [
+        {'url': 'https://newsday.co.tt/2024/01/01/old/', 'crawl_date': '2024-01-01'},
+        {'url': 'https://newsday.co.tt/2024/01/05/recent/', 'crawl_date': '2024-01-05'},
+    ])
+    store.set_meta('high_water_mark', '2024-01-05')
+    assert store.get_meta('high_water_mark') == '2024-01-05'
+    assert store.article_urls(before='2024-01-03') == ['https://newsday.co.tt/2024/01/01/old']
+
+    store.reset()
+    assert store.get_meta('high_water_mark') is None
+    store.close()
+
+def test_backfill_then_incremental(tmp_path):
+    """A full crawl sets the mark; the nightly run only crawls past it plus the recheck window"""
+
+    checkpoint = str(tmp_path / "checkpoint.db")
+    with FixtureServer() as server:
+        def make_crawler(end_date):
+            return fixture_crawler(server, days=4, end_date=end_date)
+
+        make_crawler(datetime(2024, 1, 30)).crawl_historical_data(delay=0.01, checkpoint_path=checkpoint)
+        store = CheckpointStore(checkpoint)
+        assert store.get_meta('high_water_mark') == '2024-01-30'
+        store.close()
+
+        nightly = make_crawler(datetime(2024, 2, 1))
+        crawled = []
+        crawl_page_once = nightly.crawl_page_once
+        nightly.crawl_page_once = lambda url: crawled.append(url) or crawl_page_once(url)
+        assert nightly.crawl_incremental(recheck_days=1, checkpoint_path=checkpoint, delay=0.01) == '2024-02-01'
+    assert sorted(crawled) == [f"{server.url}/2024/01/30/", f"{server.url}/2024/01/31/", f"{server.url}/2024/02/01/"]
+
+def test_failed_crawl_setup_releases_resources(tmp_path):
+    """Bad arguments fail before anything is opened; a setup step that fails
+    still closes what was opened before it"""
+    with FixtureServer() as server:
+        crawler = fixture_crawler(server, metrics_port=0, parse_workers=1,
+                                  output_path=str(tmp_path / "articles.jsonl"))
+        with pytest.raises(ValueError):
+            crawler.crawl_incremental(checkpoint_path=None)
+        assert crawler.metrics_server is None and crawler.parse_pool is None
+
+        unopenable = str(tmp_path / "no-such-dir" / "checkpoint.db")
+        for crawl in (crawler.crawl_historical_data, crawler.crawl_incremental):
+            with pytest.raises(sqlite3.OperationalError):
+                crawl(delay=0.01, checkpoint_path=unopenable)
+            assert crawler.metrics_server is None and crawler.parse_pool is None and crawler.sink is None
+
+    with FixtureServer() as server, socket.socket() as busy:
+        busy.bind(('127.0.0.1', 0))
+        busy.listen()
+        crawler = fixture_crawler(server, metrics_port=busy.getsockname()[1], parse_workers=1,
+                                  http_cache_path=str(tmp_path / "http_cache.db"),
+                                  negative_cache_path=str(tmp_path / "negative.db"))
+        crawls = (crawler.crawl_historical_data,
+                  lambda **kwargs: crawler.crawl_incremental(checkpoint_path=str(tmp_path / "checkpoint.db"), **kwargs))
+        for crawl in crawls:
+            with pytest.raises(OSError):
+                crawl(delay=0.01)
+            assert crawler.metrics_server is None and crawler.parse_pool is None
+            assert crawler.http_cache is None and crawler.negative_cache is None
+
+def test_incremental_reruns_output_each_article_once(tmp_path):
+    """Rechecked articles are appended again; the converted output keeps the latest copy only"""
+
+    checkpoint, output = str(tmp_path / "checkpoint.db"), str(tmp_path / "articles.jsonl")
+    with FixtureServer() as server:
+        def make_crawler():
+            return fixture_crawler(server, days=2, output_path=output)
+
+        make_crawler().crawl_historical_data(delay=0.01, checkpoint_path=checkpoint)
+        for run in range(2):
+            crawler = make_crawler()
+            crawler.crawl_incremental(recheck_days=2, checkpoint_path=checkpoint, delay=0.01)
+
+    streamed = [canonicalize_url(r['url']) for r in iter_jsonl(output)]
+    assert len(streamed) == 3 * len(set(streamed))
+    outputs = crawler.save_stream(str(tmp_path / "articles"), formats=('json', 'csv'))
+    with open(outputs['json'], encoding='utf-8') as f:
+        urls = [canonicalize_url(r['url']) for r in json.load(f)]
+    assert sorted(urls) == sorted(set(streamed))
+    assert len(pd.read_csv(outputs['csv'])) == outputs['total_articles'] == len(urls)
+
+def test_resume_after_interrupted_crawl(tmp_path):
+    """A crawl stopped partway resumes without refetching finished dates or articles"""
+
+    class InterruptedCrawler(BenchmarkCrawler):
+        """Never gets to the last date, or to about a third of the articles"""
+
+        def crawl_page_once(self, url):
+            if url.endswith('/2024/01/30/'):
+                raise FetchFailed(url, PERMANENT, status=400)
+            return super().crawl_page_once(url)
+
+        def crawl_article_once(self, url):
+            if zlib.crc32(canonicalize_url(url).encode()) % 3 == 0:
+                raise FetchFailed(url, PERMANENT, status=400)
+            return super().crawl_article_once(url)
+
+    output = tmp_path / "articles.jsonl"
+    options = {'days': 3, 'output_path': str(output), 'dead_letter_path': str(tmp_path / "dead.jsonl")}
+    crawl = {'delay': 0.01, 'checkpoint_path': str(tmp_path / "checkpoint.db")}
+    with FixtureServer() as server:
+        first = fixture_crawler(server, crawler_class=InterruptedCrawler, **options)
+        first.crawl_historical_data(**crawl)
+        done = {canonicalize_url(json.loads(line)['url']) for line in output.open()}
+
+        second = fixture_crawler(server, **options)
+        fetched = []
+        fetch = second.http_fetcher.fetch
+        second.http_fetcher.fetch = lambda url, headers=None: fetched.append(url) or fetch(url, headers)
+        second.crawl_historical_data(resume=True, **crawl)
+
+        listing = BenchmarkCrawler(days=3, fetch_mode='http', base_url=server.url)
+        expected = {canonicalize_url(article['url']) for date_info in listing.generate_date_urls()
+                    for article in listing.crawl_page(date_info['url'])['articles']}
+
+    fetched_dates = [url for url in fetched if not second.is_article_url(url)]
+    assert fetched_dates == [f"{server.url}/2024/01/30/"]
+    refetched = {canonicalize_url(url) for url in fetched} & done
+    assert not refetched
+    urls = [canonicalize_url(json.loads(line)['url']) for line in output.open()]
+    assert len(urls) == len(set(urls))
+    assert done < set(urls) == expected
+
+def test_async_resume_runs_pending_articles_on_bounded_workers(tmp_path):
+    """Pending articles are fetched by at most `concurrency` tasks, and the
+    HTTP tier's connections are closed when the async crawl ends"""
+
+    class FlakyCrawler(BenchmarkCrawler):
+        def crawl_article_once(self, url):
+            if zlib.crc32(canonicalize_url(url).encode()) % 2 == 0:
+                raise FetchFailed(url, PERMANENT, status=400)
+            return super().crawl_article_once(url)
+
+    output = tmp_path / "articles.jsonl"
+    options = {'days': 3, 'output_path': str(output), 'dead_letter_path': str(tmp_path / "dead.jsonl")}
+    checkpoint = str(tmp_path / "checkpoint.db")
+    with FixtureServer() as server:
+        fixture_crawler(server, crawler_class=FlakyCrawler, **options).crawl_historical_data(
+            delay=0.01, checkpoint_path=checkpoint)
+        stored = sum(1 for _ in output.open())
+
+        crawler = fixture_crawler(server, **options)
+        in_flight, peak = [0], [0]
+        fetch_article = crawler.fetch_article_async
+
+        async def counting_fetch(article, pool):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            try:
+                return await fetch_article(article, pool)
+            finally:
+                in_flight[0] -= 1
+
+        crawler.fetch_article_async = counting_fetch
+        crawler.crawl_historical_data_async(concurrency=2, delay=0.01, checkpoint_path=checkpoint, resume=True)
+        adapter = crawler.http_fetcher.session.get_adapter(server.url)
+
+    assert peak[0] == 2
+    assert sum(1 for _ in output.open()) > stored
+    assert not len(adapter.poolmanager.pools)
+
+def test_resume_reconciles_unsynced_tail(tmp_path):
+    """The checkpoint keeps no article content for a streamed crawl; on resume
+    only articles past the last fsync are checked, and refetched if lost"""
+    output, checkpoint = tmp_path / "articles.jsonl", str(tmp_path / "checkpoint.db")
+    with FixtureServer() as server:
+        fixture_crawler(server, days=2, output_path=str(output)).crawl_historical_data(
+            delay=0.01, checkpoint_path=checkpoint)
+        store = CheckpointStore(checkpoint)
+        rows = store.conn.execute('SELECT url, status, data FROM articles').fetchall()
+        assert rows and all(status == 'done' and 'content' not in json.loads(data) for _, status, data in rows)
+
+        # A crash lost the last two records; the one before them was written but not synced
+        lines = output.read_bytes().splitlines(keepends=True)
+        urls = [canonicalize_url(json.loads(line)['url']) for line in lines]
+        output.write_bytes(b''.join(lines[:-2]))
+        store.conn.executemany("UPDATE articles SET status = 'written' WHERE url = ?", [(u,) for u in urls[-3:]])
+        store.set_meta('synced_offset', str(sum(len(line) for line in lines[:-3])))
+        store.close()
+
+        crawler = fixture_crawler(server, days=2, output_path=str(output))
+        fetched = []
+        fetch = crawler.http_fetcher.fetch
+        crawler.http_fetcher.fetch = lambda url, headers=None: fetched.append(url) or fetch(url, headers)
+        crawler.crawl_historical_data(delay=0.01, checkpoint_path=checkpoint, resume=True)
+
+    assert sorted(canonicalize_url(url) for url in fetched) == sorted(urls[-2:])
+    assert sorted(canonicalize_url(r['url']) for r in iter_jsonl(str(output))) == sorted(urls)
+    store = CheckpointStore(checkpoint)
+    assert store.count('done') == len(urls) and store.get_meta('synced_offset') == str(output.stat().st_size)
+    store.close()
+
+def test_jsonl_sink_and_convert(tmp_path):
+    """The stream survives a torn line and reopening, and converts chunk by chunk"""
+
+    path = str(tmp_path / "articles.jsonl")
+    sink = JsonlSink(path, append=False, fsync_every=2)
+    for i in range(3):
+        sink.write({'url': f"https://newsday.co.tt/2024/01/0{i + 1}/story-{i}/", 'title': f"Story {i}"})
+    sink.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://newsday.co.tt/torn')
+
+    sink = JsonlSink(path, append=True)
+    sink.write({'url': "https://newsday.co.tt/2024/01/04/story-3/", 'title': "Story 3", 'tags': []})
+    # A rechecked copy of the same article replaces the first one on conversion
+    sink.write({'url': "https://newsday.co.tt/2024/01/04/story-3/?utm_source=x",
+                'title': "Story 3", 'tags': ['a', 'b']})
+    sink.close()
+    assert [r['title'] for r in iter_jsonl(path)] == ["Story 0", "Story 1", "Story 2", "Story 3", "Story 3"]
+    assert [len(chunk) for chunk in iter_chunks(path, 3)] == [3, 1]
+
+    outputs = convert_jsonl(path, str(tmp_path / "out"), chunksize=3)
+    with open(outputs['json'], encoding='utf-8') as f:
+        assert [r['title'] for r in json.load(f)] == ["Story 0", "Story 1", "Story 2", "Story 3"]
+    with open(outputs['csv'], encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    # Columns are the union of all records' keys, written once across chunks
+    assert [r['title'] for r in rows] == ["Story 0", "Story 1", "Story 2", "Story 3"]
+    assert rows[0]['tags'] == '' and rows[3]['tags'] == "['a', 'b']"
+    sheet = load_workbook(outputs['excel']).active
+    excel = list(sheet.values)
+    assert excel[0] == ('url', 'title', 'tags')
+    assert len(excel) == 5 and excel[4][2] == '["a", "b"]'
+
+def test_main_saves_without_stream(tmp_path, monkeypatch, capsys):
+    """Without --output the in-memory articles are saved in the --formats asked for;
+    an empty crawl saves nothing"""
+    article = {'url': "https://newsday.co.tt/2024/01/02/story/", 'title': "Story"}
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(NewsdayCrawler, 'crawl_historical_data',
+                        lambda self, **kwargs: self.articles_data.append(dict(article)))
+    main(['--output', ''])
+    out = capsys.readouterr().out
+    assert "Total articles collected: 1" in out and "JSON Lines" not in out
+    assert sorted(name.rsplit('.', 1)[1] for name in os.listdir(tmp_path)) == ['csv', 'json', 'xlsx']
+    (tmp_path / "csv").mkdir()
+    monkeypatch.chdir(tmp_path / "csv")
+    main(['--output', '', '--formats', 'csv'])
+    assert [name.rsplit('.', 1)[1] for name in os.listdir(tmp_path / "csv")] == ['csv']
+
+    monkeypatch.setattr(NewsdayCrawler, 'crawl_historical_data', lambda self, **kwargs: None)
+    for argv in (['--output', ''], []):
+        main(argv)
+        assert "No articles collected" in capsys.readouterr().out
+
+def test_main_profile_keeps_state_files_aside(tmp_path, monkeypatch, capsys):
+    """--profile leaves the default caches, pages and dead letters alone, but
+    uses the ones given explicitly"""
+    crawlers = []
+
+    def fake_profile(crawler, **kwargs):
+        crawlers.append(crawler)
+        for path in (crawler.http_cache_path, crawler.negative_cache_path, crawler.dead_letter_path):
+            if path:
+                open(path, 'w').close()
+        return {}
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr('newsday_crawler.profile_crawl', fake_profile)
+    main(['--profile'])
+    main(['--profile', '--http-cache', 'cache.db', '--pages', ''])
+    assert "Profile written" in capsys.readouterr().out
+
+    assert os.listdir(tmp_path) == ['cache.db']
+    scratch = os.path.dirname(crawlers[0].http_cache_path)
+    assert scratch != str(tmp_path) and not os.path.exists(scratch)
+    assert crawlers[0].page_store_path.startswith(scratch)
+    assert crawlers[1].http_cache_path == 'cache.db' and crawlers[1].page_store_path is None
+    assert crawlers[1].negative_cache_path.endswith('newsday_negative_cache.db')
+    assert not os.path.exists(os.path.dirname(crawlers[1].negative_cache_path))
+
+def test_conditional_refetch(tmp_path):
+    """Articles unchanged since the last run are answered with 304 and not re-parsed"""
+
+    cache_path = str(tmp_path / "http_cache.db")
+    with FixtureServer() as server:
+        url = f"{server.url}/2024/01/02/cabinet-approves-port-spain-budget/"
+        for run in range(2):
+            crawler = NewsdayCrawler(fetch_mode='http', base_url=server.url, http_cache_path=cache_path)
+            crawler.open_http_cache()
+            record = crawler.crawl_article_content(url)
+            crawler.close_http_cache()
+            assert record['url'] == url
+        assert crawler.http_cache_stats['not_modified'] == 1
+        assert server.stats['not_modified'] == 1
+
+def test_page_store_dedup(tmp_path):
+    """Identical page bodies share one compressed blob; every fetch is indexed"""
+
+    store = PageStore(str(tmp_path / "pages"))
+    html = "<html><body><div class='entry-content'>Story</div></body></html>"
+    first = store.put("https://newsday.co.tt/2024/01/02/story/", 'article', html)
+    second = store.put("https://newsday.co.tt/2024/01/02/story/", 'article', html)
+    assert first == second
+    assert store.get(first) == html
+    assert len(store.latest('article')) == 1
+    store.close()
+
+def test_parse_pool_matches_in_thread():
+    """Extraction in worker processes gives the same record, and the same
+    counts, as in the fetch thread"""
+
+    with FixtureServer() as server:
+        url = f"{server.url}/2024/01/02/cabinet-approves-port-spain-budget/"
+        in_thread = NewsdayCrawler(fetch_mode='http', base_url=server.url)
+        pooled = NewsdayCrawler(fetch_mode='http', base_url=server.url, parse_workers=1)
+        pooled.open_parse_pool()
+        try:
+            assert pooled.crawl_article_content(url) == in_thread.crawl_article_content(url)
+            assert pooled.crawl_page(f"{server.url}/2024/01/02/") == in_thread.crawl_page(f"{server.url}/2024/01/02/")
+        finally:
+            pooled.close_parse_pool()
+
+    # The workers' selector cache use, spans and extraction time are merged back
+    assert pooled.selector_cache.get_stats() == in_thread.selector_cache.get_stats()
+    assert pooled.metrics.extract_seconds.get(page_type='article')['count'] == 1
+    spans = pooled.spans.get_stats()
+    assert spans['crawl_article_content/fetch/parse/extract/selectors']['count'] == 1
+    assert spans['crawl_page/fetch/parse/extract']['count'] == 1
+
+def test_parser_backends_extract_alike():
+    """Every available tree builder gives the same listing and article records"""
+
+    assert 'html.parser' in available_backends()
+    with pytest.raises(ValueError):
+        HtmlParser('no-such-parser')
+
+    base = "https://newsday.co.tt"
+    listing_html = date_page(datetime(2024, 1, 2))
+    results = []
+    for backend in available_backends():
+        crawler = NewsdayCrawler(fetch_mode='http', parser_backend=backend)
+        assert crawler.parser.backend == backend
+        listing = crawler.extract_articles_from_page(crawler.parser.parse(listing_html), f"{base}/2024/01/02/")
+        articles = [crawler.extract_article_data(crawler.parser.parse(article_page(a['url'][len(base):])), a['url'])
+                    for a in listing[:3]]
+        results.append((listing, articles))
+    assert results[0][0] and all(article.get('content') for article in results[0][1])
+    assert all(result == results[0] for result in results)
+
+def test_selector_cache_relearns():
+    """The learned selector is used alone until validation finds a better one"""
+
+    cache = SelectorCache(validate_every=3)
+    selectors = ['.headline', 'h1']
+    only_h1 = BeautifulSoup("<h1>Heading</h1>", 'html.parser')
+    both = BeautifulSoup("<h1>Heading</h1><p class='headline'>Headline</p>", 'html.parser')
+
+    assert cache.select(only_h1, 'newsday.co.tt', 'title', selectors).name == 'h1'
+    # Learned 'h1': the higher-priority .headline is not tried...
+    assert cache.select(both, 'newsday.co.tt', 'title', selectors).name == 'h1'
+    # ...until the periodic validation walk
+    assert cache.select(both, 'newsday.co.tt', 'title', selectors).name == 'p'
+    assert cache.get_learned() == {'newsday.co.tt': {'title': 0}}
+    assert cache.get_stats()['relearned'] == 1
+
+def test_head_metadata():
+    """JSON-LD beats meta tags, which beat nothing; the body is never consulted"""
+
+    html = """<html><head>
+    <meta property="og:title" content="OG title">
+    <meta property="article:section" content="Sports">
+    <meta property="article:author" content="https://www.facebook.com/newsday">
+    <script type="application/ld+json">{"@graph": [{"@type": "WebPage"},
+        {"@type": "NewsArticle", "headline": "LD headline", "datePublished": "2024-01-02T08:00:00",
+         "author": [{"@type": "Person", "name": "Corey Connelly"}]}]}</script>
+    </head><body><span class="date">Sidebar date</span></body></html>"""
+    assert head_metadata(BeautifulSoup(html, 'html.parser')) == {
+        'title': 'LD headline', 'date': '2024-01-02T08:00:00',
+        'category': 'Sports', 'author': 'Corey Connelly',
+    }
+
+def test_sitemap_discovery():
+    """Sitemaps are found via robots.txt and streamed entry by entry"""
+
+    with FixtureServer() as server:
+        server.corpus.sitemap_months = 3
+        reader = SitemapReader(requests.Session())
+        roots = reader.find_sitemaps(server.url)
+        assert roots == [f"{server.url}/sitemap_index.xml"]
+
+        since = datetime.now() - timedelta(days=20)
+        entries = list(reader.walk(roots, since=since))
+        urls = [loc for kind, loc, lastmod, _ in entries if kind == 'url']
+        assert urls and all(lastmod >= since for kind, _, lastmod, _ in entries if kind == 'url')
+        # The oldest monthly sitemap is skipped from the index's lastmod alone
+        assert sum(1 for kind, *_ in entries if kind == 'end') == 2
+
+def test_frontier_nodes_share_work(tmp_path):
+    """Two nodes split the crawl; a dead node's lease expires and another node takes it"""
+
+    path = str(tmp_path / "frontier.db")
+    with FixtureServer() as server:
+        nodes = [BenchmarkCrawler(days=3, fetch_mode='http', base_url=server.url) for _ in range(2)]
+        seed = SQLiteFrontier(path)
+        seed.add('date', nodes[0].generate_date_urls())
+        [(_, abandoned)] = seed.lease('dead-node', limit=1, ttl=0.5)
+
+        frontiers = [SQLiteFrontier(path) for _ in nodes]
+        threads = [
+            threading.Thread(target=node.crawl_frontier, args=(frontier,),
+                             kwargs={'node_id': f"node-{i}", 'workers': 2, 'delay': 0.01, 'poll_interval': 0.1})
+            for i, (node, frontier) in enumerate(zip(nodes, frontiers))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+
+        urls = [a['url'] for node in nodes for a in node.articles_data]
+        assert urls and len(urls) == len(set(urls))
+        assert seed.counts() == {'done': 3 + len(urls)}
+        [(owner,)] = seed.conn.execute("SELECT owner FROM frontier WHERE key = ?",
+                                       (canonicalize_url(abandoned['url']),)).fetchall()
+        assert owner in ('node-0', 'node-1')
+        for frontier in frontiers + [seed]:
+            frontier.close()
+
+def test_frontier_retries_under_the_retry_policy(tmp_path):
+    """Failed frontier items wait out their backoff (Retry-After here) before any
+    node leases them again, and are dead-lettered after max_attempts"""
+    dead_letters = str(tmp_path / "dead_letters.jsonl")
+    frontier = MemoryFrontier()
+    leases = {}
+    lease = frontier.lease
+
+    def recording_lease(*args, **kwargs):
+        leased = lease(*args, **kwargs)
+        for _, item in leased:
+            leases.setdefault(item['url'], []).append(time.time())
+        return leased
+
+    frontier.lease = recording_lease
+    with FixtureServer(error_rate=1.0, retry_after=1) as server:
+        crawler = fixture_crawler(server, days=2, dead_letter_path=dead_letters,
+                                  retry_policy=RetryPolicy(base_delay=0.01, throttle_delay=0.01, seed=0))
+        crawler.crawl_frontier(frontier, node_id='node', workers=2, delay=0.01, poll_interval=0.05,
+                               max_attempts=3)
+    assert frontier.counts() == {'failed': 2}
+    assert count_lines(dead_letters) == 2
+    assert crawler.metrics.retries.get(page_type='date') == 4
+    assert crawler.metrics.dead_letters.get(page_type='date', reason='attempts') == 2
+    assert len(leases) == 2
+    for times in leases.values():
+        assert len(times) == 3 and all(later - earlier >= 1 for earlier, later in zip(times, times[1:]))
+
+def test_frontier_lease_ownership(tmp_path):
+    """Both backends: an expired lease goes to another node, and the old owner
+    can no longer complete or fail it"""
+
+    with pytest.raises(TypeError):
+        Frontier()
+    for frontier in (MemoryFrontier(), SQLiteFrontier(str(tmp_path / "frontier.db"))):
+        assert frontier.add('date', [{'url': 'https://example.com/a/'}, {'url': 'https://example.com/a/?utm_source=x'}]) == 1
+        assert frontier.add('article', [{'url': 'https://example.com/b/'}, {'title': 'no url'}]) == 1
+        # Articles are leased before dates
+        assert [kind for kind, _ in frontier.lease('slow', limit=2, ttl=0.2)] == ['article', 'date']
+        assert frontier.lease('fast') == []
+        assert frontier.counts() == {'leased': 2}
+
+        time.sleep(0.3)
+        assert len(frontier.lease('fast', limit=2)) == 2
+        assert not frontier.complete('slow', 'https://example.com/a/')
+        assert not frontier.fail('slow', 'https://example.com/b/', 'late')
+        frontier.heartbeat('slow', ['https://example.com/a/'], ttl=0)
+        assert frontier.counts() == {'leased': 2}
+
+        assert frontier.complete('fast', 'https://example.com/a/')
+        attempts = []
+        assert frontier.fail('fast', 'https://example.com/b/', 'boom', max_attempts=3,
+                             retry_delay=lambda attempt: attempts.append(attempt) or 0.2) == 'queued'
+        assert frontier.counts() == {'done': 1, 'queued': 1}
+        # Not handed out again until the retry delay is up
+        assert frontier.lease('fast') == []
+        time.sleep(0.3)
+        [(_, item)] = frontier.lease('fast')
+        assert frontier.fail('fast', item['url'], 'boom', max_attempts=3, retry_delay=lambda attempt: None) == 'failed'
+        assert frontier.counts() == {'done': 1, 'failed': 1}
+        assert attempts == [0]
+        assert frontier.is_finished()
+        frontier.close()
+
+def test_rendered_checks():
+    """Plain-HTTP pages count as rendered only with article links / article content"""
+
+    crawler = NewsdayCrawler(fetch_mode='http')
+    shell = BeautifulSoup('<nav><a href="/news/">News</a><a href="https://twitter.com/x">x</a></nav>'
+                          '<div class="content-wrapper" id="app"></div>', 'html.parser')
+    listing = BeautifulSoup('<a href="/2024/01/02/budget-debate-continues/">Budget debate continues</a>',
+                            'html.parser')
+    article = BeautifulSoup('<div class="entry-content"><p>Text</p></div>', 'html.parser')
+    assert not crawler.looks_rendered(shell, 'date')
+    assert not crawler.looks_rendered(shell, 'article')
+    assert crawler.looks_rendered(listing, 'date')
+    assert crawler.looks_rendered(article, 'article')
+
+def test_http_tier_escalation():
+    """Rendered pages, missing pages and server errors stay on plain HTTP; a shell escalates"""
+
+    with FixtureServer() as server:
+        crawler = NewsdayCrawler(fetch_mode='auto', base_url=server.url)
+        date_page = crawler.try_http_tier(f"{server.url}/2024/01/02/", 'date')
+        assert date_page['tier'] == 'http' and date_page['rendered']
+        [article, *_] = crawler.extract_articles_from_page(date_page['soup'], server.url)
+        assert crawler.try_http_tier(article['url'], 'article')['rendered']
+        assert crawler.try_http_tier(f"{server.url}/missing/", 'date')['status'] == 404
+        # No article links: may be filled in by JavaScript, so the browser tier gets it
+        assert crawler.try_http_tier(f"{server.url}/robots.txt", 'date') is None
+        assert crawler.get_fetch_stats() == {'http': 3, 'browser': 0, 'escalated': 1}
+        crawler.close()
+
+        crawler = NewsdayCrawler(fetch_mode='http', base_url=server.url)
+        assert crawler.try_http_tier(f"{server.url}/robots.txt", 'date')['rendered'] is False
+        crawler.close()
+
+    with FixtureServer(error_rate=1.0) as server:
+        crawler = NewsdayCrawler(fetch_mode='auto', base_url=server.url)
+        assert crawler.try_http_tier(f"{server.url}/2024/01/02/", 'date')['status'] == 503
+        assert crawler.get_fetch_stats()['escalated'] == 0
+        crawler.close()
+
+def test_close_releases_http_connections():
+    """close() drops the HTTP tier's keep-alive connections; the crawler still works after"""
+
+    with FixtureServer() as server:
+        crawler = NewsdayCrawler(fetch_mode='http', base_url=server.url)
+        date_url = f"{server.url}/2024/01/02/"
+        assert crawler.crawl_page(date_url)['articles']
+        adapter = crawler.http_fetcher.session.get_adapter(server.url)
+        assert len(adapter.poolmanager.pools)
+        crawler.close()
+        assert not len(adapter.poolmanager.pools)
+        assert crawler.crawl_page(date_url)['articles']
+        crawler.close()
+
+def test_benchmark_reports():
+    """The benchmark crawls the fixture server and reports per-tier latency and memory"""
+
+    args = argparse.Namespace(fixtures=None, days=2, engine='threads', workers=2, article_workers=2,
+                              concurrency=10, fetch_mode='http', rate=1000.0, latency=0.01, jitter=0.0,
+                              error_rate=0.0, parse_workers=1, port=0, http_cache=None)
+    results = run(args)
+    assert results['articles'] > 0
+    assert results['fetches'] == results['server']['requests'] == results['fetch_tiers']['http']
+    assert results['fetch_latency_by_tier']['http']['fetches'] == results['fetches']
+    # Every fetch waits out the server's 10 ms latency
+    assert 10 <= results['fetch_p50_ms'] <= results['fetch_p95_ms']
+    assert results['peak_rss_mb']['crawler'] > 0
+    if os.path.exists('/proc/self/status'):
+        assert results['peak_rss_mb']['parse_worker_max'] > 0
+
+def test_metrics_endpoint():
+    """Fetches, latencies and stored articles show up on /metrics"""
+
+    with FixtureServer() as server:
+        crawler = NewsdayCrawler(fetch_mode='http', base_url=server.url, metrics_port=0)
+        crawler.open_metrics()
+        try:
+            record = crawler.crawl_article_content(f"{server.url}/2024/01/02/cabinet-approves-port-spain-budget/")
+            crawler.crawl_article_content(f"{server.url}/missing/")
+            crawler.store_article(record)
+            host, port = crawler.metrics_server.httpd.server_address[:2]
+            assert host == '127.0.0.1'
+            text = urlopen(f"http://127.0.0.1:{port}/metrics").read().decode()
+        finally:
+            crawler.close_metrics()
+
+    lines = text.splitlines()
+    assert 'newsday_fetches_total{tier="http",status="200"} 1' in lines
+    assert 'newsday_fetches_total{tier="http",status="404"} 1' in lines
+    assert 'newsday_fetch_seconds_count{tier="http"} 2' in lines
+    assert 'newsday_parse_seconds_bucket{page_type="article",le="+Inf"} 1' in lines
+    assert 'newsday_articles_total 1' in lines
+    assert '# TYPE newsday_extract_seconds histogram' in lines
+
+def test_profile_crawl_spans(tmp_path):
+    """Stages nest into a per-run breakdown; profile mode writes flame-graph input"""
+
+    with FixtureServer() as server:
+        crawler = BenchmarkCrawler(days=10, fetch_mode='http', base_url=server.url)
+        paths = profile_crawl(crawler, dates=1, prefix=str(tmp_path / "profile"), delay=0.01)
+
+    stats = crawler.spans.get_stats()
+    assert stats['discover_date/crawl_page']['count'] == 1
+    assert stats['crawl_article_content/fetch/http']['count'] == len(crawler.articles_data)
+    assert 'crawl_article_content/extract/selectors' in stats
+    for entry in stats.values():
+        assert 0 <= entry['self'] <= entry['total']
+
+    with open(paths['folded']) as f:
+        stacks = f.read().splitlines()
+    assert any('crawl_article_once' in line for line in stacks)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in stacks)
+    with open(paths['spans_folded']) as f:
+        assert any(line.startswith('crawl_article_content;fetch;http ') for line in f)
+    assert os.path.getsize(paths['pstats']) > 0
+
+def test_retries_requeue_and_dead_letters(tmp_path):
+    """503s go back on the queue after a backoff; work out of retry budget is
+    dead-lettered, and re-driving it completes the crawl"""
+
+    assert classify(403) == classify(error=ValueError("bad markup")) == PERMANENT
+    assert classify(503) == classify(429) == THROTTLED
+    assert classify(502) == classify(error=ConnectionError()) == TRANSIENT
+
+    dead_letters = str(tmp_path / "dead_letters.jsonl")
+    with FixtureServer(error_rate=0.3, seed=1) as server:
+        def make_crawler(**policy):
+            return fixture_crawler(server, rate=50, days=3, dead_letter_path=dead_letters,
+                                   retry_policy=RetryPolicy(base_delay=0.01, throttle_delay=0.01, seed=0, **policy))
+
+        retrying = make_crawler(max_attempts=10, min_budget=100)
+        retrying.crawl_historical_data(delay=0.01)
+        assert retrying.retry_policy.get_stats()['retries'] > 0
+        assert count_lines(dead_letters) == 0
+
+        no_budget = make_crawler(min_budget=0, budget_ratio=0)
+        no_budget.crawl_historical_data(delay=0.01)
+        parked = count_lines(dead_letters)
+        assert parked > 0 and no_budget.metrics.dead_letters.get(page_type='article', reason='budget') > 0
+
+        server.error_rate = 0
+        assert no_budget.redrive_dead_letters(delay=0.01) == parked
+        assert count_lines(dead_letters) == 0
+
+    urls = sorted(canonicalize_url(a['url']) for a in retrying.articles_data)
+    assert urls and sorted(canonicalize_url(a['url']) for a in no_budget.articles_data) == urls
+
+def test_async_engine_keeps_blocking_work_off_the_loop():
+    """Extraction and storing run in worker threads, not on the event loop"""
+
+    with FixtureServer() as server:
+        crawler = fixture_crawler(server)
+        threads = []
+        for name in ('extract_articles_from_page', 'extract_article_data', 'store_article'):
+            method = getattr(crawler, name)
+            setattr(crawler, name, lambda *args, method=method: threads.append(threading.get_ident()) or method(*args))
+        assert asyncio.run(crawler.process_date_batch_async(
+            {'url': f"{server.url}/2024/01/02/", 'date': '2024-01-02'}, pool=None)) > 0
+    assert threads and threading.get_ident() not in threads
+
+def test_async_engine_retries_and_dead_letters(tmp_path):
+    """The async engine retries failed fetches under the same policy and dead-letters the rest"""
+
+    dead_letters = str(tmp_path / "dead_letters.jsonl")
+    with FixtureServer(error_rate=0.3, seed=2) as server:
+        date_info = {'url': f"{server.url}/2024/01/02/", 'date': '2024-01-02'}
+
+        def crawl(**policy):
+            crawler = fixture_crawler(server, dead_letter_path=dead_letters,
+                                      retry_policy=RetryPolicy(base_delay=0.01, throttle_delay=0.01, seed=0, **policy))
+            crawler.open_dead_letters()
+            stored = asyncio.run(crawler.process_date_batch_async(dict(date_info), pool=None))
+            crawler.close_dead_letters()
+            return crawler, stored
+
+        retrying, stored = crawl(max_attempts=10, min_budget=100)
+        assert retrying.retry_policy.get_stats()['retries'] > 0
+        assert count_lines(dead_letters) == 0 and stored == len(retrying.articles_data) > 0
+
+        no_budget, stored = crawl(min_budget=0, budget_ratio=0)
+        parked = count_lines(dead_letters)
+        assert parked > 0 and no_budget.metrics.dead_letters.get(page_type='article', reason='budget') > 0
+        assert stored + parked == len(retrying.articles_data)
+    assert all(a.get('content') for a in retrying.articles_data)
+
+def test_redrive_skips_known_articles(tmp_path):
+    """A re-driven date page only queues articles the checkpoint doesn't know yet"""
+
+    checkpoint, dead_letters = str(tmp_path / "checkpoint.db"), str(tmp_path / "dead_letters.jsonl")
+    with FixtureServer() as server:
+        def make_crawler():
+            return fixture_crawler(server, days=1, dead_letter_path=dead_letters)
+
+        first = make_crawler()
+        first.crawl_historical_data(delay=0.01, checkpoint_path=checkpoint)
+        [date_info] = first.generate_date_urls()
+        article = {'url': f"{server.url}/2024/01/02/cabinet-approves-port-spain-budget/", 'crawl_date': '2024-01-02'}
+        with open(dead_letters, 'w', encoding='utf-8') as f:
+            for page_type, item in (('date', date_info), ('article', article)):
+                f.write(json.dumps({'page_type': page_type, 'url': item['url'], 'item': item}) + '\n')
+
+        redriven = make_crawler()
+        assert redriven.redrive_dead_letters(delay=0.01, checkpoint_path=checkpoint) == 2
+    assert first.articles_data
+    assert [a['url'] for a in redriven.articles_data] == [article['url']]
+    assert redriven.get_pipeline_stats()['dates_done'] == 1
+
+def test_negative_cache(tmp_path):
+    """Missing and empty date pages are skipped on the next run; recent ones only briefly"""
+
+    path = str(tmp_path / "negative.db")
+    with FixtureServer() as server:
+        dates = [{'url': f"{server.url}/missing/", 'date': '2024-01-02'},
+                 {'url': f"{server.url}/robots.txt", 'date': '2024-01-03'}]
+        for run in range(2):
+            crawler = BenchmarkCrawler(fetch_mode='http', base_url=server.url, negative_cache_path=path)
+            crawler.open_negative_cache()
+            requests_before = server.stats['requests']
+            assert [crawler.process_date_batch(date_info, delay=0.01) for date_info in dates] == [0, 0]
+            if run == 0:
+                # Only a rendered page is trusted to be empty
+                empty = {'url': f"{server.url}/2024/01/04/", 'date': '2024-01-04'}
+                crawler.remember_date_outcome(empty, {'articles': [], 'tier': 'browser', 'rendered': True})
+            crawler.close_negative_cache()
+        # A page without article links over plain HTTP may be an unrendered
+        # shell, so it is fetched again
+        assert server.stats['requests'] == requests_before + 1
+        assert crawler.negative_cache_stats['hits'] == 1
+
+    cache = NegativeCache(path, recent_ttl=timedelta(hours=6))
+    later = datetime.now() + timedelta(days=365)
+    assert cache.lookup(dates[0], now=later) == MISSING
+    assert cache.lookup(dates[1], now=later) is None
+    assert cache.lookup(empty, now=later) == EMPTY
+    today = {'url': 'https://newsday.co.tt/today/', 'date': datetime.now().strftime("%Y-%m-%d")}
+    cache.record(today, EMPTY, 200)
+    assert cache.lookup(today) == EMPTY
+    assert cache.lookup(today, now=datetime.now() + timedelta(hours=7)) is None
+    cache.close()
+
+def test_negative_cache_distrusts_unrendered_browser_pages(tmp_path):
+    """A browser page read before its listing was filled in is only skipped for a while"""
+    class ShellPool:
+        """Browser pool whose pages are app shells the listing script hasn't filled yet"""
+
+        def fetch(self, url, **options):
+            return {'status': 200, 'headers': {}, 'content': '<nav><a href="/news/">News</a></nav>'
+                                                             '<div class="content-wrapper" id="app"></div>'}
+
+        def close(self):
+            pass
+
+        def get_stats(self):
+            return {}
+
+    path = str(tmp_path / "negative.db")
+    shell = {'url': "https://newsday.co.tt/2020/01/04/", 'date': '2020-01-04'}
+    crawler = NewsdayCrawler(fetch_mode='browser', negative_cache_path=path)
+    crawler.browser_pool = ShellPool()
+    crawler.open_negative_cache()
+    assert crawler.process_date_batch(shell, delay=0.01) == 0
+    crawler.close_negative_cache()
+    crawler.close()
+
+    cache = NegativeCache(path)
+    assert cache.lookup(shell) == EMPTY
+    # An old day, but unconfirmed: fetched again once unconfirmed_ttl is up
+    assert cache.lookup(shell, now=datetime.now() + timedelta(days=8)) is None
+    cache.close()
+
 if __name__ == "__main__":
     print("=== Testing Playwright Newsday Crawler ===")
     
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Article URL classification for the Newsday crawler
+One precompiled, anchored regex decides whether a link is an on-site article
+and which section it belongs to
+"""
+
+import re
+from urllib.parse import urljoin, urlparse
+
+SECTIONS = ('news', 'sports', 'features', 'editorial', 'entertainment')
+
+ASSET_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'ico', 'bmp', 'css', 'js', 'json',
+                    'xml', 'rss', 'pdf', 'zip', 'mp3', 'mp4', 'm4a', 'webm', 'woff', 'woff2', 'ttf')
+
+PATTERN = r"""
+    ^(?:https?://(?:www\.)?{host}(?::\d+)?)?  # absolute on-site URL, or root-relative
+    /(?!/)                                    # ...but not protocol-relative //other.host
+    (?:
+        (?P<section>{sections})/              # /news/<slug>/, /news/2024/01/02/<slug>/
+        (?:(?P<sdate>\d{{4}}/[01]\d/[0-3]\d)/)?
+      | (?P<date>\d{{4}}/[01]\d/[0-3]\d)/     # /2024/01/02/<slug>/
+    )
+    (?!page(?:/|$|[?#]))                      # pagination: /page/2/
+    (?![^/?#]*\.(?:{assets})(?:$|[?#]))       # images, scripts, feeds...
+    [^/?#]+/?                                 # the slug
+    (?:[?#].*)?$
+"""
+
+
+class ArticleUrlClassifier:
+    """Accepts on-site article links and tells their section in one regex match.
+
+    Articles are /YYYY/MM/DD/<slug>/ or /<section>/[YYYY/MM/DD/]<slug>/ on the
+    crawled host (any port, optional www.). Section fronts, pagination,
+    off-site links, assets and other listing pages (/tag/, /author/,
+    /category/...) are rejected. Relative links ('2024/01/02/<slug>/') are
+    resolved against base_url first, as the crawler does when it follows them.
+    """
+
+    def __init__(self, base_url="https://newsday.co.tt", sections=SECTIONS):
+        self.base_url = base_url
+        host = urlparse(base_url).hostname or ''
+        if host.startswith('www.'):
+            host = host[4:]
+        self.sections = tuple(sections)
+        self.pattern = re.compile(
+            PATTERN.format(host=re.escape(host), sections='|'.join(map(re.escape, self.sections)),
+                           assets='|'.join(ASSET_EXTENSIONS)),
+            re.VERBOSE | re.IGNORECASE
+        )
+
+    def classify(self, href):
+        """(section, 'YYYY-MM-DD') for an article link, either part possibly None;
+        None when href is not an article"""
+        match = self.match(href)
+        if match is None:
+            return None
+        section, sdate, date = match.group('section', 'sdate', 'date')
+        date = date or sdate
+        return (section.lower() if section else None), (date.replace('/', '-') if date else None)
+
+    def is_article(self, href):
+        return self.match(href) is not None
+
+    def match(self, href):
+        match = self.pattern.match(href)
+        if match is None and not href.startswith(('/', 'http:', 'https:')):
+            # Only links that aren't absolute or root-relative pay for the join
+            match = self.pattern.match(urljoin(self.base_url, href.strip()))
+        return match
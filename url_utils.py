@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+URL helpers for the Newsday crawler
+Canonicalization and a thread-safe seen-URL set for cross-date deduplication
+"""
+
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+
+def canonicalize_url(url):
+    """Canonical form used for deduplication: no query, fragment or trailing slash"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, '', ''))
+
+
+class SeenUrlSet:
+    """Thread-safe set of canonical URLs that counts rejected duplicates"""
+
+    def __init__(self, urls=None):
+        self.lock = threading.Lock()
+        self.urls = set(canonicalize_url(url) for url in (urls or []))
+        self.duplicates = 0
+
+    def add(self, url):
+        """Record a URL; returns False if it (or an equivalent URL) was already seen"""
+        key = canonicalize_url(url)
+        with self.lock:
+            if key in self.urls:
+                self.duplicates += 1
+                return False
+            self.urls.add(key)
+            return True
+
+    def __contains__(self, url):
+        key = canonicalize_url(url)
+        with self.lock:
+            return key in self.urls
+
+    def __len__(self):
+        with self.lock:
+            return len(self.urls)
+
+    def clear(self):
+        with self.lock:
+            self.urls.clear()
+            self.duplicates = 0